@@ -0,0 +1,112 @@
+import sys
+import os
+import glob
+import re
+import time
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.extraction import SALARY_KEYWORDS, NEXT_LINE_STOP_WORDS
+from src.core.field_scanner import parse_amount
+from src.core.registry import get_ocr_engine, get_extractor, use_scripts_ocr_cache
+
+def legacy_key_value(text, keywords):
+    """
+    The original key/value extractor that FieldScanner.key_value replaced (and
+    must agree with, see tests/test_field_scanner.py): one pass over the lines
+    and one regex per keyword.
+    """
+    # 1. Try Line-Based Logic (for structured docs)
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        for keyword in keywords:
+            if keyword.lower() in line.lower():
+                # Same line
+                match = re.search(r"[\d,]+(?:\.\d{2})?", line)
+                if match:
+                    val = parse_amount(match.group(0))
+                    if val: return val
+
+                # Next line
+                if i + 1 < len(lines):
+                    next_line = lines[i+1]
+                    if not any(k.lower() in next_line.lower() for k in NEXT_LINE_STOP_WORDS):
+                        match_next = re.search(r"[\d,]+(?:\.\d{2})?", next_line)
+                        if match_next:
+                            val = parse_amount(match_next.group(0))
+                            if val: return val
+
+    # 2. Fallback: Stream-Based Logic (for single-line OCR)
+    # Keyword, up to ~100 chars of junk, then a number
+    for keyword in keywords:
+        pattern = re.compile(re.escape(keyword) + r".{0,100}?([\d,]+(?:\.\d{2})?)", re.IGNORECASE | re.DOTALL)
+        match = pattern.search(text)
+        if match:
+            val = parse_amount(match.group(1))
+            if val: return val
+
+    return 0.0
+
+def legacy_regex(pattern, text):
+    """First match of one field pattern, as the original per-field extraction did."""
+    match = re.search(pattern, text)
+    return match.group(0) if match else None
+
+def legacy_all_regex(pattern, text):
+    """All matches of one field pattern, as the original per-field extraction did."""
+    return re.findall(pattern, text)
+
+def time_per_call(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+def benchmark(repeat=20):
+    """
+    Compare the legacy per-field regex calls and per-keyword key/value
+    extraction (legacy_key_value) with the FieldScanner on the OCR text of
+    the kaggle salary slips, and on all slips concatenated into one large
+    noisy dump.
+    """
+    image_dir = "data/kaggle_dataset/Salary Slip"
+    images = glob.glob(os.path.join(image_dir, "*.jpg")) + glob.glob(os.path.join(image_dir, "*.png"))
+    if not images:
+        print(f"No images found in {image_dir}")
+        return
+
+    # OCR once (cached); only the extraction stage is timed
+    use_scripts_ocr_cache()
+    ocr = get_ocr_engine()
+    texts = [r["text"] for r in ocr.extract_text_batch(images) if not r["error"]]
+    extractor = get_extractor()
+
+    # Regex/keyword stage of extract_entities, without the NLP models
+    def legacy(text):
+        values = {key: legacy_regex(extractor.patterns[key], text) for key in extractor.scanner.first_keys}
+        values.update({key: legacy_all_regex(extractor.patterns[key], text) for key in extractor.scanner.all_keys})
+        values.update({field: legacy_key_value(text, keywords) for field, keywords in SALARY_KEYWORDS.items()})
+        return values
+
+    def scanner(text):
+        scan = extractor.scanner.scan(text)
+        return dict(scan.values, **{field: scan.key_value(field) for field in SALARY_KEYWORDS})
+
+    mismatches = [i for i, text in enumerate(texts) if legacy(text) != scanner(text)]
+    dump = "\n".join(texts)
+
+    print("\n" + "="*60)
+    print(f"Documents: {len(texts)}, mean length: {sum(map(len, texts)) // max(len(texts), 1)} chars")
+    print(f"Value mismatches (legacy vs scanner): {len(mismatches)}")
+    print(f"{'Input':<20} | {'Legacy (ms)':<12} | {'Scanner (ms)':<12} | {'Speedup':<8}")
+    print("-" * 60)
+    for name, inputs, n in [("per slip", texts, repeat), ("concatenated dump", [dump], max(1, repeat // 10))]:
+        old = time_per_call(legacy, inputs, n) * 1000
+        new = time_per_call(scanner, inputs, n) * 1000
+        print(f"{name:<20} | {old:<12.3f} | {new:<12.3f} | {old / new:<8.1f}x")
+    print("="*60)
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import joblib
+import numpy as np
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.forest_compiler import CompiledIsolationForest
+from src.core.validation import compiled_model_path
+from scripts.train_model import generate_synthetic_data
+
+def latency(fn, X, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat
+
+def compile_model(model_path='models/anomaly_model.pkl', repeat=200):
+    """
+    Flatten the trained IsolationForest into packed NumPy node arrays, check
+    that the compiled scorer reproduces sklearn's scores exactly, save it next
+    to the model and compare single-row and batch latency.
+    """
+    if not os.path.exists(model_path):
+        print(f"Model not found at {model_path}. Please run scripts/train_model.py")
+        return
+
+    model = joblib.load(model_path)
+    compiled = CompiledIsolationForest.from_sklearn(model)
+
+    # Training-like rows plus random noise around (and beyond) the salary range
+    rng = np.random.default_rng(0)
+    X = np.vstack([
+        generate_synthetic_data(5000),
+        rng.uniform(-10000, 400000, size=(5000, 4)),
+        rng.integers(0, 1000, size=(1000, 4))
+    ]).astype(np.float64)
+
+    mismatches = int(np.sum(model.decision_function(X) != compiled.decision_function(X)))
+    if mismatches:
+        print(f"Compiled scores differ from sklearn on {mismatches} of {len(X)} rows; not saving")
+        return
+
+    output_path = compiled_model_path(model_path)
+    compiled.save(output_path)
+    print(f"Compiled {len(model.estimators_)} trees ({len(compiled.feature)} nodes) to {output_path}")
+
+    print("\n" + "="*60)
+    print(f"{'Rows':<10} | {'sklearn (ms)':<12} | {'Compiled (ms)':<13} | {'Speedup':<8}")
+    print("-" * 60)
+    for n in [1, 32, 256, 1024, len(X)]:
+        rows = X[:n]
+        n_repeat = max(1, repeat * 32 // max(n, 32))
+        old = latency(model.decision_function, rows, n_repeat) * 1000
+        new = latency(compiled.decision_function, rows, n_repeat) * 1000
+        print(f"{n:<10} | {old:<12.3f} | {new:<13.3f} | {old / new:<8.1f}x")
+    print("="*60)
+
+if __name__ == "__main__":
+    compile_model(sys.argv[1] if len(sys.argv) > 1 else 'models/anomaly_model.pkl')
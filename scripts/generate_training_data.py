@@ -7,8 +7,8 @@ import logging
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.ocr import OCREngine
-from src.core.extraction import DataExtractor
+from src.core.ocr_cache import OCRCache
+from src.core.registry import get_ocr_engine, get_extractor, get_corpus, use_scripts_ocr_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,21 +22,31 @@ def generate_dataset():
     images = glob.glob(os.path.join(image_dir, "*.jpg")) + glob.glob(os.path.join(image_dir, "*.png"))
     logger.info(f"Found {len(images)} images in {image_dir}")
     
-    ocr = OCREngine()
-    extractor = DataExtractor()
+    use_scripts_ocr_cache()
+    ocr = get_ocr_engine()
+    extractor = get_extractor()
+    # Full OCR text of every slip, so scripts/reextract_corpus.py can re-run extraction without OCR
+    corpus = get_corpus()
     
     records = []
     
-    for i, img_path in enumerate(images):
-        filename = os.path.basename(img_path)
+    # 1. OCR (batched across images)
+    ocr_results = ocr.extract_text_batch(images)
+    
+    # 2. Extraction, batched through spaCy for all successfully OCR'd texts
+    extracted = iter(extractor.extract_entities_batch([r["text"] for r in ocr_results if not r["error"]]))
+    
+    for i, ocr_result in enumerate(ocr_results):
+        filename = os.path.basename(ocr_result["path"])
         logger.info(f"[{i+1}/{len(images)}] Processing {filename}...")
         
         try:
-            # 1. OCR
-            text = ocr.extract_text(img_path)
-            
-            # 2. Extraction
-            data = extractor.extract_entities(text)
+            if ocr_result["error"]:
+                raise RuntimeError(ocr_result["error"])
+            text = ocr_result["text"]
+            data = next(extracted)
+            if corpus is not None:
+                corpus.add_document(OCRCache.file_digest(ocr_result["path"]), filename, text)
             
             # 3. Prepare Record
             salary = data.get("salary", 0.0)
@@ -0,0 +1,162 @@
+import sys
+import os
+import argparse
+import csv
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.corpus import OCRCorpus
+from src.core.layout import DocumentLayout
+from src.core.pipeline import assess_extraction_batch
+from src.core.registry import get_extractor, get_fraud_detector
+from src.core.validation import Validator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Result fields compared between the stored and the new run
+ASSESSMENT_FIELDS = ["validation_issues", "fraud_status", "risk_score", "eligibility"]
+
+_validator = None
+
+def _process_chunk(documents):
+    """
+    Extraction, validation and scoring of a chunk of corpus documents (runs in a worker).
+    :return: List of (doc_id, result)
+    """
+    global _validator
+    if _validator is None:
+        _validator = Validator()
+    extractor = get_extractor()
+    fraud_detector = get_fraud_detector()
+
+    layouts = [DocumentLayout.from_dict(doc["layout"]) if doc["layout"] else None for doc in documents]
+    extracted = extractor.extract_entities_batch([doc["text"] for doc in documents], layouts=layouts)
+    # Duplicate/PAN signals depend on the submission history, so the stored ones are kept
+    assessments = assess_extraction_batch(extracted, _validator, fraud_detector,
+                                          fraud_signals=[doc.get("fraud_signals") for doc in documents])
+    return [
+        (doc["doc_id"], {"extracted_data": data, **assessment})
+        for doc, data, assessment in zip(documents, extracted, assessments)
+    ]
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _iter_processed(chunks, workers):
+    """
+    Process (chunk, context) pairs, yielding (chunk, context, chunk results).
+    With several workers at most 2 * workers chunks are in flight, so the
+    corpus is read only as fast as it is processed; chunks are yielded in
+    completion order.
+    """
+    if workers <= 1:
+        for chunk, context in chunks:
+            yield chunk, context, _process_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        for chunk, context in chunks:
+            in_flight[executor.submit(_process_chunk, chunk)] = (chunk, context)
+            if len(in_flight) >= 2 * workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield (*in_flight.pop(future), future.result())
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield (*in_flight.pop(future), future.result())
+
+def _flatten(result):
+    """Comparable {field: value} view of a stored pipeline result."""
+    if not result:
+        return {}
+    fields = {k: v for k, v in result.get("extracted_data", {}).items() if k != "extraction_tiers"}
+    fields.update({k: result.get(k) for k in ASSESSMENT_FIELDS})
+    return fields
+
+def reextract(corpus_path, output_file, workers, chunk_size, update):
+    corpus = OCRCorpus(corpus_path)
+    total = corpus.count()
+    if not total:
+        print(f"No documents in {corpus_path}")
+        return
+    logger.info(f"Re-extracting {total} documents with {workers} worker(s)...")
+    fingerprint = get_extractor().fingerprint() if update else None
+
+    def chunks():
+        # Stored results are looked up per chunk rather than loaded for the whole corpus
+        for chunk in _chunks(corpus.iter_documents(), chunk_size):
+            baseline = corpus.results(doc["doc_id"] for doc in chunk)
+            for doc in chunk:
+                doc["fraud_signals"] = (baseline.get(doc["doc_id"]) or {}).get("fraud_signals")
+            yield chunk, baseline
+
+    processed = 0
+    unstored = 0
+    changed_docs = 0
+    field_counts = {}
+    start = time.perf_counter()
+    with open(output_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["doc_id", "filename", "field", "old", "new"])
+        writer.writeheader()
+        for chunk, baseline, chunk_results in _iter_processed(chunks(), workers):
+            # Diff against the stored results
+            filenames = {doc["doc_id"]: doc["filename"] for doc in chunk}
+            for doc_id, result in chunk_results:
+                processed += 1
+                if doc_id not in baseline:
+                    unstored += 1
+                old, new = _flatten(baseline.get(doc_id)), _flatten(result)
+                changed = [field for field in sorted(set(old) | set(new)) if old.get(field) != new.get(field)]
+                if changed:
+                    changed_docs += 1
+                for field in changed:
+                    field_counts[field] = field_counts.get(field, 0) + 1
+                    writer.writerow({
+                        "doc_id": doc_id,
+                        "filename": filenames.get(doc_id, ""),
+                        "field": field,
+                        "old": json.dumps(old.get(field)),
+                        "new": json.dumps(new.get(field))
+                    })
+            if update:
+                corpus.store_results(chunk_results, fingerprint=fingerprint)
+    elapsed = time.perf_counter() - start
+
+    if update:
+        logger.info("Stored the new results as the baseline")
+
+    # Print Summary
+    print("\n" + "="*40)
+    print("Re-extraction Complete!")
+    print(f"Documents: {processed} in {elapsed:.1f}s")
+    print(f"Changed documents: {changed_docs} (without a stored result: {unstored})")
+    for field, count in sorted(field_counts.items(), key=lambda item: -item[1]):
+        print(f"  {field:<20} {count}")
+    print(f"Diff written to {output_file}")
+    print("="*40)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run extraction, validation and scoring over the stored OCR corpus")
+    parser.add_argument("--corpus", default=os.getenv("OCR_CORPUS_PATH", "data/ocr_corpus.sqlite"))
+    parser.add_argument("--output", default="data/reextract_diff.csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--update", action="store_true", help="Store the new results as the baseline")
+    args = parser.parse_args()
+    reextract(args.corpus, args.output, args.workers, args.chunk_size, args.update)
@@ -0,0 +1,167 @@
+import sys
+import os
+import argparse
+import logging
+import time
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.feature_log import FeatureLog
+from src.core.model_store import ModelStore
+from src.core.validation import FEATURE_NAMES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def reservoir_sample(chunks, size, rng):
+    """
+    Uniform sample of at most `size` rows from a stream of (n, 4) chunks
+    (Algorithm R, vectorized per chunk); memory stays at `size` rows.
+    :return: (sample, rows seen)
+    """
+    sample = np.empty((size, 4), dtype=np.float32)
+    seen = 0
+    for chunk in chunks:
+        # Fill the reservoir first
+        take = min(size - seen, len(chunk)) if seen < size else 0
+        sample[seen:seen + take] = chunk[:take]
+        rest = chunk[take:]
+        positions = np.arange(seen + take, seen + len(chunk))
+        seen += len(chunk)
+        if not len(rest):
+            continue
+        # Row number i replaces a random slot with probability size / (i + 1)
+        slots = rng.integers(0, positions + 1)
+        keep = slots < size
+        sample[slots[keep]] = rest[keep]
+    return sample[:min(seen, size)], seen
+
+def ks_statistic(a, b):
+    """Two-sample Kolmogorov-Smirnov statistic: largest gap between the empirical CDFs."""
+    a, b = np.sort(a), np.sort(b)
+    points = np.concatenate([a, b])
+    return float(np.max(np.abs(np.searchsorted(a, points, side="right") / len(a)
+                               - np.searchsorted(b, points, side="right") / len(b))))
+
+def retrain(log_path, store_root, sample_size, holdout, contamination, min_agreement, max_shift, min_rows,
+            max_age_days, dry_run, seed, rate_tolerance=0.05, force=False):
+    """
+    Train a new anomaly model on a reservoir sample of the feature log and
+    publish it only if it agrees with the current model on a holdout split:
+    at least `min_agreement` of the holdout rows get the same label, and the
+    KS distance between the two models' decision scores is at most
+    `max_shift`. (The holdout anomaly rate alone says little, since
+    IsolationForest sets its threshold to hit `contamination` by construction.)
+
+    The first model trained on logged features replaces the synthetic
+    bootstrap model (scripts/train_model.py), whose distribution it is not
+    expected to match; it is only checked on its own holdout (anomaly rate
+    within `rate_tolerance` of `contamination`). `force` publishes a
+    candidate that fails the gate, for operator-approved distribution shifts.
+    Meant to run on a schedule (e.g. nightly from cron); running API workers
+    pick up the new version.
+    """
+    if not os.path.exists(log_path):
+        print(f"No feature log at {log_path}")
+        return 1
+    # Read-only: API workers keep appending while the job runs
+    log = FeatureLog(log_path, readonly=True)
+    rng = np.random.default_rng(seed)
+    since = time.time() - max_age_days * 86400 if max_age_days else None
+
+    sample, seen = reservoir_sample(log.iter_chunks(since=since), sample_size, rng)
+    logger.info(f"Sampled {len(sample)} of {seen} logged documents")
+    if len(sample) < min_rows:
+        print(f"Only {len(sample)} rows in the feature log (need {min_rows}); keeping the current model")
+        return 1
+
+    order = rng.permutation(len(sample))
+    n_holdout = max(1, int(len(sample) * holdout))
+    X_holdout, X_train = sample[order[:n_holdout]], sample[order[n_holdout:]]
+
+    logger.info(f"Training Isolation Forest on {len(X_train)} rows, holdout {len(X_holdout)}...")
+    model = IsolationForest(contamination=contamination, random_state=seed)
+    model.fit(X_train)
+    labels = model.predict(X_holdout)
+    scores = model.decision_function(X_holdout)
+    anomaly_rate = float(np.mean(labels == -1))
+
+    store = ModelStore(store_root)
+    current_version, current_model = store.load()
+    bootstrap = current_model is None or store.metadata(current_version).get("source") != "feature_log"
+    current_rate = agreement = shift = None
+    if current_model is not None:
+        current_labels = np.asarray(current_model.predict(X_holdout))
+        current_rate = float(np.mean(current_labels == -1))
+        agreement = float(np.mean(current_labels == labels))
+        shift = ks_statistic(np.asarray(current_model.decision_function(X_holdout)), scores)
+
+    print("\n" + "="*40)
+    print(f"Holdout anomaly rate: {anomaly_rate:.3f} (contamination {contamination:.3f})")
+    if current_model is not None:
+        print(f"Current model ({current_version}) on the same holdout: {current_rate:.3f}")
+        print(f"Label agreement: {agreement:.3f} (min {min_agreement:.3f})")
+        print(f"Score distribution shift (KS): {shift:.3f} (max {max_shift:.3f})")
+    if bootstrap:
+        # Nothing trained on real features yet: only check the candidate against its own holdout
+        print(f"Current model is {'missing' if current_model is None else 'the synthetic bootstrap model'}; "
+              f"checking the holdout anomaly rate only (+/- {rate_tolerance:.3f})")
+        passed = abs(anomaly_rate - contamination) <= rate_tolerance
+    else:
+        passed = agreement >= min_agreement and shift <= max_shift
+    if not passed:
+        if not force:
+            print("Candidate failed the publish gate; not publishing (use --force to publish anyway)")
+            print("="*40)
+            return 1
+        print("Candidate failed the publish gate; publishing anyway (--force)")
+    if dry_run:
+        print("Dry run; not publishing")
+        print("="*40)
+        return 0
+
+    version = store.publish(model, metadata={
+        "source": "feature_log",
+        "features": FEATURE_NAMES,
+        "rows_seen": seen,
+        "training_rows": len(X_train),
+        "holdout_rows": len(X_holdout),
+        "contamination": contamination,
+        "holdout_anomaly_rate": anomaly_rate,
+        "previous_version": current_version,
+        "previous_holdout_anomaly_rate": current_rate,
+        "holdout_label_agreement": agreement,
+        "holdout_score_shift": shift,
+        "forced": force and not passed
+    })
+    print(f"Published model version {version}")
+    print("="*40)
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrain the anomaly model on the logged features of processed documents")
+    parser.add_argument("--log", default=os.getenv("FEATURE_LOG_PATH", "data/feature_log.bin"))
+    parser.add_argument("--store", default=os.getenv("ANOMALY_MODEL_STORE", "models/anomaly"))
+    parser.add_argument("--sample-size", type=int, default=100000, help="Reservoir size (bounds memory)")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--contamination", type=float, default=0.1)
+    parser.add_argument("--min-agreement", type=float, default=0.9,
+                        help="Share of holdout rows the candidate must label like the current model")
+    parser.add_argument("--max-shift", type=float, default=0.2,
+                        help="Largest KS distance allowed between the current and candidate holdout scores")
+    parser.add_argument("--rate-tolerance", type=float, default=0.05,
+                        help="Allowed |holdout anomaly rate - contamination| when replacing the bootstrap model")
+    parser.add_argument("--force", action="store_true",
+                        help="Publish even if the candidate fails the gate (operator-approved shift)")
+    parser.add_argument("--min-rows", type=int, default=1000)
+    parser.add_argument("--max-age-days", type=float, default=0, help="Only use documents logged in this window (0 = all)")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    sys.exit(retrain(args.log, args.store, args.sample_size, args.holdout, args.contamination, args.min_agreement,
+                     args.max_shift, args.min_rows, args.max_age_days, args.dry_run, args.seed,
+                     rate_tolerance=args.rate_tolerance, force=args.force))
@@ -6,8 +6,7 @@ import glob
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.ocr import OCREngine
-from src.core.extraction import DataExtractor
+from src.core.registry import get_ocr_engine, get_extractor, use_scripts_ocr_cache
 
 def test_random_sample(n=10):
     # 1. Find all images
@@ -23,18 +22,21 @@ def test_random_sample(n=10):
     
     print(f"Testing on {len(sample_images)} random images...\n")
     
-    ocr = OCREngine()
-    extractor = DataExtractor()
+    use_scripts_ocr_cache()
+    ocr = get_ocr_engine()
+    extractor = get_extractor()
     
     results = []
     
-    for img_path in sample_images:
-        filename = os.path.basename(img_path)
+    # Run OCR over the whole sample in batches
+    for ocr_result in ocr.iter_extract_text(sample_images):
+        filename = os.path.basename(ocr_result["path"])
         print(f"Processing: {filename}...")
         
         try:
-            # Run OCR
-            text = ocr.extract_text(img_path)
+            if ocr_result["error"]:
+                raise RuntimeError(ocr_result["error"])
+            text = ocr_result["text"]
             
             # Run Extraction
             data = extractor.extract_entities(text)
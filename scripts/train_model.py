@@ -2,8 +2,14 @@ import numpy as np
 import joblib
 from sklearn.ensemble import IsolationForest
 import os
+import sys
 import random
 
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.model_store import ModelStore
+
 def generate_synthetic_data(n_samples=100):
     """
     Generate synthetic salary data.
@@ -60,6 +66,15 @@ def train_model():
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
     joblib.dump(model, model_path)
     print(f"Model saved to {model_path}")
+
+    # Publish a new version; running API workers hot-swap to it
+    store = ModelStore(os.getenv("ANOMALY_MODEL_STORE", os.path.join("models", "anomaly")))
+    version = store.publish(model, metadata={
+        "source": "synthetic",
+        "training_rows": len(X_train),
+        "contamination": 0.1
+    })
+    print(f"Published model version {version} to {store.root}")
     
     # Quick Test
     test_fraud = [[200000, 80000, 40000, 0]] # Should be -1 (Anomaly)
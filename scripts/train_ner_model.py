@@ -11,7 +11,7 @@ from tqdm import tqdm
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.ocr import OCREngine
+from src.core.registry import get_ocr_engine, use_scripts_ocr_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,22 +22,25 @@ IMAGE_DIR = "data/kaggle_dataset/Salary Slip"
 MODEL_DIR = "models/ner_model"
 
 def create_training_data(df):
-    ocr = OCREngine()
+    use_scripts_ocr_cache()
+    ocr = get_ocr_engine()
     TRAIN_DATA = []
     
     logger.info("Generating training data (this involves running OCR on all images)...")
     
-    # Use tqdm for progress bar
-    for index, row in tqdm(df.iterrows(), total=len(df), desc="Processing Images", unit="img"):
+    rows = [row for _, row in df.iterrows() if os.path.exists(os.path.join(IMAGE_DIR, row['filename']))]
+    img_paths = [os.path.join(IMAGE_DIR, row['filename']) for row in rows]
+    
+    # Use tqdm for progress bar; OCR runs in batches over all images
+    ocr_results = ocr.iter_extract_text(img_paths)
+    for row, ocr_result in tqdm(zip(rows, ocr_results), total=len(rows), desc="Processing Images", unit="img"):
         filename = row['filename']
-        img_path = os.path.join(IMAGE_DIR, filename)
-        
-        if not os.path.exists(img_path):
-            continue
             
         try:
+            if ocr_result["error"]:
+                raise RuntimeError(ocr_result["error"])
             # Get full text
-            text = ocr.extract_text(img_path)
+            text = ocr_result["text"]
             
             entities = []
             
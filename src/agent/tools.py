@@ -1,22 +1,18 @@
 from langchain.tools import Tool
-from src.core.ocr import OCREngine
-from src.core.extraction import DataExtractor
-from src.core.validation import Validator, FraudDetector
+from src.core.registry import get_ocr_engine, get_extractor, get_fraud_detector
+from src.core.validation import Validator
 import json
 
-# Initialize Core Modules
-ocr_engine = OCREngine()
-extractor = DataExtractor()
+# Heavy modules come from the shared registry (same instances as the API)
 validator = Validator()
-fraud_detector = FraudDetector()
 
 def ocr_tool_func(file_path):
     """Reads text from a document (PDF/Image)."""
-    return ocr_engine.extract_text(file_path)
+    return get_ocr_engine().extract_text(file_path)
 
 def extraction_tool_func(text):
     """Extracts structured fields (PAN, Name, Salary) from text."""
-    data = extractor.extract_entities(text)
+    data = get_extractor().extract_entities(text)
     return json.dumps(data)
 
 def validation_tool_func(json_data):
@@ -34,7 +30,7 @@ def fraud_check_tool_func(json_data):
     # For the mock model we created, we need 4 components. 
     # Let's assume we extracted them or default to 0.
     components = [salary, 0, 0, 0] 
-    result = fraud_detector.check_anomaly(components)
+    result = get_fraud_detector().check_anomaly(components)
     return result
 
 # Define LangChain Tools
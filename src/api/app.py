@@ -8,10 +8,11 @@ from flask import Flask, request, jsonify
 import uuid
 from werkzeug.utils import secure_filename
 from src.agent.loan_agent import LoanAgent
-from src.core.ocr import OCREngine
-from src.core.extraction import DataExtractor
-from src.core.validation import Validator, FraudDetector
-from src.core.scoring import calculate_risk_score
+from src.core.registry import registry, get_ocr_engine, get_extractor, get_fraud_detector, get_corpus, get_feature_log, get_duplicate_index, get_peer_stats
+from src.core.validation import Validator
+from src.core.pipeline import IncrementalExtraction, assess_extraction
+from src.core.ocr_cache import OCRCache
+from src.core.duplicates import document_hashes
 import logging
 import json
 
@@ -35,15 +36,47 @@ except Exception as e:
     logger.warning(f"Agent initialization failed (likely missing API key): {e}")
     HAS_AGENT = False
 
-ocr_engine = OCREngine()
-extractor = DataExtractor()
+# Heavy components (OCR reader, spaCy pipelines, fraud model) are loaded lazily
+# through the shared registry, so the agent tools reuse the same instances
 validator = Validator()
-fraud_detector = FraudDetector()
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
+@app.route('/models', methods=['GET'])
+def model_stats():
+    """
+    Load state, load time and memory of the shared heavy components.
+    """
+    return jsonify(registry.stats()), 200
+
+@app.route('/ocr_stats', methods=['GET'])
+def ocr_stats():
+    """
+    OCR cache and tesseract pool metrics (pool size, idle workers, queue depth).
+    """
+    if not registry.is_loaded("ocr_engine"):
+        return jsonify({"loaded": False}), 200
+    return jsonify(get_ocr_engine().stats()), 200
+
+@app.route('/admin/reload_model', methods=['POST'])
+def reload_model():
+    """
+    Hot-swap the fraud model to the store's CURRENT version, or activate
+    {"version": "v0003"} first (e.g. to roll back). Requests already scoring
+    finish on the previous model.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        result = get_fraud_detector().reload(data.get("version"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error reloading fraud model: {e}")
+        return jsonify({"error": str(e)}), 500
+    return jsonify(result), 200
+
 @app.route('/upload_document', methods=['POST'])
 def upload_document():
     if 'file' not in request.files:
@@ -106,39 +139,71 @@ def process_manual():
         return jsonify({"error": "Invalid file path"}), 400
 
     try:
-        # 1. OCR
-        text = ocr_engine.extract_text(file_path)
-        
+        # 1. OCR (digital PDF pages are read from their text layer instead)
         # 2. Extraction
-        extracted_data = extractor.extract_entities(text)
-        
-        # 3. Validation
-        validation_issues = validator.validate_data(extracted_data)
+        if data.get('early_exit'):
+            # OCR + extraction page by page, stopping once name/PAN/net pay are found
+            incremental = IncrementalExtraction(get_ocr_engine(), get_extractor(), file_path)
+            extracted_data = incremental.run()
+            document = {"text": incremental.text, "pages": incremental.pages}
+        else:
+            # With "layout": true, word boxes are kept for spatial key/value pairing
+            if data.get('layout'):
+                document = get_ocr_engine().extract_layout(file_path)
+            else:
+                document = get_ocr_engine().extract_document(file_path)
+            extracted_data = get_extractor().extract_entities(document["text"], layout=document.get("layout"))
         
-        # 4. Fraud Check (Simplified)
-        # Pass the full extracted data so the detector can find components like Basic, HRA, etc.
-        fraud_result = fraud_detector.check_anomaly(extracted_data)
+        doc_id = OCRCache.file_digest(file_path)
+
+        # Re-uploaded slips (same file or same image) and PANs reused across applications
+        fraud_signals = []
+        duplicate_index = get_duplicate_index()
+        if duplicate_index is not None:
+            try:
+                # The file digest identifies the submission, so a retried request isn't its own duplicate
+                fraud_signals = duplicate_index.check_and_record(
+                    doc_id, doc_id, os.path.basename(file_path),
+                    pan=extracted_data.get("pan"), net_pay=extracted_data.get("net_pay"),
+                    hashes=document_hashes(document, file_path), text=document["text"]
+                )
+            except Exception as e:
+                logger.warning(f"Duplicate check failed: {e}")
+
+        # Salary far out of line with the same employer / designation
+        peer_stats = get_peer_stats()
+        if peer_stats is not None:
+            try:
+                peer_signals = peer_stats.check(extracted_data)
+                # A re-uploaded slip would be counted twice
+                if not any(signal["signal"].startswith("duplicate_") for signal in fraud_signals):
+                    peer_stats.update(extracted_data)
+                fraud_signals += peer_signals
+            except Exception as e:
+                logger.warning(f"Peer-group check failed: {e}")
         
-        if isinstance(fraud_result, dict):
-            fraud_status = fraud_result["status"]
-            fraud_reason = fraud_result["reason"]
-        else:
-            # Fallback for legacy string response
-            fraud_status = fraud_result
-            fraud_reason = None
+        # 3. Validation, 4. Fraud Check, 5. Risk Logic
+        # (the model features are also logged for retraining, scripts/retrain_anomaly_model.py)
+        assessment = assess_extraction(extracted_data, validator, get_fraud_detector(), get_feature_log(),
+                                       fraud_signals=fraud_signals)
+        risk_score = assessment["risk_score"]
+        eligibility = assessment["eligibility"]
         
-        # 5. Risk Logic
-        risk_result = calculate_risk_score(validation_issues, fraud_status)
-        risk_score = risk_result["risk_score"]
-        eligibility = risk_result["eligibility"]
+        # Keep the full OCR output so rule changes can be re-evaluated without OCR
+        # (early-exit runs only read part of the document, so they are not stored)
+        corpus = get_corpus()
+        if corpus is not None and not data.get('early_exit'):
+            try:
+                corpus.add_document(doc_id, os.path.basename(file_path), document["text"], document.get("layout"))
+                corpus.store_result(doc_id, {"extracted_data": extracted_data, **assessment},
+                                    fingerprint=get_extractor().fingerprint())
+            except Exception as e:
+                logger.warning(f"Could not store document in the OCR corpus: {e}")
         
         response = {
             "extracted_data": extracted_data,
-            "validation_issues": validation_issues,
-            "fraud_status": fraud_status,
-            "fraud_reason": fraud_reason,
-            "risk_score": risk_score,
-            "eligibility": eligibility,
+            **assessment,
+            "pages": [{k: page[k] for k in ("page", "source", "pass") if k in page} for page in document["pages"]],
             "summary": f"Document processed. Status: {eligibility}. Risk Score: {risk_score}"
         }
         
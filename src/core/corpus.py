@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class OCRCorpus:
+    """
+    Persistent store of the full OCR output (text and, where available, word
+    layout) of every processed document, plus the last pipeline result for
+    each one. Extraction rules can then be re-evaluated over the whole corpus
+    (scripts/reextract_corpus.py) without running OCR again.
+
+    Documents are keyed on the SHA-256 of the file contents, so re-uploads of
+    the same file are stored once.
+    """
+
+    def __init__(self, path="data/ocr_corpus.sqlite"):
+        """
+        :param path: SQLite database file (created if missing)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                filename TEXT,
+                text TEXT NOT NULL,
+                layout TEXT,
+                created REAL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                doc_id TEXT PRIMARY KEY REFERENCES documents(doc_id),
+                fingerprint TEXT,
+                result TEXT NOT NULL,
+                updated REAL
+            );
+        """)
+        self._conn.commit()
+
+    def add_document(self, doc_id, filename, text, layout=None):
+        """
+        Store (or replace) the OCR output of a document.
+        :param layout: Optional DocumentLayout
+        """
+        layout_json = json.dumps(layout.to_dict()) if layout is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, filename, text, layout, created) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, filename, text, layout_json, time.time())
+            )
+            self._conn.commit()
+
+    def store_result(self, doc_id, result, fingerprint=None):
+        """
+        Record the pipeline result (extracted data, validation, scoring) of a document.
+        :param fingerprint: DataExtractor.fingerprint() the result was produced with
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (doc_id, fingerprint, result, updated) VALUES (?, ?, ?, ?)",
+                (doc_id, fingerprint, json.dumps(result), time.time())
+            )
+            self._conn.commit()
+
+    def store_results(self, results, fingerprint=None):
+        """
+        Bulk variant of store_result.
+        :param results: Iterable of (doc_id, result)
+        """
+        now = time.time()
+        rows = [(doc_id, fingerprint, json.dumps(result), now) for doc_id, result in results]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (doc_id, fingerprint, result, updated) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def get_result(self, doc_id):
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM results WHERE doc_id = ?", (doc_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def results(self, doc_ids=None):
+        """
+        Stored results as {doc_id: result}.
+        :param doc_ids: Only these documents (default: all); ids without a result are left out
+        """
+        if doc_ids is None:
+            with self._lock:
+                rows = self._conn.execute("SELECT doc_id, result FROM results").fetchall()
+            return {doc_id: json.loads(result) for doc_id, result in rows}
+
+        doc_ids = list(doc_ids)
+        found = {}
+        # Stay below SQLite's default limit of 999 bound parameters
+        for start in range(0, len(doc_ids), 900):
+            batch = doc_ids[start:start + 900]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT doc_id, result FROM results WHERE doc_id IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+            found.update((doc_id, json.loads(result)) for doc_id, result in rows)
+        return found
+
+    def iter_documents(self, batch_size=256):
+        """
+        Yield {"doc_id", "filename", "text", "layout"} dicts (layout as the
+        DocumentLayout.to_dict form, or None), fetched in batches.
+        """
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT doc_id, filename, text, layout FROM documents WHERE doc_id > ? ORDER BY doc_id LIMIT ?",
+                    (last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for doc_id, filename, text, layout in rows:
+                yield {"doc_id": doc_id, "filename": filename, "text": text,
+                       "layout": json.loads(layout) if layout else None}
+            last = rows[-1][0]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 256-bit pHash: the 16x16 lowest DCT frequencies of a 64x64 grayscale thumbnail.
+# A 64-bit (8x8) hash is dominated by the page layout, so statements from the
+# same bank or slips from the same employer land within a few bits of each other.
+HASH_SIZE = 16
+_THUMB_SIZE = HASH_SIZE * 4
+HASH_BITS = HASH_SIZE * HASH_SIZE
+# Multi-index hashing: a hash within Hamming distance r < HASH_CHUNKS of a stored
+# one matches it exactly in at least one 16-bit chunk, so each lookup is
+# HASH_CHUNKS indexed equality probes plus a popcount over the few candidates.
+CHUNK_BITS = 16
+HASH_CHUNKS = HASH_BITS // CHUNK_BITS
+MAX_HASH_DISTANCE = HASH_CHUNKS - 1
+
+# Unnormalized DCT-II basis (16 lowest frequencies); scaling doesn't change which coefficients exceed the median
+_k = np.arange(_THUMB_SIZE)
+_DCT = np.cos(np.pi * (2 * _k[None, :] + 1) * _k[:HASH_SIZE, None] / (2 * _THUMB_SIZE))
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# "Salary Slip NOV - 19", "Pay period: January 2023", "for the month of Mar'24"
+_MONTH_YEAR = re.compile(
+    r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?[\s\-/,']*((?:19|20)\d{2}|\d{2})\b", re.IGNORECASE
+)
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+
+def phash(image):
+    """
+    256-bit perceptual hash of a page image, as a 64-character hex string.
+    Robust to re-encoding, rescaling and small brightness changes.
+    """
+    thumb = np.asarray(image.convert("L").resize((_THUMB_SIZE, _THUMB_SIZE), Image.Resampling.BOX), dtype=np.float64)
+    coefficients = (_DCT @ thumb @ _DCT.T).ravel()
+    # The DC term (overall brightness) is left out of the median
+    bits = coefficients > np.median(coefficients[1:])
+    return np.packbits(bits).tobytes().hex()
+
+
+def image_file_hashes(file_path):
+    """
+    pHash of an image file, for documents whose OCR produced no page hashes
+    (e.g. cached results or mock OCR). PDFs are never rasterized here; their
+    hashes come from the pages the OCR pass rasterized.
+    :return: List of hex hashes; empty for PDFs or unreadable files
+    """
+    if os.path.splitext(file_path)[1].lower() == ".pdf":
+        return []
+    try:
+        with Image.open(file_path) as image:
+            # Let the JPEG decoder downscale while decoding (much cheaper on phone photos)
+            image.draft("L", (_THUMB_SIZE * 2, _THUMB_SIZE * 2))
+            return [phash(image)]
+    except Exception as e:
+        logger.warning(f"Could not hash {os.path.basename(file_path)}: {e}")
+        return []
+
+
+def document_hashes(document, file_path):
+    """Page hashes recorded by OCREngine, else the hash of the image file itself."""
+    hashes = [page["image_hash"] for page in document.get("pages", []) if page.get("image_hash")]
+    return hashes or image_file_hashes(file_path)
+
+
+def content_digest(text):
+    """Digest of the OCR text with case, whitespace and punctuation removed."""
+    normalized = _NON_ALNUM.sub("", (text or "").lower())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest() if normalized else None
+
+
+def find_pay_period(text):
+    """Pay month of a slip as "YYYY-MM", from the first month-name + year in its text (None if absent)."""
+    match = _MONTH_YEAR.search(text or "")
+    if not match:
+        return None
+    year = int(match.group(2))
+    if year < 100:
+        year += 2000
+    return f"{year:04d}-{_MONTHS.index(match.group(1).lower()) + 1:02d}"
+
+
+def hamming(a, b):
+    """Hamming distance between two hex hashes."""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _chunks(hex_hash):
+    step = CHUNK_BITS // 4
+    return [int(hex_hash[i:i + step], 16) for i in range(0, len(hex_hash), step)]
+
+
+class DuplicateIndex:
+    """
+    Persistent index of past submissions for duplicate and velocity checks:
+
+    - PAN -> submissions, bucketed by time, so "how many different slips
+      carried this PAN in the last N days, and with which salaries" is one
+      index range scan. Slips are told apart by pay period (or content when
+      the period can't be read), so a loan file with the last few monthly
+      slips, or a retried upload, is not mistaken for PAN reuse.
+    - Perceptual hashes of the page images, multi-index hashed into 16-bit
+      chunks, so re-uploads of the same slip (renamed, re-encoded, rescaled)
+      are found without scanning the history. Documents that share a
+      template still look alike, so an image match is only reported when
+      the content agrees too (same OCR text, or same PAN and net pay).
+
+    A submission is identified by the caller (the API uses the file digest):
+    recording the same one again within `retry_seconds` is a retry and is not
+    flagged, later it is reported as a duplicate file.
+    """
+
+    def __init__(self, path="data/duplicates.sqlite", window_days=30, bucket_seconds=86400,
+                 velocity_threshold=6, max_distance=10, salary_tolerance=0.05, retry_seconds=3600):
+        """
+        :param path: SQLite database file (created if missing)
+        :param window_days: How far back PAN submissions are compared
+        :param bucket_seconds: Width of the PAN time buckets
+        :param velocity_threshold: Different slips (pay periods) of one PAN within the window that raise a signal
+        :param max_distance: Hamming distance (of 256 bits) up to which page hashes count as the same image
+        :param salary_tolerance: Relative net pay difference treated as a different salary
+        :param retry_seconds: Re-recording a submission within this time is a retry, not a duplicate
+        """
+        if not 0 <= max_distance <= MAX_HASH_DISTANCE:
+            raise ValueError(f"max_distance must be between 0 and {MAX_HASH_DISTANCE}")
+        self.path = path
+        self.window_seconds = window_days * 86400
+        self.bucket_seconds = bucket_seconds
+        self.velocity_threshold = velocity_threshold
+        self.max_distance = max_distance
+        self.salary_tolerance = salary_tolerance
+        self.retry_seconds = retry_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS submissions (
+                submission_id TEXT PRIMARY KEY,
+                doc_id TEXT,
+                filename TEXT,
+                pan TEXT,
+                net_pay REAL,
+                pay_period TEXT,
+                content_digest TEXT,
+                bucket INTEGER,
+                created REAL
+            );
+            CREATE INDEX IF NOT EXISTS submissions_pan ON submissions(pan, bucket);
+            CREATE INDEX IF NOT EXISTS submissions_doc ON submissions(doc_id);
+            CREATE TABLE IF NOT EXISTS image_hashes (
+                submission_id TEXT,
+                page INTEGER,
+                hash TEXT,
+                PRIMARY KEY (submission_id, page)
+            );
+            CREATE TABLE IF NOT EXISTS image_hash_chunks (
+                chunk INTEGER,
+                value INTEGER,
+                submission_id TEXT,
+                page INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS image_hash_chunks_value ON image_hash_chunks(chunk, value);
+            CREATE INDEX IF NOT EXISTS image_hash_chunks_submission ON image_hash_chunks(submission_id);
+        """)
+        self._conn.commit()
+
+    def check_and_record(self, submission_id, doc_id, filename, pan=None, net_pay=None, hashes=(),
+                         text=None, pay_period=None, now=None):
+        """
+        Compare a submission against the history, then add it.
+        :param doc_id: SHA-256 of the file contents
+        :param hashes: Page hashes (see document_hashes())
+        :param text: OCR text, used to confirm image matches
+        :param pay_period: "YYYY-MM" of the slip (default: find_pay_period(text))
+        :return: List of {"signal", "reason", "matches"} dicts (empty if nothing suspicious)
+        """
+        now = time.time() if now is None else now
+        digest = content_digest(text)
+        period = pay_period if pay_period is not None else find_pay_period(text)
+        with self._lock:
+            signals = self._check(submission_id, doc_id, pan, net_pay, hashes, digest, period, now)
+            self._record(submission_id, doc_id, filename, pan, net_pay, hashes, digest, period, now)
+        return signals
+
+    def similar_images(self, hashes, exclude=()):
+        """
+        Submissions with a page within max_distance of any of `hashes`.
+        :return: {submission_id: smallest distance}
+        """
+        with self._lock:
+            return {other_id: row[0] for other_id, row in self._similar(hashes, exclude).items()}
+
+    def _similar(self, hashes, exclude=()):
+        """
+        Candidates sharing a 16-bit chunk with any query hash, fetched with
+        their page hash and submission in one query per batch of hashes.
+        :return: {submission_id: (distance, filename, content_digest, pan, net_pay)}
+        """
+        near = {}
+        hashes = list(hashes)
+        # Stay below SQLite's default limit of 999 bound parameters
+        batch = 999 // (2 * HASH_CHUNKS)
+        for start in range(0, len(hashes), batch):
+            queries = hashes[start:start + batch]
+            params = [p for value in queries for chunk, part in enumerate(_chunks(value)) for p in (chunk, part)]
+            rows = self._conn.execute(
+                "SELECT s.submission_id, h.hash, s.filename, s.content_digest, s.pan, s.net_pay "
+                "FROM (SELECT DISTINCT submission_id, page FROM image_hash_chunks WHERE "
+                + " OR ".join("(chunk = ? AND value = ?)" for _ in range(len(queries) * HASH_CHUNKS))
+                + ") c JOIN image_hashes h ON h.submission_id = c.submission_id AND h.page = c.page "
+                "JOIN submissions s ON s.submission_id = c.submission_id",
+                params
+            ).fetchall()
+            for other_id, other_hash, *details in rows:
+                if other_id in exclude:
+                    continue
+                distance = min(hamming(value, other_hash) for value in queries)
+                if distance <= self.max_distance and distance < near.get(other_id, (HASH_BITS + 1,))[0]:
+                    near[other_id] = (distance, *details)
+        return near
+
+    def _check(self, submission_id, doc_id, pan, net_pay, hashes, digest, period, now):
+        signals = []
+
+        previous = self._conn.execute(
+            "SELECT filename, created FROM submissions WHERE submission_id = ?", (submission_id,)
+        ).fetchone()
+        same_file = self._conn.execute(
+            "SELECT submission_id, filename FROM submissions WHERE doc_id = ? AND submission_id != ?",
+            (doc_id, submission_id)
+        ).fetchall()
+        if previous is not None and now - previous[1] > self.retry_seconds:
+            same_file.insert(0, (submission_id, previous[0]))
+        if same_file:
+            signals.append({
+                "signal": "duplicate_file",
+                "reason": f"Identical file already submitted (as {same_file[0][1]})",
+                "matches": [row[0] for row in same_file]
+            })
+
+        near = self._similar(hashes, exclude={row[0] for row in same_file} | {submission_id})
+        confirmed = {}
+        for other_id, (distance, other_name, other_digest, other_pan, other_pay) in near.items():
+            # Same template is not enough: the slip must say the same thing
+            same_text = digest is not None and digest == other_digest
+            same_fields = (bool(pan) and pan == other_pan and bool(net_pay) and bool(other_pay)
+                           and not self._salary_differs(other_pay, net_pay))
+            if same_text or same_fields:
+                confirmed[other_id] = (distance, other_name)
+        if confirmed:
+            best_id = min(confirmed, key=lambda k: confirmed[k][0])
+            signals.append({
+                "signal": "duplicate_image",
+                "reason": f"Same slip image already submitted as {confirmed[best_id][1]} (Hamming distance {confirmed[best_id][0]})",
+                "matches": sorted(confirmed)
+            })
+
+        if pan:
+            first_bucket = int((now - self.window_seconds) // self.bucket_seconds)
+            history = [
+                row for row in self._conn.execute(
+                    "SELECT submission_id, net_pay, created, pay_period, content_digest, doc_id "
+                    "FROM submissions WHERE pan = ? AND bucket >= ?",
+                    (pan, first_bucket)
+                )
+                if row[0] != submission_id and row[2] >= now - self.window_seconds
+            ]
+            days = self.window_seconds // 86400
+            # Different slips, not uploads: the same month (or the same text) counts once
+            slips = {row[3] or row[4] or row[5] for row in history} | {period or digest or doc_id}
+            if len(slips) >= self.velocity_threshold:
+                signals.append({
+                    "signal": "pan_velocity",
+                    "reason": f"PAN {pan} appeared on {len(slips)} different slips in {days} days",
+                    "matches": [row[0] for row in history]
+                })
+            if net_pay and period:
+                # Only slips of the same month must agree; bonuses and loss-of-pay months differ legitimately
+                differing = [row for row in history if row[1] and row[3] == period
+                             and self._salary_differs(row[1], net_pay)]
+                if differing:
+                    signals.append({
+                        "signal": "pan_salary_mismatch",
+                        "reason": f"PAN {pan} was submitted with a different net pay for {period} ({differing[0][1]:g} vs {net_pay:g})",
+                        "matches": [row[0] for row in differing]
+                    })
+        return signals
+
+    def _salary_differs(self, a, b):
+        return abs(a - b) > self.salary_tolerance * max(abs(a), abs(b))
+
+    def _record(self, submission_id, doc_id, filename, pan, net_pay, hashes, digest, period, now):
+        # A re-recorded submission keeps its first timestamp, so later resubmissions are still detected
+        self._conn.execute(
+            "INSERT INTO submissions (submission_id, doc_id, filename, pan, net_pay, pay_period, content_digest, bucket, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(submission_id) DO UPDATE SET doc_id = excluded.doc_id, filename = excluded.filename, "
+            "pan = excluded.pan, net_pay = excluded.net_pay, pay_period = excluded.pay_period, "
+            "content_digest = excluded.content_digest",
+            (submission_id, doc_id, filename, pan or None, net_pay or None, period, digest,
+             int(now // self.bucket_seconds), now)
+        )
+        self._conn.execute("DELETE FROM image_hashes WHERE submission_id = ?", (submission_id,))
+        self._conn.execute("DELETE FROM image_hash_chunks WHERE submission_id = ?", (submission_id,))
+        self._conn.executemany(
+            "INSERT INTO image_hashes VALUES (?, ?, ?)",
+            [(submission_id, page, value) for page, value in enumerate(hashes, 1)]
+        )
+        self._conn.executemany(
+            "INSERT INTO image_hash_chunks VALUES (?, ?, ?, ?)",
+            [(chunk, part, submission_id, page)
+             for page, value in enumerate(hashes, 1) for chunk, part in enumerate(_chunks(value))]
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
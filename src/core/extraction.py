@@ -1,21 +1,51 @@
 import re
+import hashlib
+import json
 import logging
+from collections import namedtuple
+from itertools import repeat
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    SPACY_AVAILABLE = True
-except (ImportError, OSError):
-    logger.warning("Spacy model not found. Using regex-only extraction.")
-    nlp = None
-    SPACY_AVAILABLE = False
+from src.core.registry import get_nlp, get_ner_model, model_versions
+from src.core.field_scanner import FieldScanner, parse_amount
+
+# Keyword aliases for each salary component, in priority order
+SALARY_KEYWORDS = {
+    "basic_salary": ["Basic", "Basic Salary", "Basic Pay", "Basic & DA"],
+    "hra": ["HRA", "House Rent Allowance"],
+    "net_pay": ["Net Pay", "Net Salary", "Take Home", "NET Salary", "NETPAY", "Net Payable"],
+    "total_earnings": ["Total Earnings", "Gross Salary", "Total Pay", "Total Addition", "Total Earning", "Total"],
+    "total_deductions": ["Total Deductions", "Total Deduction"]
+}
+
+# A keyword's value is not taken from the next line if that line holds one of these
+NEXT_LINE_STOP_WORDS = ["Name", "Designation", "Month"]
+
+# Salary fields the custom NER model can override
+NER_FIELDS = ["net_pay", "total_earnings"]
+
+# The custom NER model only reads text around these keywords on long documents
+NER_WINDOW_KEYWORDS = SALARY_KEYWORDS["net_pay"] + SALARY_KEYWORDS["total_earnings"] + ["Name"]
+
+# Custom NER entity with character offsets into the full document text
+NerEntity = namedtuple("NerEntity", ["text", "label_", "start_char", "end_char"])
 
 class DataExtractor:
-    def __init__(self):
+    def __init__(self, cascade=False, ner_window_chars=200, memo=None):
+        """
+        :param cascade: Run the regex/keyword extractors first and the spaCy/custom
+                        NER models only for fields still missing or ambiguous
+        :param ner_window_chars: Characters after each name/net pay/earnings keyword
+                                 that the custom NER model sees (None = whole text)
+        :param memo: Optional ExtractionCache; repeated texts skip extraction
+        """
+        self.cascade = cascade
+        self.ner_window_chars = ner_window_chars
+        self.memo = memo
+        self._model_versions = None
         self.patterns = {
             "pan": r"[A-Z]{5}[0-9]{4}[A-Z]{1}",
             "aadhaar": r"\d{4}\s\d{4}\s\d{4}",
@@ -26,64 +56,342 @@ class DataExtractor:
             "amount": r"Rs\.?\s?[\d,]+(?:\.\d{2})?",
             "ifsc": r"[A-Z]{4}0[A-Z0-9]{6}",
             # Fixed: Strict regex to not match across lines (e.g. avoiding 'Designation' from next line)
-            "name_regex": r"(?:Name|Employee Name|Emp Name)[\s:]+([A-Za-z ]+)(?:\n|$)"
+            "name_regex": r"(?:Name|Employee Name|Emp Name)[\s:]+([A-Za-z ]+)(?:\n|$)",
+            # Company names at the start of a line, e.g. "Acme Technologies Pvt. Ltd."
+            "org_regex": r"(?mi)^[ \t]*([A-Z][A-Za-z0-9&.,'\- ]{1,80}?\b(?:Private Limited|Pvt\.? Ltd|Limited|Ltd|LLP|Inc|Corporation)\b\.?)",
+            # Company names that are the employee's bank rather than the employer
+            "bank_regex": r"(?i)\bbank\b",
+            # "Designation: Software Engineer", up to the end of the line or the next table column
+            "designation_regex": r"(?i)\b(?:Designation|Job Title|Position)[ \t]*[:\-][ \t]*([A-Za-z][A-Za-z.&/\- ]{0,60}?)(?=[ \t]{2,}|[ \t]*\n|[ \t]*$|[ \t]+(?:Month|Name|PAN|Date|Department|Location|Emp|Bank)\b)"
         }
-        
-        # Load Custom NER Model
-        self.ner_model = None
-        try:
-            import os
-            model_path = os.path.join("models", "ner_model")
-            if os.path.exists(model_path):
-                import spacy
-                self.ner_model = spacy.load(model_path)
-                logger.info("Loaded custom NER model.")
-        except Exception as e:
-            logger.warning(f"Could not load custom NER model: {e}")
-
-    def extract_entities(self, text):
+        # All structured fields and salary keywords are found in one pass per text
+        self.scanner = FieldScanner(
+            self.patterns,
+            first_keys=["pan", "aadhaar", "email", "phone", "ifsc"],
+            all_keys=["date", "amount"],
+            keyword_groups=SALARY_KEYWORDS,
+            stop_words=NEXT_LINE_STOP_WORDS
+        )
+
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline, loaded on first use (None if unavailable)."""
+        return get_nlp()
+
+    @property
+    def ner_model(self):
+        """Shared custom NER model, loaded on first use (None if absent)."""
+        return get_ner_model()
+
+    def fingerprint(self):
+        """
+        Short hash of everything that determines the extraction output: patterns,
+        keyword lists, mode settings and the installed model versions. The
+        models are identified from disk (registry.model_versions) and never
+        loaded here, so the cascade still loads them only when a text needs them.
+        """
+        if self._model_versions is None:
+            # The registry keeps the first loaded model for the process, so the versions are read once
+            self._model_versions = model_versions()
+        config = {
+            "patterns": self.patterns,
+            "salary_keywords": SALARY_KEYWORDS,
+            "stop_words": NEXT_LINE_STOP_WORDS,
+            "ner_window_keywords": NER_WINDOW_KEYWORDS,
+            "cascade": self.cascade,
+            "ner_window_chars": self.ner_window_chars,
+            "models": self._model_versions
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def extract_entities(self, text, layout=None):
         """
         Extract structured data from raw text.
+        :param layout: Optional DocumentLayout from OCREngine.extract_layout, used
+                       for spatial key/value pairing of the salary components
+        :return: Extracted fields; "extraction_tiers" records which extractor
+                 (regex, keyword, keyword_stream, layout, spacy, ner, reconciled)
+                 produced names, orgs and each salary component
+        """
+        if self.memo is None:
+            return self._extract_entities(text, layout)
+
+        key = self.memo.make_key(self.fingerprint(), text, layout)
+        data = self.memo.get(key)
+        if data is None:
+            data = self._extract_entities(text, layout)
+            self.memo.set(key, data)
+        return data
+
+    def extract_cheap(self, text):
+        """
+        Regex/keyword stage only (no spaCy or NER model). Much cheaper than
+        extract_entities, for deciding whether more text is needed; it may
+        miss names the models would find, never the other way round.
+        """
+        data, tiers, _ = self._cheap_entities(text)
+        return self._finalize(data, tiers)
+
+    def _extract_entities(self, text, layout=None):
+        # A batch of one, so the single and batch paths can't drift apart
+        return next(self._iter_extract([text], [layout]))
+
+    def extract_entities_batch(self, texts, batch_size=64, n_process=1, layouts=None):
+        """
+        Extract structured data from many texts; results are identical to
+        calling extract_entities on each text.
+        :param texts: List of raw texts
+        :param batch_size: Number of texts spaCy processes per batch
+        :param n_process: spaCy worker processes per model (1 = in-process)
+        :param layouts: Optional list of DocumentLayouts aligned with texts
+        :return: List of extracted data dicts in input order
+        """
+        return list(self.iter_extract_entities(texts, batch_size=batch_size, n_process=n_process, layouts=layouts))
+
+    def iter_extract_entities(self, texts, batch_size=64, n_process=1, layouts=None):
+        """
+        Lazy variant of extract_entities_batch. The regex/keyword stage and
+        the custom NER model's pipe run over all texts first; results are then
+        yielded as nlp.pipe hands back the spaCy docs.
+        """
+        texts = list(texts)
+        layouts = list(layouts) if layouts is not None else [None] * len(texts)
+        if len(layouts) != len(texts):
+            raise ValueError("layouts must have one entry per text")
+
+        if self.memo is None:
+            yield from self._iter_extract(texts, layouts, batch_size, n_process)
+            return
+
+        # Memoized texts are answered directly; only the misses go through the models
+        fingerprint = self.fingerprint()
+        keys = [self.memo.make_key(fingerprint, text, layout) for text, layout in zip(texts, layouts)]
+        results = [self.memo.get(key) for key in keys]
+        missing = [i for i, data in enumerate(results) if data is None]
+        computed = self._iter_extract([texts[i] for i in missing], [layouts[i] for i in missing],
+                                      batch_size, n_process)
+        for i, data in zip(missing, computed):
+            self.memo.set(keys[i], data)
+            results[i] = data
+        yield from results
+
+    def _iter_extract(self, texts, layouts, batch_size=64, n_process=1):
+        """
+        Shared core of extract_entities and the batch API.
+        """
+        if self.cascade:
+            # Cheap stage for every text first, then the models only over the texts that need them
+            staged = [self._cheap_entities(text, layout) for text, layout in zip(texts, layouts)]
+            pending = [self._pending_models(data, tiers) for data, tiers, _ in staged]
+            # A model no text needs is not even loaded
+            nlp = self.nlp if any(p[0] for p in pending) else None
+            ner_model = self.ner_model if any(p[1] for p in pending) else None
+            docs = self._pipe_subset(nlp, texts, [p[0] for p in pending], batch_size, n_process)
+            ner_ents = [None] * len(texts)
+            if ner_model:
+                selected = [i for i, p in enumerate(pending) if p[1]]
+                found = self._ner_entities(ner_model, [texts[i] for i in selected],
+                                           [staged[i][2] for i in selected], batch_size, n_process)
+                for i, entities in zip(selected, found):
+                    ner_ents[i] = entities
+            for (data, tiers, _), doc, entities in zip(staged, docs, ner_ents):
+                yield self._finish_cascade(data, tiers, doc, entities)
+            return
+
+        nlp = self.nlp
+        ner_model = self.ner_model
+        scans = [self.scanner.scan(text) for text in texts]
+        docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process) if nlp else repeat(None)
+        ner_ents = self._ner_entities(ner_model, texts, scans, batch_size, n_process) if ner_model else repeat(None)
+        for text, scan, layout, doc, entities in zip(texts, scans, layouts, docs, ner_ents):
+            yield self._build_entities(text, scan, doc, entities, layout)
+
+    @staticmethod
+    def _pipe_subset(model, texts, mask, batch_size, n_process):
+        """
+        Docs for the texts where mask is True (None elsewhere or without a model).
+        """
+        docs = [None] * len(texts)
+        if not model:
+            return docs
+        selected = [i for i, needed in enumerate(mask) if needed]
+        parsed = model.pipe([texts[i] for i in selected], batch_size=batch_size, n_process=n_process)
+        for i, doc in zip(selected, parsed):
+            docs[i] = doc
+        return docs
+
+    def _ner_windows(self, text, scan):
+        """
+        (start, end) character spans the custom NER model is run over: text
+        around name/net pay/earnings keywords, merged where they overlap and
+        widened to whitespace. Short texts, texts without hits and texts the
+        windows would mostly cover anyway are used whole.
+        """
+        full = [(0, len(text))]
+        if not self.ner_window_chars or len(text) <= 4 * self.ner_window_chars:
+            return full
+        spans = []
+        for start in scan.keyword_starts(NER_WINDOW_KEYWORDS):
+            begin = max(0, start - self.ner_window_chars // 4)
+            end = min(len(text), start + self.ner_window_chars)
+            while begin > 0 and not text[begin - 1].isspace():
+                begin -= 1
+            while end < len(text) and not text[end].isspace():
+                end += 1
+            if spans and begin <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(end, spans[-1][1]))
+            else:
+                spans.append((begin, end))
+        if not spans or sum(end - begin for begin, end in spans) >= 0.8 * len(text):
+            return full
+        return spans
+
+    def _ner_entities(self, ner_model, texts, scans, batch_size=64, n_process=1):
+        """
+        Run the custom NER model over the relevant windows of each text.
+        :return: One list of NerEntity per text, offsets mapped back to the full text
         """
+        chunks = []
+        for i, (text, scan) in enumerate(zip(texts, scans)):
+            chunks.extend((i, begin, end) for begin, end in self._ner_windows(text, scan))
+        results = [[] for _ in texts]
+        parsed = ner_model.pipe((texts[i][begin:end] for i, begin, end in chunks),
+                                batch_size=batch_size, n_process=n_process)
+        for (i, offset, _), doc in zip(chunks, parsed):
+            results[i].extend(NerEntity(ent.text, ent.label_, ent.start_char + offset, ent.end_char + offset)
+                              for ent in doc.ents)
+        return results
+
+    def _build_entities(self, text, scan, doc, ner_ents, layout=None):
+        """
+        Shared core of the single and batch paths (non-cascade mode).
+        :param scan: FieldScan of `text`
+        :param doc: en_core_web_sm Doc of `text`, or None
+        :param ner_ents: Custom NER entities of `text`, or None
+        """
+        names, names_tier = self._extract_names_tier(text, doc)
         data = {
-            "pan": self._extract_regex(text, "pan"),
-            "aadhaar": self._extract_regex(text, "aadhaar"),
-            "email": self._extract_regex(text, "email"),
-            "phone": self._extract_regex(text, "phone"),
-            "dates": self._extract_all_regex(text, "date"),
-            "amounts": self._extract_all_regex(text, "amount"),
-            "ifsc": self._extract_regex(text, "ifsc"),
-            "names": self._extract_names(text),
-            "orgs": self._extract_orgs(text)
+            "pan": scan.values["pan"],
+            "aadhaar": scan.values["aadhaar"],
+            "email": scan.values["email"],
+            "phone": scan.values["phone"],
+            "dates": scan.values["date"],
+            "amounts": scan.values["amount"],
+            "ifsc": scan.values["ifsc"],
+            "names": names,
+            "orgs": self._extract_orgs(text, doc),
+            "employer": self._extract_employer(text),
+            "designation": self._extract_designation(text)
         }
+        tiers = {"names": names_tier, "orgs": "spacy" if data["orgs"] else None,
+                 "designation": "regex" if data["designation"] else None}
         
         # Robust Extraction for Salary Components
-        data["basic_salary"] = self._extract_key_value(text, ["Basic", "Basic Salary", "Basic Pay", "Basic & DA"])
-        data["hra"] = self._extract_key_value(text, ["HRA", "House Rent Allowance"])
-        data["net_pay"] = self._extract_key_value(text, ["Net Pay", "Net Salary", "Take Home", "NET Salary", "NETPAY", "Net Payable"])
-        data["total_earnings"] = self._extract_key_value(text, ["Total Earnings", "Gross Salary", "Total Pay", "Total Addition", "Total Earning", "Total"])
-        data["total_deductions"] = self._extract_key_value(text, ["Total Deductions", "Total Deduction"])
+        self._extract_salary_fields(data, tiers, scan, layout)
         
         # OVERRIDE with Custom NER if available
-        if self.ner_model:
-            doc = self.ner_model(text)
-            for ent in doc.ents:
-                if ent.label_ == "SALARY":
-                    val = self._parse_float(ent.text)
-                    if val: data["total_earnings"] = val # Map SALARY to Total Earnings
-                elif ent.label_ == "NET_PAY":
-                    val = self._parse_float(ent.text)
-                    if val: data["net_pay"] = val
-                elif ent.label_ == "EMPLOYEE_NAME":
-                    # Prepend to names list so it's prioritized
-                    if ent.text.strip():
-                        data["names"].insert(0, ent.text.strip())
+        if ner_ents is not None:
+            self._apply_ner(data, tiers, ner_ents)
+        
+        return self._finalize(data, tiers)
+
+    def _cheap_entities(self, text, layout=None):
+        """
+        Cascade stage 1: regex and keyword extractors only.
+        :return: (data, tiers, scan)
+        """
+        scan = self.scanner.scan(text)
+        data = {
+            "pan": scan.values["pan"],
+            "aadhaar": scan.values["aadhaar"],
+            "email": scan.values["email"],
+            "phone": scan.values["phone"],
+            "dates": scan.values["date"],
+            "amounts": scan.values["amount"],
+            "ifsc": scan.values["ifsc"],
+            "names": self._extract_names_regex(text),
+            "orgs": self._extract_orgs_regex(text),
+            "designation": self._extract_designation(text)
+        }
+        data["employer"] = self._extract_employer(text, data["orgs"])
+        tiers = {"names": "regex" if data["names"] else None, "orgs": "regex" if data["orgs"] else None,
+                 "designation": "regex" if data["designation"] else None}
+        self._extract_salary_fields(data, tiers, scan, layout)
+        return data, tiers, scan
+
+    def _pending_models(self, data, tiers):
+        """
+        Cascade: which models are still needed.
+        :return: (need_spacy, need_ner)
+        """
+        need_spacy = not data["names"] or not data["orgs"]
+        need_ner = not data["names"] or any(tiers[field] in (None, "keyword_stream") for field in NER_FIELDS)
+        return need_spacy, need_ner
+
+    def _finish_cascade(self, data, tiers, doc, ner_ents):
+        """
+        Cascade stage 2: fill missing names/orgs from spaCy, then let the custom
+        NER model override only missing or ambiguous fields.
+        """
+        if doc is not None:
+            if not data["names"]:
+                data["names"] = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+                tiers["names"] = "spacy" if data["names"] else None
+            if not data["orgs"]:
+                data["orgs"] = [ent.text for ent in doc.ents if ent.label_ == "ORG"]
+                tiers["orgs"] = "spacy" if data["orgs"] else None
+
+        if ner_ents is not None:
+            fields = {field for field in NER_FIELDS if tiers[field] in (None, "keyword_stream")}
+            if not data["names"]:
+                fields.add("names")
+            self._apply_ner(data, tiers, ner_ents, fields)
+
+        return self._finalize(data, tiers)
+
+    def _extract_salary_fields(self, data, tiers, scan, layout):
+        # With OCR layout, pair keywords with values spatially in one pass first
+        spatial = layout.find_values(SALARY_KEYWORDS) if layout is not None and len(layout) else {}
+        for field in SALARY_KEYWORDS:
+            if spatial.get(field):
+                data[field], tiers[field] = spatial[field], "layout"
+            else:
+                data[field], tiers[field] = scan.key_value_tier(field)
+
+    def _apply_ner(self, data, tiers, entities, fields=None):
+        """
+        Override fields with custom NER entities.
+        :param fields: Fields that may be overridden (None = all)
+        """
+        for ent in entities:
+            if ent.label_ == "SALARY" and (fields is None or "total_earnings" in fields):
+                val = self._parse_float(ent.text)
+                if val:
+                    data["total_earnings"] = val # Map SALARY to Total Earnings
+                    tiers["total_earnings"] = "ner"
+            elif ent.label_ == "NET_PAY" and (fields is None or "net_pay" in fields):
+                val = self._parse_float(ent.text)
+                if val:
+                    data["net_pay"] = val
+                    tiers["net_pay"] = "ner"
+            elif ent.label_ == "EMPLOYEE_NAME" and (fields is None or "names" in fields):
+                # Prepend to names list so it's prioritized
+                if ent.text.strip():
+                    data["names"].insert(0, ent.text.strip())
+                    tiers["names"] = "ner"
+
+    def _finalize(self, data, tiers):
+        before = {field: data[field] for field in ("net_pay", "total_earnings", "total_deductions")}
         
         # Post-processing: Infer final salary
         data["salary"] = self._infer_salary(data)
         
         # Smart Math: Reconcile Data
         data = self._reconcile_data(data)
+        for field, value in before.items():
+            if data[field] != value:
+                tiers[field] = "reconciled"
+        data["extraction_tiers"] = tiers
         
         print(f"DEBUG: Net Pay: {data['net_pay']}, Total Earnings: {data['total_earnings']}, Deductions: {data['total_deductions']}")
         
@@ -114,89 +422,81 @@ class DataExtractor:
             
         return data
 
-    def _extract_key_value(self, text, keywords):
-        """
-        Find a number associated with a keyword, handling both structured lines and single-line streams.
-        """
-        # 1. Try Line-Based Logic (for structured docs)
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            for keyword in keywords:
-                if keyword.lower() in line.lower():
-                    # Same line
-                    match = re.search(r"[\d,]+(?:\.\d{2})?", line)
-                    if match:
-                        val = self._parse_float(match.group(0))
-                        if val: return val
-                    
-                    # Next line
-                    if i + 1 < len(lines):
-                        next_line = lines[i+1]
-                        if not any(k.lower() in next_line.lower() for k in ["Name", "Designation", "Month"]):
-                            match_next = re.search(r"[\d,]+(?:\.\d{2})?", next_line)
-                            if match_next:
-                                val = self._parse_float(match_next.group(0))
-                                if val: return val
-
-        # 2. Fallback: Stream-Based Logic (for single-line OCR)
-        # Look for Keyword followed by some chars (non-greedy) then a number
-        # We limit the gap to ~100 chars to avoid matching across too much text
-        for keyword in keywords:
-            # Pattern: Keyword ... (junk) ... Number
-            # Case insensitive search
-            pattern = re.compile(re.escape(keyword) + r".{0,100}?([\d,]+(?:\.\d{2})?)", re.IGNORECASE | re.DOTALL)
-            match = pattern.search(text)
-            if match:
-                val = self._parse_float(match.group(1))
-                if val: return val
-                
-        return 0.0
-
     def _parse_float(self, val_str):
-        try:
-            val_str = val_str.replace(',', '')
-            val = float(val_str)
-            if 1990 <= val <= 2100: # Ignore years
-                return None
-            return val
-        except ValueError:
-            return None
-
-    def _extract_regex(self, text, key):
-        match = re.search(self.patterns[key], text)
-        return match.group(0) if match else None
-
-    def _extract_all_regex(self, text, key):
-        return re.findall(self.patterns[key], text)
-
-    def _extract_names(self, text):
+        return parse_amount(val_str)
+
+    def _spacy_doc(self, text):
+        """Parse `text` with the shared spaCy pipeline, or None if unavailable."""
+        nlp = self.nlp
+        return nlp(text) if nlp else None
+
+    def _extract_names(self, text, doc=None):
+        """
+        :param doc: spaCy Doc of `text` if already parsed
+        """
+        return self._extract_names_tier(text, doc)[0]
+
+    def _extract_names_tier(self, text, doc=None):
+        """
+        :return: (names, "spacy" | "regex" | None)
+        """
         names = []
         # 1. Try Spacy
-        if nlp:
-            doc = nlp(text)
+        if doc is None:
+            doc = self._spacy_doc(text)
+        if doc is not None:
             names = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+            if names:
+                return names, "spacy"
         
         # 2. Fallback to Regex
+        names = self._extract_names_regex(text)
+        return names, "regex" if names else None
+
+    def _extract_names_regex(self, text):
+        names = []
+        # Try "Name: ..." pattern
+        # Updated to stop at common next-field keywords
+        match = re.search(r"(?:Name|Employee Name|Emp Name)[\s:_]+([A-Za-z ]+?)(?=\s+(?:Total|Designation|Id|Pan|Bank|Date|\d))", text, re.IGNORECASE)
+        if match:
+            names.append(match.group(1).strip())
+        
+        # Fallback for simple "Name: Value" at end of line or string
         if not names:
-            # Try "Name: ..." pattern
-            # Updated to stop at common next-field keywords
-            match = re.search(r"(?:Name|Employee Name|Emp Name)[\s:_]+([A-Za-z ]+?)(?=\s+(?:Total|Designation|Id|Pan|Bank|Date|\d))", text, re.IGNORECASE)
-            if match:
+             match = re.search(r"(?:Name|Employee Name|Emp Name)[\s:_]+([A-Za-z ]+)(?:\n|$)", text, re.IGNORECASE)
+             if match:
                 names.append(match.group(1).strip())
-            
-            # Fallback for simple "Name: Value" at end of line or string
-            if not names:
-                 match = re.search(r"(?:Name|Employee Name|Emp Name)[\s:_]+([A-Za-z ]+)(?:\n|$)", text, re.IGNORECASE)
-                 if match:
-                    names.append(match.group(1).strip())
         
         return names
 
-    def _extract_orgs(self, text):
-        if not nlp: return []
-        doc = nlp(text)
+    def _extract_orgs(self, text, doc=None):
+        if doc is None:
+            doc = self._spacy_doc(text)
+        if doc is None: return []
         return [ent.text for ent in doc.ents if ent.label_ == "ORG"]
 
+    def _extract_orgs_regex(self, text):
+        orgs = []
+        for match in re.finditer(self.patterns["org_regex"], text):
+            org = match.group(1).strip()
+            if org not in orgs:
+                orgs.append(org)
+        return orgs
+
+    def _extract_employer(self, text, orgs=None):
+        """
+        First company-suffix match (org_regex) that is not a bank, or None.
+        :param orgs: _extract_orgs_regex(text) if already computed
+        """
+        for org in self._extract_orgs_regex(text) if orgs is None else orgs:
+            if not re.search(self.patterns["bank_regex"], org):
+                return org
+        return None
+
+    def _extract_designation(self, text):
+        match = re.search(self.patterns["designation_regex"], text)
+        return match.group(1).strip() if match else None
+
     def _infer_salary(self, data):
         """
         Determine the final salary value to use.
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+class ExtractionCache:
+    """
+    In-memory LRU memo of DataExtractor results.
+
+    Keys combine the SHA-256 of the text (and layout, if any) with a
+    fingerprint of the extractor configuration: patterns, keyword lists and
+    the loaded NER models. Results are stored as JSON, which bounds the memory
+    by a byte budget and hands every caller its own copy. Seeing a new
+    fingerprint drops all entries, so changing the extractor invalidates the
+    memo automatically.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        """
+        :param max_bytes: Byte budget of the stored (JSON-encoded) results
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> JSON string
+        self._bytes = 0
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def text_digest(text, layout=None):
+        digest = hashlib.sha256(text.encode("utf-8", errors="surrogatepass"))
+        if layout is not None:
+            digest.update(json.dumps(layout.to_dict(), sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def make_key(self, fingerprint, text, layout=None):
+        """
+        Key for `text` under the given extractor fingerprint; entries with any
+        other fingerprint are dropped.
+        """
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._fingerprint = fingerprint
+        return f"{fingerprint}:{self.text_digest(text, layout)}"
+
+    def get(self, key):
+        """
+        Return a fresh copy of the memoized result for `key`, or None on a miss.
+        """
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(encoded)
+
+    def set(self, key, value):
+        encoded = json.dumps(value)
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if not key.startswith(f"{self._fingerprint}:"):
+                return  # Computed under an older fingerprint
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = encoded
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FEATLOG1"
+
+# One fixed-size record per scored document: time + [basic, hra, special, deductions].
+# float32 is what IsolationForest casts its input to, so nothing the model sees is lost.
+RECORD_DTYPE = np.dtype([("time", "<f8"), ("features", "<f4", (4,))])
+
+
+class FeatureLog:
+    """
+    Append-only binary log of the fraud-model feature vectors of processed
+    documents (24 bytes per document), used to retrain the anomaly model on
+    real component distributions (scripts/retrain_anomaly_model.py).
+
+    Every append is a single O_APPEND write of whole records, so several
+    worker processes can share one file. A record cut short by a crash is
+    ignored by readers and truncated the next time the log is opened for
+    writing.
+    """
+
+    def __init__(self, path="data/feature_log.bin", readonly=False):
+        """
+        :param readonly: Only read the log (e.g. a retraining job running next
+                         to API workers that are still appending); nothing is
+                         created or truncated and append() is refused
+        """
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size == 0:
+                os.write(fd, MAGIC)
+            elif (size - len(MAGIC)) % RECORD_DTYPE.itemsize:
+                # Drop a record cut short by a crash so new records stay aligned
+                logger.warning(f"Truncating a partial record at the end of {path}")
+                os.ftruncate(fd, size - (size - len(MAGIC)) % RECORD_DTYPE.itemsize)
+        finally:
+            os.close(fd)
+
+    def append(self, features, timestamp=None):
+        """
+        :param features: (n, 4) array-like of [Basic, HRA, Special, Deductions] rows
+        """
+        if self.readonly:
+            raise ValueError(f"{self.path} was opened read-only")
+        X = np.asarray(features, dtype=np.float32).reshape(-1, 4)
+        if not len(X):
+            return
+        records = np.empty(len(X), dtype=RECORD_DTYPE)
+        records["time"] = time.time() if timestamp is None else timestamp
+        records["features"] = X
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, records.tobytes())
+            finally:
+                os.close(fd)
+
+    def count(self):
+        size = os.path.getsize(self.path) - len(MAGIC)
+        return max(0, size) // RECORD_DTYPE.itemsize
+
+    def iter_chunks(self, chunk_rows=65536, since=None):
+        """
+        Read the log in bounded memory.
+        :param since: Only records at or after this Unix time
+        :return: Iterator of (n, 4) float32 arrays
+        """
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a feature log")
+            # Whole records present now; records appended meanwhile (or one half
+            # written) are left for the next reader, so chunks stay aligned
+            remaining = max(0, os.fstat(f.fileno()).st_size - len(MAGIC)) // RECORD_DTYPE.itemsize
+            while remaining:
+                n = min(chunk_rows, remaining)
+                data = f.read(n * RECORD_DTYPE.itemsize)
+                n = len(data) // RECORD_DTYPE.itemsize
+                if not n:
+                    return
+                remaining -= n
+                records = np.frombuffer(data, dtype=RECORD_DTYPE, count=n)
+                if since is not None:
+                    records = records[records["time"] >= since]
+                if len(records):
+                    yield records["features"]
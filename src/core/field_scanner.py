@@ -0,0 +1,261 @@
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+
+# A salary value, and the digit/comma runs values start in
+NUMBER_PATTERN = re.compile(r"[\d,]+(?:\.\d{2})?")
+_DIGIT_RUN = re.compile(r"[\d,]+")
+
+# Stream fallback: a keyword's value must start within this many characters after it
+STREAM_MAX_GAP = 100
+
+# Folding these before lower() keeps offsets aligned with the original text and
+# matches ASCII keywords exactly like re.IGNORECASE does
+_CASE_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+_FOLD_CHARS = re.compile("[İıſ]")
+
+
+def parse_amount(val_str):
+    """
+    Parse "1,23,456.00" style numbers; years (1990-2100) and junk give None.
+    """
+    try:
+        val_str = val_str.replace(',', '')
+        val = float(val_str)
+        if 1990 <= val <= 2100:  # Ignore years
+            return None
+        return val
+    except ValueError:
+        return None
+
+
+def _trie_pattern(node):
+    """
+    Render a character trie as a regex. Optional groups are greedy, so the
+    longest keyword on the path is matched.
+    """
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + pattern + ")?" if "" in node else pattern
+
+
+class KeywordMatcher:
+    """
+    Finds every (overlapping) occurrence of a fixed set of lowercase keywords
+    in one pass.
+
+    The keywords are merged into a trie that is compiled into a single regex,
+    so the scan runs inside the regex engine and the work per character is
+    bounded by the trie's branching rather than the number of keywords. The
+    lookahead reports every start position; the longest keyword found there
+    implies the shorter keywords that are its prefixes.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = {}  # End-of-keyword marker
+        self._regex = re.compile("(?=(" + _trie_pattern(trie) + "))")
+        self._implied = {kw: [prefix for prefix in self.keywords if kw.startswith(prefix)]
+                         for kw in self.keywords}
+
+    def find(self, lowered):
+        """
+        :param lowered: Lowercased text
+        :return: {keyword: [start offsets in increasing order]}
+        """
+        hits = {}
+        for match in self._regex.finditer(lowered):
+            start = match.start()
+            for keyword in self._implied[match.group(1)]:
+                hits.setdefault(keyword, []).append(start)
+        return hits
+
+
+class FieldScanner:
+    """
+    Precompiled extraction of the structured fields and keyword/value pairs.
+
+    Structured patterns are compiled once; salary keywords are located with a
+    single KeywordMatcher pass over the lowercased text and resolved against
+    the original line-based and stream-based rules, so the values are the
+    same as per-keyword searching but the text is no longer re-split and
+    re-lowered for every keyword.
+    """
+
+    def __init__(self, patterns, first_keys, all_keys, keyword_groups, stop_words):
+        """
+        :param patterns: {key: regex string}
+        :param first_keys: Keys whose first match is returned (re.search)
+        :param all_keys: Keys whose non-overlapping matches are returned (re.findall)
+        :param keyword_groups: {field: [keywords in priority order]}
+        :param stop_words: Words that stop a keyword from taking its value from the next line
+        """
+        self.first_keys = list(first_keys)
+        self.all_keys = list(all_keys)
+        # Separate patterns rather than one alternation: each keeps the regex
+        # engine's literal-prefix/charset scan, which a combined lookahead loses
+        self._patterns = {key: re.compile(patterns[key]) for key in self.first_keys + self.all_keys}
+
+        self.keyword_groups = {field: [kw.lower() for kw in keywords] for field, keywords in keyword_groups.items()}
+        self.stop_words = [word.lower() for word in stop_words]
+        self.matcher = KeywordMatcher(
+            [kw for keywords in self.keyword_groups.values() for kw in keywords] + self.stop_words
+        )
+
+    def scan(self, text):
+        """
+        :return: FieldScan with the structured values and keyword hits of `text`
+        """
+        values = {}
+        for key in self.first_keys:
+            match = self._patterns[key].search(text)
+            values[key] = match.group(0) if match else None
+        for key in self.all_keys:
+            values[key] = self._patterns[key].findall(text)
+        return FieldScan(self, text, values)
+
+
+class FieldScan:
+    """
+    Result of FieldScanner.scan for one text.
+
+    Keyword hits are kept as character offsets. Line numbers and the index of
+    digit runs (where candidate values start) are derived on demand in one
+    forward pass, so a value found near the top of a long text is resolved
+    without indexing the rest of it.
+    """
+
+    def __init__(self, scanner, text, values):
+        self.text = text
+        self.values = values
+        self._scanner = scanner
+        self._line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+        # Digit-run index: start/end offsets of [\d,]+ runs, extended lazily
+        self._run_starts = []
+        self._run_ends = []
+        self._runs = _DIGIT_RUN.finditer(text)
+
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            self._line_hits = scanner.matcher.find(lowered)
+        else:
+            # Some characters lowercase to two (e.g. U+0130), so match line by
+            # line and record each hit at the start of its line
+            self._line_hits = {}
+            for i, line in enumerate(text.split('\n')):
+                for kw in scanner.matcher.find(line.lower()):
+                    self._line_hits.setdefault(kw, []).append(self._line_starts[i])
+
+        if len(lowered) == len(text) and not _FOLD_CHARS.search(text):
+            self._stream_hits = self._line_hits
+        else:
+            self._stream_hits = scanner.matcher.find(text.translate(_CASE_FOLD).lower())
+
+        self._stop_starts = sorted(start for word in scanner.stop_words for start in self._line_hits.get(word, ()))
+
+    def keyword_starts(self, keywords):
+        """
+        Sorted start offsets of all occurrences of any of `keywords`, which must be
+        among the scanner's keywords or stop words (case-insensitive).
+        """
+        starts = set()
+        for kw in keywords:
+            starts.update(self._stream_hits.get(kw.lower(), ()))
+        return sorted(starts)
+
+    def _line_of(self, offset):
+        return bisect_right(self._line_starts, offset) - 1
+
+    def _line_end(self, i):
+        return self._line_starts[i + 1] - 1 if i + 1 < len(self._line_starts) else len(self.text)
+
+    def _hit_lines(self, keywords):
+        """
+        Distinct indices of lines containing any of `keywords`, in increasing order.
+        """
+        last = -1
+        for start in heapq.merge(*(self._line_hits.get(kw, ()) for kw in keywords)):
+            i = self._line_of(start)
+            if i != last:
+                yield i
+                last = i
+
+    def _has_stop_word(self, i):
+        idx = bisect_left(self._stop_starts, self._line_starts[i])
+        return idx < len(self._stop_starts) and self._stop_starts[idx] < self._line_end(i)
+
+    def _number_after(self, pos, limit, endpos=None):
+        """
+        The number starting at the first digit/comma at or after `pos` and
+        before `limit`, or None. The number itself may extend up to `endpos`
+        (default: end of text). Looked up in the digit-run index, so no
+        characters are rescanned.
+        """
+        # Index runs until one ends after pos (or the text is exhausted)
+        while self._runs is not None and (not self._run_ends or self._run_ends[-1] <= pos):
+            run = next(self._runs, None)
+            if run is None:
+                self._runs = None
+                break
+            self._run_starts.append(run.start())
+            self._run_ends.append(run.end())
+
+        idx = bisect_right(self._run_ends, pos)
+        if idx == len(self._run_ends):
+            return None
+        start = max(self._run_starts[idx], pos)
+        if start >= limit:
+            return None
+        return NUMBER_PATTERN.match(self.text, start, len(self.text) if endpos is None else endpos).group(0)
+
+    def _number_on_line(self, i):
+        end = self._line_end(i)
+        number = self._number_after(self._line_starts[i], end, end)
+        return parse_amount(number) if number else None
+
+    def key_value(self, field):
+        """
+        Number associated with a keyword group, or 0.0.
+
+        1. Line-based: the first line containing a keyword that has a number on
+           it, or on the next line (unless that line starts another field).
+        2. Stream-based: for each keyword in priority order, its first occurrence
+           followed by a number within STREAM_MAX_GAP characters.
+        """
+        return self.key_value_tier(field)[0]
+
+    def key_value_tier(self, field):
+        """
+        Like key_value, but also names the rule that produced the value:
+        (value, "keyword") for line-based, (value, "keyword_stream") for the
+        less reliable stream fallback and (0.0, None) when nothing was found.
+        """
+        keywords = self._scanner.keyword_groups[field]
+
+        for i in self._hit_lines(keywords):
+            val = self._number_on_line(i)
+            if val:
+                return val, "keyword"
+            if i + 1 < len(self._line_starts) and not self._has_stop_word(i + 1):
+                val = self._number_on_line(i + 1)
+                if val:
+                    return val, "keyword"
+
+        for kw in keywords:
+            for start in self._stream_hits.get(kw, ()):
+                end = start + len(kw)
+                number = self._number_after(end, end + STREAM_MAX_GAP + 1)
+                if number:
+                    val = parse_amount(number)
+                    if val:
+                        return val, "keyword_stream"
+                    break
+        return 0.0, None
@@ -0,0 +1,166 @@
+import logging
+
+import joblib
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Array fields of a compiled forest, as stored by CompiledIsolationForest.save
+_ARRAY_FIELDS = ("feature", "threshold", "left", "right", "leaf_value", "roots")
+
+
+class CompiledIsolationForest:
+    """
+    Pure-NumPy scorer for a fitted sklearn IsolationForest.
+
+    All trees are flattened into packed node arrays (global feature index,
+    threshold, children, and for leaves the path length
+    `depth + c(n_samples) - 1`), and every row walks every tree at once, one
+    level per step. Leaves point to themselves, so rows that reached a leaf
+    simply stay there until the deepest tree is done.
+
+    The arithmetic follows IsolationForest exactly: inputs are cast to
+    float32 like sklearn's input validation, thresholds are compared in
+    float64, and per-tree path lengths are summed in estimator order, so
+    score_samples / decision_function / predict are bit-identical to the
+    sklearn model while skipping its per-call validation and per-tree
+    Python dispatch.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_value, roots,
+                 max_depth, denominator, offset, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.denominator = float(denominator)
+        self.offset_ = float(offset)
+        self.n_features_in_ = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Flatten a fitted IsolationForest.
+        """
+        from sklearn.ensemble._iforest import _average_path_length
+
+        features, thresholds, lefts, rights, leaf_values, roots = [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree_idx, (estimator, estimator_features) in enumerate(zip(model.estimators_, model.estimators_features_)):
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            max_depth = max(max_depth, tree.max_depth)
+
+            # Per-node tables cached by fit(); the pickle may come from an older
+            # sklearn whose _average_path_length rounds differently
+            if hasattr(model, "_decision_path_lengths"):
+                depths = model._decision_path_lengths[tree_idx]
+                corrections = model._average_path_length_per_tree[tree_idx]
+            else:
+                depths = _node_depths(tree)
+                corrections = _average_path_length(tree.n_node_samples)
+
+            # Same expression and order as IsolationForest._compute_score_samples
+            values = depths + corrections - 1.0
+
+            # Tree-local feature indices -> columns of the full input
+            local = np.where(is_leaf, 0, tree.feature)
+            features.append(np.asarray(estimator_features)[local].astype(np.intp))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            leaf_values.append(np.where(is_leaf, values, 0.0))
+            roots.append(offset)
+            offset += n_nodes
+
+        denominator = len(model.estimators_) * _average_path_length([model._max_samples])[0]
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            leaf_value=np.concatenate(leaf_values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            denominator=denominator,
+            offset=model.offset_,
+            n_features=model.n_features_in_
+        )
+
+    def _validate(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, but the forest expects {self.n_features_in_} features")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity.")
+        return X.astype(np.float64)
+
+    def apply(self, X):
+        """
+        Leaf reached in every tree.
+        :return: (n_samples, n_trees) array of global node indices
+        """
+        X = self._validate(X)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def score_samples(self, X):
+        """Same as IsolationForest.score_samples (lower = more abnormal)."""
+        # cumsum adds the trees one after another, like sklearn's depths +=
+        path_lengths = self.leaf_value[self.apply(X)]
+        depths = np.cumsum(path_lengths, axis=1)[:, -1] if path_lengths.shape[1] else np.zeros(len(path_lengths))
+        if self.denominator == 0:
+            # Single training sample: sklearn fixes the exponent at -1
+            return -(2 ** -np.ones_like(depths))
+        return -(2 ** (-(depths / self.denominator)))
+
+    def decision_function(self, X):
+        """Same as IsolationForest.decision_function (negative = outlier)."""
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X):
+        """Same as IsolationForest.predict: -1 for outliers, 1 for inliers."""
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+    def save(self, path):
+        """
+        Store the packed arrays with joblib (loadable with mmap_mode).
+        """
+        state = {name: getattr(self, name) for name in _ARRAY_FIELDS}
+        state.update(max_depth=self.max_depth, denominator=self.denominator,
+                     offset=self.offset_, n_features=self.n_features_in_)
+        joblib.dump(state, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        :param mmap_mode: Passed to joblib.load, e.g. "r" to share the node
+                          arrays between worker processes
+        """
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        return cls(**state)
+
+
+def _node_depths(tree):
+    """Depth of every node, root = 1 (as in Tree.compute_node_depths)."""
+    depths = np.zeros(tree.node_count, dtype=np.float64)
+    depths[0] = 1.0
+    for node in range(tree.node_count):  # Children always come after their parent
+        if tree.children_left[node] != -1:
+            depths[tree.children_left[node]] = depths[node] + 1.0
+            depths[tree.children_right[node]] = depths[node] + 1.0
+    return depths
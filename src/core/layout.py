@@ -0,0 +1,239 @@
+import re
+
+import numpy as np
+
+NUMBER_PATTERN = re.compile(r"^[\d,]+(?:\.\d{2})?$")
+
+
+class DocumentLayout:
+    """
+    Word-level OCR geometry stored column-wise in NumPy arrays.
+
+    Every word i has texts[i], boxes[i] = (x0, y0, x1, y1) in page pixels,
+    confidences[i] in [0, 1] (-1 when the engine gives none), pages[i] (1-based)
+    and lines[i], a document-wide line id. Words are kept in reading order.
+    """
+
+    def __init__(self, texts, boxes, confidences, pages, lines):
+        self.texts = list(texts)
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float32)
+        self.pages = np.asarray(pages, dtype=np.int16)
+        self.lines = np.asarray(lines, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.texts)
+
+    @classmethod
+    def empty(cls):
+        return cls([], np.zeros((0, 4)), [], [], [])
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        :param words: Iterable of {"text", "box", "conf", "page", "line"} dicts
+        """
+        words = list(words)
+        if not words:
+            return cls.empty()
+        return cls(
+            [w["text"] for w in words],
+            [w["box"] for w in words],
+            [w["conf"] for w in words],
+            [w["page"] for w in words],
+            [w["line"] for w in words]
+        )
+
+    @classmethod
+    def concat(cls, layouts):
+        """
+        Join per-page layouts, renumbering line ids so they stay unique.
+        """
+        layouts = [layout for layout in layouts if len(layout)]
+        if not layouts:
+            return cls.empty()
+        lines, offset = [], 0
+        for layout in layouts:
+            lines.append(layout.lines + offset)
+            offset += int(layout.lines.max()) + 1
+        return cls(
+            [text for layout in layouts for text in layout.texts],
+            np.concatenate([layout.boxes for layout in layouts]),
+            np.concatenate([layout.confidences for layout in layouts]),
+            np.concatenate([layout.pages for layout in layouts]),
+            np.concatenate(lines)
+        )
+
+    def to_dict(self):
+        """Compact JSON-serializable form (flat arrays), e.g. for the OCR cache."""
+        return {
+            "texts": self.texts,
+            "boxes": self.boxes.ravel().tolist(),
+            "conf": np.round(self.confidences, 3).tolist(),
+            "pages": self.pages.tolist(),
+            "lines": self.lines.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["texts"], data["boxes"], data["conf"], data["pages"], data["lines"])
+
+    def page(self, number):
+        """Sub-layout with only the words of one page."""
+        mask = self.pages == number
+        idx = np.nonzero(mask)[0]
+        return DocumentLayout([self.texts[i] for i in idx], self.boxes[mask],
+                              self.confidences[mask], self.pages[mask], self.lines[mask])
+
+    def mean_confidence(self):
+        """Mean confidence over words that have one, or None."""
+        valid = self.confidences[self.confidences >= 0]
+        return float(valid.mean()) if len(valid) else None
+
+    def line_texts(self):
+        """
+        Text of each line in reading order, words joined by spaces.
+        """
+        result = []
+        current, words = None, []
+        for text, line in zip(self.texts, self.lines):
+            if line != current and words:
+                result.append(" ".join(words))
+                words = []
+            current = line
+            words.append(text)
+        if words:
+            result.append(" ".join(words))
+        return result
+
+    def find_values(self, keyword_groups, max_gap_factor=3.0):
+        """
+        Spatial key/value pairing in one pass over the words.
+
+        For each group (name -> list of keywords) the first keyword occurrence
+        that has a numeric word to its right on the same line - or, failing that,
+        directly below it in the same column - yields the value.
+        :return: {group name: float or None}
+        """
+        lowered = [text.lower() for text in self.texts]
+        numeric = np.array([bool(NUMBER_PATTERN.match(text)) and any(c.isdigit() for c in text)
+                            for text in self.texts], dtype=bool)
+        heights = self.boxes[:, 3] - self.boxes[:, 1]
+        centers_y = (self.boxes[:, 1] + self.boxes[:, 3]) / 2.0
+
+        results = {}
+        for name, keywords in keyword_groups.items():
+            results[name] = None
+            targets = [kw.lower().split() for kw in keywords]
+            for start, end in self._keyword_spans(lowered, targets):
+                value = self._value_near(start, end, numeric, heights, centers_y, max_gap_factor)
+                if value is not None:
+                    results[name] = value
+                    break
+        return results
+
+    def _keyword_spans(self, lowered, targets):
+        """
+        Yield (first word, last word) index spans matching any multi-word keyword
+        within a single line, in reading order.
+        """
+        n = len(lowered)
+        for i in range(n):
+            for target in targets:
+                # easyocr boxes are phrases, so the whole keyword may sit in one word
+                if " ".join(target) in lowered[i]:
+                    yield i, i
+                    break
+                end = i + len(target) - 1
+                if end >= n or self.lines[end] != self.lines[i]:
+                    continue
+                if all(target[k] in lowered[i + k] for k in range(len(target))):
+                    yield i, end
+                    break
+
+    def _value_near(self, start, end, numeric, heights, centers_y, max_gap_factor):
+        box = self.boxes[end]
+        height = max(int(heights[end]), 1)
+        same_page = self.pages == self.pages[end]
+
+        # 1. Right of the keyword on the same visual row
+        right = (numeric & same_page & (self.boxes[:, 0] >= box[2])
+                 & (np.abs(centers_y - centers_y[end]) <= height * 0.6))
+        candidates = np.nonzero(right)[0]
+        # Nearest first; a year next to the keyword doesn't hide the amount after it
+        for best in candidates[np.argsort(self.boxes[candidates, 0], kind="stable")]:
+            value = _parse_number(self.texts[best])
+            if value is not None:
+                return value
+
+        # 2. Below the keyword, horizontally overlapping it
+        first = self.boxes[start]
+        below = (numeric & same_page & (self.boxes[:, 1] >= box[3])
+                 & (self.boxes[:, 1] - box[3] <= height * max_gap_factor)
+                 & (self.boxes[:, 2] >= first[0]) & (self.boxes[:, 0] <= box[2]))
+        candidates = np.nonzero(below)[0]
+        for best in candidates[np.argsort(self.boxes[candidates, 1], kind="stable")]:
+            value = _parse_number(self.texts[best])
+            if value is not None:
+                return value
+        return None
+
+
+def _parse_number(text):
+    try:
+        value = float(text.replace(",", ""))
+    except ValueError:
+        return None
+    if 1990 <= value <= 2100:  # Ignore years, like DataExtractor._parse_float
+        return None
+    return value or None
+
+
+def words_from_easyocr(results, page):
+    """
+    Convert easyocr `readtext(detail=1)` output into word dicts, assigning
+    line ids by clustering box centers vertically.
+    """
+    words = []
+    for points, text, conf in results:
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        words.append({"text": text, "box": [int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))],
+                      "conf": float(conf), "page": page})
+    if not words:
+        return words
+
+    # easyocr returns boxes roughly top-to-bottom; group boxes whose centers are close
+    heights = sorted(w["box"][3] - w["box"][1] for w in words)
+    tolerance = max(heights[len(heights) // 2] * 0.5, 1)
+    order = sorted(range(len(words)), key=lambda i: (words[i]["box"][1] + words[i]["box"][3]) / 2)
+    line, last_center = -1, None
+    for i in order:
+        center = (words[i]["box"][1] + words[i]["box"][3]) / 2
+        if last_center is None or center - last_center > tolerance:
+            line += 1
+            last_center = center
+        words[i]["line"] = line
+    # Reading order: by line, then left to right
+    words.sort(key=lambda w: (w["line"], w["box"][0]))
+    return words
+
+
+def words_from_tesseract_data(data, page):
+    """
+    Convert tesseract `image_to_data` output (dict of columns) into word dicts.
+    """
+    words = []
+    line_ids = {}
+    for i, text in enumerate(data["text"]):
+        text = (text or "").strip()
+        conf = float(data["conf"][i])
+        if not text or conf < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        line = line_ids.setdefault(key, len(line_ids))
+        left, top = int(data["left"][i]), int(data["top"][i])
+        words.append({"text": text,
+                      "box": [left, top, left + int(data["width"][i]), top + int(data["height"][i])],
+                      "conf": conf / 100.0, "page": page, "line": line})
+    return words
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import time
+import uuid
+
+import joblib
+
+from src.core.forest_compiler import CompiledIsolationForest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "model.pkl"
+COMPILED_FILE = "model.compiled.joblib"
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+
+
+class ModelStore:
+    """
+    Versioned directory of anomaly models:
+
+        models/anomaly/
+            v0001/model.pkl               sklearn estimator as trained
+            v0001/model.compiled.joblib   CompiledIsolationForest arrays
+            v0001/meta.json               version, creation time, training info
+            CURRENT                       name of the active version
+
+    Versions are written to a temporary directory and renamed into place, and
+    CURRENT is swapped with os.replace, so readers never see a half-written
+    model. Compiled arrays are loaded with mmap_mode, which lets forked API
+    workers share the same pages.
+    """
+
+    def __init__(self, root="models/anomaly"):
+        self.root = root
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def versions(self):
+        """Published versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if name.startswith("v") and os.path.isfile(self._path(name, META_FILE)))
+
+    def current_version(self):
+        try:
+            with open(self._path(CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_mtime(self):
+        """Modification time of CURRENT (None if nothing is published), for cheap change checks."""
+        try:
+            return os.path.getmtime(self._path(CURRENT_FILE))
+        except FileNotFoundError:
+            return None
+
+    def metadata(self, version):
+        with open(self._path(version, META_FILE)) as f:
+            return json.load(f)
+
+    def publish(self, model, metadata=None, activate=True):
+        """
+        Store a trained model as a new version.
+        :param metadata: Extra JSON-serializable info (training data, metrics, ...)
+        :param activate: Point CURRENT at the new version
+        :return: Version name
+        """
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = self._path(f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE))
+        if hasattr(model, "estimators_") and hasattr(model, "offset_"):
+            CompiledIsolationForest.from_sklearn(model).save(os.path.join(tmp_dir, COMPILED_FILE))
+
+        meta = dict(metadata or {})
+        meta.update(created=time.time(), model_type=type(model).__name__)
+
+        # Renaming onto an existing (non-empty) version fails, so concurrent publishers get distinct numbers
+        while True:
+            versions = self.versions()
+            version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+            meta["version"] = version
+            with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+                json.dump(meta, f, indent=2)
+            try:
+                os.rename(tmp_dir, self._path(version))
+                break
+            except OSError:
+                if not os.path.isdir(self._path(version)):
+                    raise
+
+        logger.info(f"Published anomaly model {version} to {self.root}")
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """Atomically point CURRENT at `version` (also used for rollbacks)."""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version '{version}'")
+        tmp_path = self._path(f".{CURRENT_FILE}-{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, self._path(CURRENT_FILE))
+
+    def load(self, version=None, mmap_mode="r"):
+        """
+        Load a version (default: CURRENT), preferring the compiled arrays.
+        :return: (version, model), or (None, None) if nothing is published
+        """
+        version = version or self.current_version()
+        if version is None:
+            return None, None
+        compiled_path = self._path(version, COMPILED_FILE)
+        if os.path.exists(compiled_path):
+            return version, CompiledIsolationForest.load(compiled_path, mmap_mode=mmap_mode)
+        return version, joblib.load(self._path(version, MODEL_FILE), mmap_mode=mmap_mode)
@@ -1,11 +1,16 @@
 import numpy as np
 from PIL import Image
 import logging
+import math
 import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 try:
     import pytesseract
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, pdfinfo_from_path
     TESSERACT_AVAILABLE = True
 except ImportError:
     TESSERACT_AVAILABLE = False
@@ -16,17 +21,191 @@ try:
 except ImportError:
     EASYOCR_AVAILABLE = False
 
+from src.core.layout import DocumentLayout, words_from_easyocr, words_from_tesseract_data
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fields a salary slip must yield; a draft OCR pass missing any of them is retried at full quality
+REQUIRED_FIELD_PATTERNS = {
+    "pan": r"[A-Z]{5}[0-9]{4}[A-Z]",
+    "name": r"(?i:name)[\s:_]+[A-Za-z]{2,}",
+    "net_pay": r"(?i:net\s*pay|net\s*salary|take\s*home|total\s*earning|gross\s*salary)[^\d]{0,100}\d"
+}
+
+# Pages whose widths and heights are within about this fraction of each other share an easyocr batch
+EASYOCR_SIZE_BUCKET = 0.05
+
+def iter_pdf_pages(pdf_path, dpi=200, max_pages=None, max_pixels=None, max_page_pixels=None, window=1, pages=None):
+    """
+    Rasterize a PDF lazily, yielding (page_number, PIL image) pairs.
+
+    Only `window` pages are decoded per poppler call, so peak memory depends on
+    the window size rather than the page count.
+    :param dpi: Rasterization resolution
+    :param max_pages: Stop after this many pages (None = all pages)
+    :param max_pixels: Pixel budget for the whole document; rasterization stops once it is spent
+    :param max_page_pixels: Pages larger than this are rendered at a lower DPI (or downscaled) before being yielded
+    :param window: Number of pages rasterized per poppler call
+    :param pages: Optional sorted list of 1-based page numbers to rasterize (default: all)
+    """
+    info = pdfinfo_from_path(pdf_path) if pages is None or max_page_pixels else {}
+    if pages is None:
+        page_count = info["Pages"]
+        if max_pages is not None and page_count > max_pages:
+            logger.warning(f"{os.path.basename(pdf_path)} has {page_count} pages, only the first {max_pages} will be processed")
+            page_count = max_pages
+        pages = range(1, page_count + 1)
+    elif max_pages is not None:
+        pages = [n for n in pages if n <= max_pages]
+
+    # Render oversized pages at a lower DPI instead of decoding them at full size first
+    if max_page_pixels:
+        dpi = _capped_dpi(info.get("Page size"), dpi, max_page_pixels)
+
+    pixels_used = 0
+    for first, last in _page_runs(pages, window):
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=first, last_page=last)
+        for offset, image in enumerate(images):
+            # Pages larger than the first one can still exceed the bound
+            if max_page_pixels and image.width * image.height > max_page_pixels:
+                scale = (max_page_pixels / (image.width * image.height)) ** 0.5
+                image = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))))
+            pixels_used += image.width * image.height
+            if max_pixels is not None and pixels_used > max_pixels:
+                logger.warning(f"Pixel budget exhausted for {os.path.basename(pdf_path)} at page {first + offset}")
+                return
+            yield first + offset, image
+        # Drop references to the decoded window before the next poppler call
+        del images
+
+def _capped_dpi(page_size, dpi, max_page_pixels):
+    """
+    Highest DPI (at most `dpi`) at which a page of pdfinfo's "Page size"
+    ("612 x 792 pts (letter)", as reported for the first page) stays within
+    max_page_pixels. Unparseable sizes keep `dpi`.
+    """
+    match = re.match(r"\s*([\d.]+)\s*x\s*([\d.]+)\s*pts", page_size or "")
+    if not match:
+        return dpi
+    square_inches = float(match.group(1)) / 72 * float(match.group(2)) / 72
+    if square_inches <= 0:
+        return dpi
+    return max(1, min(dpi, int((max_page_pixels / square_inches) ** 0.5)))
+
+def _page_runs(pages, window):
+    """
+    Group sorted page numbers into contiguous (first, last) runs of at most `window` pages.
+    """
+    run = []
+    for page in pages:
+        if run and (page != run[-1] + 1 or len(run) >= window):
+            yield run[0], run[-1]
+            run = []
+        run.append(page)
+    if run:
+        yield run[0], run[-1]
+
+def extract_pdf_text_layer(pdf_path, max_pages=None):
+    """
+    Read the embedded text layer of a PDF with poppler's pdftotext (installed
+    alongside pdf2image). Returns one string per page, or None if pdftotext
+    is unavailable or fails.
+    """
+    if shutil.which("pdftotext") is None:
+        return None
+    cmd = ["pdftotext", "-layout", "-enc", "UTF-8"]
+    if max_pages is not None:
+        cmd += ["-l", str(max_pages)]
+    try:
+        result = subprocess.run(cmd + [pdf_path, "-"], capture_output=True, timeout=60, check=True)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"pdftotext failed for {os.path.basename(pdf_path)}: {e}")
+        return None
+    # pdftotext separates pages with form feeds and terminates the last one too
+    pages = result.stdout.decode('utf-8', errors='replace').split("\f")
+    if pages and pages[-1].strip() == "":
+        pages = pages[:-1]
+    return pages
+
+def has_usable_text_layer(text, min_chars=40, min_alnum_ratio=0.5):
+    """
+    Heuristic: a page has a usable text layer when it carries a reasonable
+    amount of mostly alphanumeric text (scans tend to have none, or garbage
+    from a bad embedded OCR layer).
+    """
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < min_chars:
+        return False
+    alnum = sum(1 for c in chars if c.isalnum())
+    return alnum / len(chars) >= min_alnum_ratio
+
+def _pad(image, size):
+    """`image` on a white canvas of `size`, anchored top-left."""
+    if image.size == size:
+        return image
+    canvas = Image.new(image.mode, size, "white")
+    canvas.paste(image, (0, 0))
+    return canvas
+
+def _tesseract_page(image):
+    """Module-level so it can be pickled into a process pool."""
+    return pytesseract.image_to_string(image)
+
 class OCREngine:
-    def __init__(self, method='easyocr'):
+    def __init__(self, method='easyocr', cache=None, dpi=200, workers=1, parallel_backend='thread',
+                 max_dpi=300, max_pages=None, max_document_pixels=None, max_page_pixels=None,
+                 use_text_layer=True, preprocessor=None, tesseract_pool=None,
+                 two_pass=False, draft_dpi=100, draft_scale=0.5, min_confidence=0.6,
+                 required_fields=None, page_hasher=None):
         """
         Initialize OCR Engine.
         :param method: 'tesseract' or 'easyocr'
+        :param cache: Optional OCRCache used to skip re-OCR of previously seen files
+        :param dpi: Resolution used when rasterizing PDF pages
+        :param workers: Number of PDF pages OCR'd concurrently (1 = sequential)
+        :param parallel_backend: 'thread' or 'process' pool for tesseract pages
+        :param max_dpi: Upper bound on any rasterization DPI
+        :param max_pages: Only the first `max_pages` pages of a PDF are processed
+        :param max_document_pixels: Pixel budget per PDF across all pages
+        :param max_page_pixels: Pages above this size are downscaled before OCR
+        :param use_text_layer: Take the embedded text of digital PDF pages instead of OCRing them
+        :param preprocessor: Optional ImagePreprocessor applied to every image/page before OCR
+        :param tesseract_pool: Optional TesseractPool of persistent workers (tesseract method only)
+        :param two_pass: OCR a fast low-resolution draft first and redo only pages that need it
+        :param draft_dpi: PDF rasterization DPI of the draft pass
+        :param draft_scale: Image downscale factor of the draft pass
+        :param min_confidence: Draft pages with a lower mean word confidence are retried
+        :param required_fields: {name: regex} that the draft text must satisfy
+                                (default REQUIRED_FIELD_PATTERNS); otherwise its pages are retried
+        :param page_hasher: Optional callable(image) -> str (e.g. duplicates.phash) stored as
+                            "image_hash" on every rasterized PDF page, so duplicate checks
+                            reuse the OCR rasterization
         """
         self.method = method
+        self.cache = cache
+        self.max_dpi = max_dpi
+        self.dpi = min(dpi, max_dpi)
+        self.max_pages = max_pages
+        self.max_document_pixels = max_document_pixels
+        self.max_page_pixels = max_page_pixels
+        self.use_text_layer = use_text_layer
+        self.preprocessor = preprocessor
+        self.tesseract_pool = tesseract_pool
+        self.two_pass = two_pass
+        self.draft_dpi = draft_dpi
+        self.draft_scale = draft_scale
+        self.min_confidence = min_confidence
+        self.required_fields = {
+            name: re.compile(pattern)
+            for name, pattern in (required_fields or REQUIRED_FIELD_PATTERNS).items()
+        }
+        self.page_hasher = page_hasher
+        self.pass_stats = {"draft_pages": 0, "slow_path_pages": 0}
+        self.workers = max(1, workers)
+        self.parallel_backend = parallel_backend
+        self._executor = None
         if self.method == 'easyocr' and EASYOCR_AVAILABLE:
             logger.info("Initializing EasyOCR Reader...")
             self.reader = easyocr.Reader(['en'], gpu=True)
@@ -39,23 +218,265 @@ class OCREngine:
         :param file_path: Path to the file
         :return: Extracted text string
         """
+        return self.extract_document(file_path)["text"]
+
+    def extract_pages(self, file_path):
+        """
+        Extract text page by page.
+        :return: List of {"page", "source", "text"} dicts, where source is
+                 'text_layer' (embedded PDF text) or 'ocr'
+        """
+        return self.extract_document(file_path)["pages"]
+
+    def extract_document(self, file_path):
+        """
+        Extract text from an image or PDF file.
+        :param file_path: Path to the file
+        :return: {"text": full text, "pages": per-page results}
+        """
         # Mock return if engines are missing
         if not TESSERACT_AVAILABLE and not EASYOCR_AVAILABLE:
             logger.warning(f"No OCR engine available. Returning mock text for {os.path.basename(file_path)}")
-            filename = os.path.basename(file_path)
-            
-            # Dynamic Mock Data based on filename
-            if "missing_fields" in filename:
-                return "Employee Name: \nDesignation: Software Engineer\nPAN: ABCDE1234F\nTotal Earnings: Rs. 50,000\nDate: 01/01/2023"
-            elif "high_income" in filename:
-                return "Name: Alice High\nPAN: ABCDE1234F\nTotal Earnings: Rs. 1,50,000\nDate: 01/01/2023"
-            elif "low_income" in filename:
-                return "Name: Bob Low\nPAN: ABCDE1234F\nTotal Earnings: Rs. 8,000\nDate: 01/01/2023"
-            elif "fraud_tax" in filename:
-                return "Name: Charlie Fraud\nPAN: ABCDE1234F\nTotal Earnings: Rs. 2,00,000\nTax: Rs. 0\nDate: 01/01/2023"
-            elif "32.jpg" in filename or "32.png" in filename:
-                # Transcribed from the Kaggle dataset image 32.jpg
-                return """
+            text = self._mock_text(os.path.basename(file_path))
+            return {"text": text, "pages": [{"page": 1, "source": "mock", "text": text}]}
+
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext != '.pdf' and ext not in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
+            raise ValueError(f"Unsupported file format: {ext}")
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(file_path, **self._cache_settings())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"OCR cache hit for {os.path.basename(file_path)}")
+                return cached
+
+        if ext == '.pdf':
+            pages = self._process_pdf(file_path)
+            text = "".join(page["text"] + "\n" for page in pages)
+        elif self.two_pass:
+            page = self._two_pass_image(file_path)
+            text = page["text"]
+            pages = [page]
+        else:
+            text = self._process_image(file_path)
+            pages = [{"page": 1, "source": "ocr", "text": text}]
+        result = {"text": text, "pages": pages}
+
+        # Empty output usually means the engine failed; don't pin that in the cache
+        if cache_key is not None and text:
+            self.cache.set(cache_key, result)
+        return result
+
+    def extract_layout(self, file_path):
+        """
+        Extract text together with word geometry.
+        :return: {"text", "pages", "layout": DocumentLayout}. Boxes are in the
+                 coordinates of the image that was OCR'd (after preprocessing);
+                 pages read from a PDF text layer contribute no words.
+        """
+        if not TESSERACT_AVAILABLE and not EASYOCR_AVAILABLE:
+            result = self.extract_document(file_path)
+            return {**result, "layout": DocumentLayout.empty()}
+
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext != '.pdf' and ext not in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
+            raise ValueError(f"Unsupported file format: {ext}")
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(file_path, layout=True, **self._cache_settings())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"OCR cache hit for {os.path.basename(file_path)}")
+                return {**cached, "layout": DocumentLayout.from_dict(cached["layout"])}
+
+        if ext == '.pdf':
+            pages = self._process_pdf(file_path, layout=True)
+            text = "".join(page["text"] + "\n" for page in pages)
+        elif self.two_pass:
+            page = self._two_pass_image(file_path, layout=True)
+            text = page["text"]
+            pages = [page]
+        else:
+            try:
+                with Image.open(file_path) as image:
+                    page_text, page_layout = self._layout_page(self._prepare(image), 1)
+            except Exception as e:
+                logger.error(f"Error processing image {file_path}: {str(e)}")
+                page_text, page_layout = "", DocumentLayout.empty()
+            text = page_text
+            pages = [{"page": 1, "source": "ocr", "text": page_text, "layout": page_layout}]
+
+        layout = DocumentLayout.concat([page.pop("layout") for page in pages if "layout" in page])
+        result = {"text": text, "pages": pages, "layout": layout}
+        if cache_key is not None and text:
+            self.cache.set(cache_key, {"text": text, "pages": pages, "layout": layout.to_dict()})
+        return result
+
+    def iter_pages(self, file_path):
+        """
+        Lazily yield {"page", "source", "text"} dicts in page order, doing the
+        OCR for a page only when the consumer asks for it. Callers that stop
+        early (see src/core/pipeline.py) never pay for the remaining pages.
+        """
+        if not TESSERACT_AVAILABLE and not EASYOCR_AVAILABLE:
+            yield from self.extract_document(file_path)["pages"]
+            return
+
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext != '.pdf':
+            yield from self.extract_document(file_path)["pages"]
+            return
+
+        # A fully processed copy in the cache is cheaper than any OCR
+        if self.cache is not None:
+            cached = self.cache.get(self.cache.make_key(file_path, **self._cache_settings()))
+            if cached is not None:
+                yield from cached["pages"]
+                return
+
+        try:
+            layer = extract_pdf_text_layer(pdf_path=file_path, max_pages=self.max_pages) if self.use_text_layer else None
+            if layer is None:
+                page_numbers = range(1, pdfinfo_from_path(file_path)["Pages"] + 1)
+                if self.max_pages is not None:
+                    page_numbers = page_numbers[:self.max_pages]
+            else:
+                page_numbers = range(1, len(layer) + 1)
+        except Exception as e:
+            logger.error(f"Error processing PDF {file_path}: {str(e)}")
+            return
+
+        read_text = ""  # pages yielded so far, for the two-pass required-field check
+        # One pixel budget for the whole document, not per page
+        pixels_left = self.max_document_pixels
+        for number in page_numbers:
+            if layer is not None and has_usable_text_layer(layer[number - 1]):
+                page = {"page": number, "source": "text_layer", "text": layer[number - 1]}
+            elif pixels_left is not None and pixels_left <= 0:
+                continue
+            else:
+                results = {}
+                try:
+                    if self.two_pass:
+                        pixels = self._two_pass_pdf(file_path, [number], results, context_text=read_text,
+                                                    max_pixels=pixels_left)
+                    else:
+                        pixels = 0
+                        for _, image in self._iter_pages(file_path, pages=[number], max_pixels=pixels_left):
+                            pixels += image.width * image.height
+                            self._ocr_window([(number, image)], results)
+                except Exception as e:
+                    logger.error(f"Error processing PDF {file_path}: {str(e)}")
+                    return
+                if pixels_left is not None:
+                    # A page over the remaining budget isn't rasterized, and ends the OCR of the document
+                    pixels_left = pixels_left - pixels if number in results else 0
+                if number not in results:
+                    continue
+                page = results[number]
+            read_text += page["text"] + "\n"
+            yield page
+
+    def extract_text_batch(self, file_paths, batch_size=8):
+        """
+        Extract text from many files.
+        :param file_paths: List of image/PDF paths
+        :param batch_size: Number of images handed to the recognizer at once
+        :return: List of {"path", "text", "error"} dicts in input order;
+                 a failed item has text "" and the error message set
+        """
+        return list(self.iter_extract_text(file_paths, batch_size=batch_size))
+
+    def iter_extract_text(self, file_paths, batch_size=8):
+        """
+        Lazy variant of extract_text_batch: yields results in input order,
+        one batch of files at a time.
+        """
+        for start in range(0, len(file_paths), batch_size):
+            yield from self._extract_batch(file_paths[start:start + batch_size], batch_size)
+
+    def _extract_batch(self, file_paths, batch_size):
+        results = [None] * len(file_paths)
+        pending = []  # (index, cache_key, image) for images that still need OCR
+
+        for i, file_path in enumerate(file_paths):
+            try:
+                ext = os.path.splitext(file_path)[1].lower()
+                # PDFs (and mock mode) already have their own page-level pipeline; two-pass
+                # images need their draft confidence checked one by one
+                if ext == '.pdf' or self.two_pass or (not TESSERACT_AVAILABLE and not EASYOCR_AVAILABLE):
+                    results[i] = self._batch_result(file_path, self.extract_text(file_path))
+                    continue
+                if ext not in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
+                    raise ValueError(f"Unsupported file format: {ext}")
+
+                cache_key = None
+                if self.cache is not None:
+                    cache_key = self.cache.make_key(file_path, **self._cache_settings())
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        results[i] = self._batch_result(file_path, cached["text"])
+                        continue
+
+                with Image.open(file_path) as image:
+                    pending.append((i, cache_key, image.convert('RGB')))
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {str(e)}")
+                results[i] = self._batch_result(file_path, "", error=str(e))
+
+        if pending:
+            images = [self._prepare(image) for _, _, image in pending]
+            try:
+                if self.method == 'easyocr':
+                    texts = self._easyocr_batched(images, batch_size)
+                elif self.workers > 1:
+                    texts = list(self._get_executor().map(self._tesseract_fn(), images))
+                else:
+                    texts = [self._ocr_page(image) for image in images]
+            except Exception as e:
+                # Fall back to one call per image so a single bad file doesn't fail the batch
+                logger.warning(f"Batched OCR failed ({e}), retrying images one by one")
+                texts = [self._ocr_image_safe(image) for image in images]
+
+            for (i, cache_key, _), text in zip(pending, texts):
+                file_path = file_paths[i]
+                if isinstance(text, Exception):
+                    results[i] = self._batch_result(file_path, "", error=str(text))
+                    continue
+                if cache_key is not None and text:
+                    self.cache.set(cache_key, {"text": text, "pages": [{"page": 1, "source": "ocr", "text": text}]})
+                results[i] = self._batch_result(file_path, text)
+
+        return results
+
+    def _ocr_image_safe(self, image):
+        try:
+            return self._ocr_page(image)
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _batch_result(file_path, text, error=None):
+        return {"path": file_path, "text": text, "error": error}
+
+    def _mock_text(self, filename):
+        """
+        Dynamic mock data based on filename, used when no OCR engine is installed.
+        """
+        if "missing_fields" in filename:
+            return "Employee Name: \nDesignation: Software Engineer\nPAN: ABCDE1234F\nTotal Earnings: Rs. 50,000\nDate: 01/01/2023"
+        elif "high_income" in filename:
+            return "Name: Alice High\nPAN: ABCDE1234F\nTotal Earnings: Rs. 1,50,000\nDate: 01/01/2023"
+        elif "low_income" in filename:
+            return "Name: Bob Low\nPAN: ABCDE1234F\nTotal Earnings: Rs. 8,000\nDate: 01/01/2023"
+        elif "fraud_tax" in filename:
+            return "Name: Charlie Fraud\nPAN: ABCDE1234F\nTotal Earnings: Rs. 2,00,000\nTax: Rs. 0\nDate: 01/01/2023"
+        elif "32.jpg" in filename or "32.png" in filename:
+            # Transcribed from the Kaggle dataset image 32.jpg
+            return """
                 Salary Slip NOV - 19
                 Emp No : CSE-8182
                 Name : Rahul Sharma
@@ -70,21 +491,39 @@ class OCREngine:
                 Total Earning   25,500.00   Total Deduction 1,880.00
                 Net Pay : 23,620.00/-
                 """
-            else:
-                # Default (John Doe)
-                return "Name: John Doe\nPAN: ABCDE1234F\nTotal Earnings: Rs. 50,000\nDate: 01/01/2023"
-
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        if ext == '.pdf':
-            return self._process_pdf(file_path)
-        elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-            return self._process_image(file_path)
         else:
-            raise ValueError(f"Unsupported file format: {ext}")
+            # Default (John Doe)
+            return "Name: John Doe\nPAN: ABCDE1234F\nTotal Earnings: Rs. 50,000\nDate: 01/01/2023"
+
+    def _cache_settings(self):
+        """
+        Settings that change OCR output and therefore must be part of the cache key.
+        """
+        settings = {
+            "method": self.method,
+            "dpi": self.dpi,
+            "max_pages": self.max_pages,
+            "max_document_pixels": self.max_document_pixels,
+            "max_page_pixels": self.max_page_pixels,
+            "use_text_layer": self.use_text_layer,
+            "preprocess": self.preprocessor.config() if self.preprocessor else None,
+            "two_pass": [self.draft_dpi, self.draft_scale, self.min_confidence,
+                         sorted((k, v.pattern) for k, v in self.required_fields.items())] if self.two_pass else None
+        }
+        if self.page_hasher is not None:
+            # Cached pages must carry the hashes too
+            settings["page_hasher"] = getattr(self.page_hasher, "__name__", repr(self.page_hasher))
+        if self.method == 'easyocr' and EASYOCR_AVAILABLE:
+            settings["engine_version"] = getattr(easyocr, "__version__", None)
+        elif self.method == 'tesseract' and TESSERACT_AVAILABLE:
+            settings["engine_version"] = getattr(pytesseract, "__version__", None)
+        return settings
 
     def _process_image(self, image_path):
         try:
+            if self.preprocessor is not None or self.tesseract_pool is not None:
+                with Image.open(image_path) as image:
+                    return self._ocr_page(self._prepare(image))
             if self.method == 'tesseract':
                 image = Image.open(image_path)
                 text = pytesseract.image_to_string(image)
@@ -96,29 +535,301 @@ class OCREngine:
             logger.error(f"Error processing image {image_path}: {str(e)}")
             return ""
 
-    def _process_pdf(self, pdf_path):
+    def _prepare(self, image):
+        """
+        Run the configured preprocessing stage, if any.
+        """
+        if self.preprocessor is None:
+            return image
+        return self.preprocessor.process(image)
+
+    def _process_pdf(self, pdf_path, layout=False):
+        """
+        Returns a list of {"page", "source", "text"} dicts in page order.
+        Pages with a usable embedded text layer are read directly; only the
+        remaining (scanned) pages are rasterized and OCR'd. With `layout`,
+        OCR'd pages also carry a "layout" DocumentLayout.
+        """
         try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path)
-            full_text = ""
-            
-            for i, image in enumerate(images):
-                logger.info(f"Processing page {i+1} of PDF...")
-                if self.method == 'tesseract':
-                    text = pytesseract.image_to_string(image)
-                elif self.method == 'easyocr':
-                    # EasyOCR expects a file path or numpy array
-                    image_np = np.array(image)
-                    result = self.reader.readtext(image_np, detail=0)
-                    text = " ".join(result)
-                
-                full_text += text + "\n"
-            
-            return full_text
+            results = {}
+            ocr_pages = None
+            if self.use_text_layer:
+                layer = extract_pdf_text_layer(pdf_path, max_pages=self.max_pages)
+                if layer is not None:
+                    ocr_pages = []
+                    for number, page_text in enumerate(layer, start=1):
+                        if has_usable_text_layer(page_text):
+                            results[number] = {"page": number, "source": "text_layer", "text": page_text}
+                        else:
+                            ocr_pages.append(number)
+                    logger.info(f"{len(results)} of {len(layer)} pages have a text layer, OCR needed for {len(ocr_pages)}")
+
+            if self.two_pass and (ocr_pages is None or ocr_pages):
+                self._two_pass_pdf(pdf_path, ocr_pages, results, layout)
+            elif ocr_pages is None or ocr_pages:
+                # Rasterize and OCR one window of pages at a time to keep memory flat
+                window = []
+                for number, image in self._iter_pages(pdf_path, pages=ocr_pages):
+                    window.append((number, image))
+                    if len(window) >= self.workers:
+                        self._ocr_window(window, results, layout)
+                        window = []
+                if window:
+                    self._ocr_window(window, results, layout)
+
+            return [results[number] for number in sorted(results)]
         except Exception as e:
             logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
-            # Fallback: Try extracting text directly if it's a text PDF (optional, skipping for now as per requirements for OCR)
-            return ""
+            return []
+
+    def _two_pass_pdf(self, pdf_path, ocr_pages, results, layout=False, context_text="", max_pixels=None):
+        """
+        Draft-OCR the scanned pages at low DPI, then re-rasterize at full DPI only
+        the pages with low confidence - or all of them if the document as a whole
+        is still missing a required field.
+        :param context_text: Text of pages read earlier (iter_pages), which counts
+                             towards the required fields
+        :param max_pixels: Pixel budget of each pass (default max_document_pixels)
+        :return: Pixels rasterized, counting the retry of a page instead of its draft
+        """
+        drafts = []
+        pixels = {}
+        for number, image in self._iter_pages(pdf_path, dpi=self.draft_dpi, pages=ocr_pages, max_pixels=max_pixels):
+            pixels[number] = image.width * image.height
+            logger.info(f"Processing page {number} of PDF (draft)...")
+            results[number] = self._layout_result(self._prepare(image), number, "draft", layout)
+            self._hash_page(results[number], image)
+            drafts.append(number)
+
+        retry = [n for n in drafts if self._low_confidence(results[n])]
+        document_text = context_text + "\n".join(results[n]["text"] for n in sorted(results))
+        if self._missing_fields(document_text):
+            retry = drafts
+
+        self.pass_stats["draft_pages"] += len(drafts)
+        self.pass_stats["slow_path_pages"] += len(retry)
+        if retry:
+            logger.info(f"Retrying {len(retry)} of {len(drafts)} draft pages at {self.dpi} DPI")
+            for number, image in self._iter_pages(pdf_path, pages=retry, max_pixels=max_pixels):
+                pixels[number] = image.width * image.height
+                image_hash = results[number].get("image_hash")
+                results[number] = self._layout_result(self._prepare(image), number, "retry", layout)
+                if image_hash is not None:
+                    results[number]["image_hash"] = image_hash
+
+        for number in drafts:
+            results[number].pop("confidence", None)
+        return sum(pixels.values())
+
+    def _two_pass_image(self, image_path, layout=False):
+        """
+        Draft-OCR a downscaled copy of the image and fall back to full resolution
+        when confidence is low or a required field is missing.
+        """
+        try:
+            with Image.open(image_path) as image:
+                image = self._prepare(image)
+                draft_size = (max(1, int(image.width * self.draft_scale)), max(1, int(image.height * self.draft_scale)))
+                page = self._layout_result(image.resize(draft_size), 1, "draft", layout)
+                self.pass_stats["draft_pages"] += 1
+                if self._low_confidence(page) or self._missing_fields(page["text"]):
+                    self.pass_stats["slow_path_pages"] += 1
+                    logger.info(f"Retrying {os.path.basename(image_path)} at full resolution")
+                    page = self._layout_result(image, 1, "retry", layout)
+        except Exception as e:
+            logger.error(f"Error processing image {image_path}: {str(e)}")
+            page = {"page": 1, "source": "ocr", "pass": "draft", "text": ""}
+            if layout:
+                page["layout"] = DocumentLayout.empty()
+        page.pop("confidence", None)
+        return page
+
+    def _layout_result(self, image, number, ocr_pass, layout):
+        text, page_layout = self._layout_page(image, number)
+        result = {"page": number, "source": "ocr", "pass": ocr_pass, "text": text,
+                  "confidence": page_layout.mean_confidence()}
+        if layout:
+            result["layout"] = page_layout
+        return result
+
+    def _low_confidence(self, page):
+        confidence = page.get("confidence")
+        return confidence is not None and confidence < self.min_confidence
+
+    def _missing_fields(self, text):
+        missing = [name for name, pattern in self.required_fields.items() if not pattern.search(text)]
+        if missing:
+            logger.info(f"Draft OCR is missing required fields: {missing}")
+        return bool(missing)
+
+    def _ocr_window(self, window, results, layout=False):
+        numbers = [number for number, _ in window]
+        images = [self._prepare(image) for _, image in window]
+        if layout:
+            for number, image in zip(numbers, images):
+                logger.info(f"Processing page {number} of PDF (layout)...")
+                text, page_layout = self._layout_page(image, number)
+                results[number] = {"page": number, "source": "ocr", "text": text, "layout": page_layout}
+        else:
+            texts = self._ocr_pages(images, first_page=numbers[0])
+            for number, text in zip(numbers, texts):
+                results[number] = {"page": number, "source": "ocr", "text": text}
+        for number, image in window:
+            self._hash_page(results[number], image)
+
+    def _hash_page(self, result, image):
+        """Attach the page_hasher hash of the rasterized (unpreprocessed) page."""
+        if self.page_hasher is None:
+            return
+        try:
+            result["image_hash"] = self.page_hasher(image)
+        except Exception as e:
+            logger.warning(f"Could not hash page {result['page']}: {e}")
+
+    def _iter_pages(self, pdf_path, dpi=None, pages=None, max_pixels=None):
+        """
+        :param max_pixels: Pixel budget (default max_document_pixels)
+        """
+        return iter_pdf_pages(
+            pdf_path,
+            dpi=min(dpi or self.dpi, self.max_dpi),
+            max_pages=self.max_pages,
+            max_pixels=self.max_document_pixels if max_pixels is None else max_pixels,
+            max_page_pixels=self.max_page_pixels,
+            window=self.workers,
+            pages=pages
+        )
+
+    def _ocr_page(self, image):
+        """
+        OCR a single rasterized page (PIL image).
+        """
+        if self.method == 'tesseract':
+            return self._tesseract_fn()(image)
+        elif self.method == 'easyocr':
+            # EasyOCR expects a file path or numpy array
+            image_np = np.array(image)
+            result = self.reader.readtext(image_np, detail=0)
+            return " ".join(result)
+        return ""
+
+    def _layout_page(self, image, page):
+        """
+        OCR a single page keeping word boxes and confidences.
+        :return: (page text, DocumentLayout)
+        """
+        if self.method == 'tesseract':
+            if self.tesseract_pool is not None:
+                data = self.tesseract_pool.image_to_data(image)
+            else:
+                data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+            layout = DocumentLayout.from_words(words_from_tesseract_data(data, page))
+            return "\n".join(layout.line_texts()), layout
+        elif self.method == 'easyocr':
+            results = self.reader.readtext(np.array(image), detail=1)
+            layout = DocumentLayout.from_words(words_from_easyocr(results, page))
+            # Same text as the detail=0 path: recognizer output order, space-joined
+            return " ".join(text for _, text, _ in results), layout
+        return "", DocumentLayout.empty()
+
+    def _ocr_pages(self, images, first_page=1):
+        """
+        OCR a list of pages, returning their text in page order.
+        Pages are fanned out to a worker pool (tesseract) or a batched
+        reader call (easyocr) when more than one worker is configured.
+        """
+        if self.workers == 1 or len(images) < 2:
+            texts = []
+            for i, image in enumerate(images):
+                logger.info(f"Processing page {first_page + i} of PDF...")
+                texts.append(self._ocr_page(image))
+            return texts
+
+        logger.info(f"Processing {len(images)} PDF pages with {self.workers} workers...")
+        if self.method == 'tesseract':
+            # Executor.map preserves input order
+            return list(self._get_executor().map(self._tesseract_fn(), images))
+        elif self.method == 'easyocr':
+            return self._easyocr_batched(images, len(images))
+        return [""] * len(images)
+
+    def _easyocr_batched(self, images, batch_size):
+        """
+        Run easyocr's batched recognizer over pages of a similar size. Pages
+        whose widths and heights are within about EASYOCR_SIZE_BUCKET of each
+        other are padded with white to the group's largest width and height
+        (never resized, so the text keeps its scale); a page with no partner
+        falls back to a per-page call.
+        :param batch_size: Images the recognizer processes at once
+        """
+        texts = [None] * len(images)
+        groups = {}
+        for i, image in enumerate(images):
+            key = (round(math.log(image.width) / EASYOCR_SIZE_BUCKET), round(math.log(image.height) / EASYOCR_SIZE_BUCKET))
+            groups.setdefault(key, []).append(i)
+
+        for indices in groups.values():
+            if len(indices) == 1:
+                texts[indices[0]] = self._ocr_page(images[indices[0]])
+                continue
+            size = (max(images[i].width for i in indices), max(images[i].height for i in indices))
+            batch = [np.array(_pad(images[i], size)) for i in indices]
+            results = self.reader.readtext_batched(batch, detail=0, batch_size=batch_size)
+            for i, result in zip(indices, results):
+                texts[i] = " ".join(result)
+        return texts
+
+    def _tesseract_fn(self):
+        """
+        Callable used to OCR one page with tesseract: the persistent worker pool
+        when configured, else a pytesseract subprocess per page.
+        """
+        if self.tesseract_pool is not None:
+            return self.tesseract_pool.image_to_string
+        return _tesseract_page
+
+    def _get_executor(self):
+        """
+        Lazily create the page worker pool and keep it for the engine's lifetime,
+        so process start-up is paid once rather than per document.
+        """
+        if self._executor is None:
+            # The tesseract pool lives in this process, so it can only be fed from threads
+            if self.parallel_backend == 'process' and self.tesseract_pool is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # tesseract runs in a subprocess, so threads already overlap the work
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def stats(self):
+        """
+        Runtime metrics of the OCR cache and tesseract pool, when configured.
+        """
+        return {
+            "method": self.method,
+            "workers": self.workers,
+            "tesseract_backend": self._tesseract_backend(),
+            "two_pass": dict(self.pass_stats) if self.two_pass else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "tesseract_pool": self.tesseract_pool.stats() if self.tesseract_pool is not None else None
+        }
+
+    def _tesseract_backend(self):
+        """How tesseract is invoked: persistent 'tesserocr' workers, or a process per page."""
+        if self.method != 'tesseract':
+            return None
+        if self.tesseract_pool is not None:
+            return self.tesseract_pool.backend
+        return "pytesseract"
+
+    def close(self):
+        """Shut down the page worker pool (and tesseract workers), if started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.tesseract_pool is not None:
+            self.tesseract_pool.close()
 
 if __name__ == "__main__":
     # Test
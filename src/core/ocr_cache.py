@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload layout changes so stale entries are ignored
+CACHE_VERSION = 2
+
+
+class OCRCache:
+    """
+    Content-addressed cache for OCR results.
+
+    Entries are keyed on the SHA-256 of the file contents plus the OCR settings
+    that influence the output (engine, method, DPI...), so a re-uploaded file
+    with a new name still hits. Lookups go through an in-memory LRU tier first
+    and fall back to an optional on-disk tier; both tiers are bounded by a byte
+    budget and entries older than `ttl` seconds are treated as misses.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_bytes=64 * 1024 * 1024,
+                 max_disk_bytes=512 * 1024 * 1024, ttl=None):
+        """
+        :param cache_dir: Directory for the persistent tier (None = memory only)
+        :param max_memory_bytes: Byte budget of the in-memory LRU tier
+        :param max_disk_bytes: Byte budget of the on-disk tier
+        :param ttl: Maximum entry age in seconds (None = never expire)
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (size, created, value)
+        self._memory_bytes = 0
+        self._disk = OrderedDict()  # key -> size, oldest access first
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def file_digest(file_path, chunk_size=1024 * 1024):
+        """SHA-256 of a file's contents, read in chunks."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def make_key(self, file_path, **settings):
+        """
+        Build a cache key from the file contents and the OCR settings.
+        """
+        settings["cache_version"] = CACHE_VERSION
+        fingerprint = json.dumps(settings, sort_keys=True, default=str)
+        settings_hash = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+        return f"{self.file_digest(file_path)}-{settings_hash}"
+
+    def get(self, key):
+        """
+        Return the cached value for `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                size, created, value = entry
+                if self._expired(created):
+                    self._drop_memory(key)
+                else:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+            if key in self._disk:
+                value, created = self._read_disk(key)
+                if value is not None and not self._expired(created):
+                    self._disk.move_to_end(key)
+                    self._put_memory(key, value, created)
+                    self.hits += 1
+                    return value
+                self._drop_disk(key)
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value under `key` in both tiers.
+        """
+        created = time.time()
+        with self._lock:
+            self._put_memory(key, value, created)
+            if self.cache_dir:
+                self._write_disk(key, value, created)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._disk):
+                self._drop_disk(key)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    # --- Memory tier ---
+
+    def _put_memory(self, key, value, created):
+        size = len(json.dumps(value))
+        if size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (size, created, value)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            oldest = next(iter(self._memory))
+            self._drop_memory(oldest)
+
+    def _drop_memory(self, key):
+        size, _, _ = self._memory.pop(key)
+        self._memory_bytes -= size
+
+    # --- Disk tier ---
+
+    def _path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        """
+        Rebuild the LRU index from the files already on disk (oldest mtime first).
+        """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name[:-len('.json')], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _read_disk(self, key):
+        path = self._path_for(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Refresh mtime so the LRU order survives restarts
+            os.utime(path, None)
+            return entry["value"], entry["created"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable OCR cache entry {key}: {e}")
+            return None, 0
+
+    def _write_disk(self, key, value, created):
+        path = self._path_for(key)
+        payload = json.dumps({"created": created, "value": value})
+        size = len(payload.encode('utf-8'))
+        if size > self.max_disk_bytes:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial entry
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write OCR cache entry {key}: {e}")
+            return
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+        self._disk[key] = size
+        self._disk_bytes += size
+        self._evict_disk()
+
+    def _drop_disk(self, key):
+        size = self._disk.pop(key, 0)
+        self._disk_bytes -= size
+        try:
+            os.remove(self._path_for(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            oldest = next(iter(self._disk))
+            self._drop_disk(oldest)
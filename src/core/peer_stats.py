@@ -0,0 +1,375 @@
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Salary components tracked per peer group
+PEER_FIELDS = ("salary", "basic_salary")
+
+# Legal-form suffixes dropped so "Acme Pvt. Ltd." and "ACME Private Limited" share a group
+_ORG_SUFFIX = re.compile(r"\b(?:private limited|pvt ltd|pvt|limited|ltd|llp|inc|corporation|corp|co)\b")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_group(name):
+    """Peer-group key of an organisation or designation name ('' if nothing is left)."""
+    key = _NON_WORD.sub(" ", name.lower())
+    key = _ORG_SUFFIX.sub(" ", key)
+    return " ".join(key.split())
+
+
+class LogHistogram:
+    """
+    Quantile sketch over positive values: counts per logarithmic bucket, so
+    every quantile is within `accuracy` (relative) of the true value. When
+    more than `max_bins` buckets are used, the lowest ones are merged, which
+    keeps the size fixed and the upper quantiles (where inflated salaries
+    show up) accurate.
+    """
+
+    __slots__ = ("bins", "count")
+
+    def __init__(self, bins=None, count=0):
+        self.bins = bins if bins is not None else {}
+        self.count = count
+
+    def add(self, value, log_gamma, max_bins):
+        index = math.ceil(math.log(value) / log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self._compact(max_bins)
+
+    def merge(self, other, max_bins):
+        """Add the counts of another sketch with the same gamma."""
+        for index, n in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + n
+        self.count += other.count
+        self._compact(max_bins)
+
+    def _compact(self, max_bins):
+        while len(self.bins) > max_bins:
+            lowest, second = sorted(self.bins)[:2]
+            self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q, log_gamma):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                break
+        # Midpoint of the bucket (gamma^(i-1), gamma^i]
+        return 2 * math.exp(index * log_gamma) / (1 + math.exp(log_gamma))
+
+    def percentile(self, value, log_gamma):
+        """Share of the recorded values at or below `value`."""
+        if not self.count:
+            return None
+        index = math.ceil(math.log(value) / log_gamma)
+        return sum(n for i, n in self.bins.items() if i <= index) / self.count
+
+
+class PeerGroup:
+    """
+    Streaming aggregates of one organisation or designation: Welford
+    mean/variance of log(value) per field (salaries are roughly log-normal)
+    and a LogHistogram per field. Every update is O(1).
+    """
+
+    __slots__ = ("n", "mean", "m2", "sketches")
+
+    def __init__(self, fields=PEER_FIELDS):
+        self.n = dict.fromkeys(fields, 0)
+        self.mean = dict.fromkeys(fields, 0.0)
+        self.m2 = dict.fromkeys(fields, 0.0)
+        self.sketches = {field: LogHistogram() for field in fields}
+
+    def add(self, values, log_gamma, max_bins):
+        for field, value in values.items():
+            x = math.log(value)
+            self.n[field] += 1
+            delta = x - self.mean[field]
+            self.mean[field] += delta / self.n[field]
+            self.m2[field] += delta * (x - self.mean[field])
+            self.sketches[field].add(value, log_gamma, max_bins)
+
+    def merge(self, other, max_bins):
+        """
+        Combine with the aggregates of another PeerGroup (Chan et al. parallel
+        Welford update), as if its values had been added here.
+        """
+        for field, n_b in other.n.items():
+            if not n_b:
+                continue
+            n_a = self.n.get(field, 0)
+            if not n_a:
+                self.n[field], self.mean[field], self.m2[field] = n_b, other.mean[field], other.m2[field]
+                self.sketches[field] = LogHistogram(dict(other.sketches[field].bins), other.sketches[field].count)
+                continue
+            n = n_a + n_b
+            delta = other.mean[field] - self.mean[field]
+            self.mean[field] += delta * n_b / n
+            self.m2[field] += other.m2[field] + delta * delta * n_a * n_b / n
+            self.n[field] = n
+            self.sketches[field].merge(other.sketches[field], max_bins)
+
+    def std(self, field):
+        n = self.n[field]
+        return math.sqrt(self.m2[field] / (n - 1)) if n > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            field: [self.n[field], self.mean[field], self.m2[field], self.sketches[field].count,
+                    list(self.sketches[field].bins.items())]
+            for field in self.n
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        group = cls(tuple(data))
+        for field, (n, mean, m2, count, bins) in data.items():
+            group.n[field], group.mean[field], group.m2[field] = n, mean, m2
+            group.sketches[field] = LogHistogram({int(i): c for i, c in bins}, count)
+        return group
+
+
+class PeerStats:
+    """
+    Salary statistics per employer (DataExtractor "employer") and per
+    designation, used to flag slips that are far out of line with their
+    peers instead of relying on fixed global thresholds.
+
+    Groups live in an LRU of at most `max_groups` entries, and each field
+    sketch has at most `max_bins` buckets, so memory stays bounded however
+    many employers are seen; employers that stop sending slips are evicted
+    first. Checking and updating a slip touch a fixed number of groups, so
+    both are constant time.
+
+    With a `path`, the groups are persisted in SQLite shared by all API
+    workers: every `save_every` updates, the slips added since the last save
+    are merged into the stored groups (Welford states and sketches combine)
+    in one write transaction, and groups other workers changed meanwhile are
+    read back, so no worker overwrites another's slips.
+    """
+
+    def __init__(self, path=None, max_groups=50000, max_bins=48, accuracy=0.05,
+                 min_count=20, z_threshold=3.0, save_every=500, fields=PEER_FIELDS):
+        """
+        :param path: Optional SQLite database file (created if missing)
+        :param max_groups: Employer + designation groups kept in memory
+        :param max_bins: Buckets per quantile sketch
+        :param accuracy: Relative accuracy of the sketch quantiles
+        :param min_count: Slips a group needs before it is used for checks
+        :param z_threshold: |z-score| of log(value) against the group that raises a signal
+        :param save_every: Updates between saves (0 = only on save())
+        """
+        self.path = path
+        self.max_groups = max_groups
+        self.max_bins = max_bins
+        self.log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self.min_count = min_count
+        self.z_threshold = z_threshold
+        self.save_every = save_every
+        self.fields = tuple(fields)
+        self._lock = threading.Lock()
+        self._groups = OrderedDict()  # (kind, key) -> PeerGroup, stored state + local updates
+        self._pending = {}  # (kind, key) -> PeerGroup of the updates not saved yet
+        self._synced_seq = 0  # highest stored change merged into _groups
+        self._updates = 0
+        self.evictions = 0
+        self._conn = None
+        if path:
+            self._open()
+
+    @staticmethod
+    def group_keys(extracted_data):
+        """
+        (kind, key) peer groups of a slip: its employer and its designation.
+        The employer is the company-suffix match that is not a bank
+        (DataExtractor "employer"); slips without one get no employer group,
+        since the other organisations on a slip are often its bank.
+        """
+        keys = []
+        employer = extracted_data.get("employer")
+        if employer and normalize_group(employer):
+            keys.append(("org", normalize_group(employer)))
+        designation = extracted_data.get("designation")
+        if designation and normalize_group(designation):
+            keys.append(("designation", normalize_group(designation)))
+        return keys
+
+    def _values(self, extracted_data):
+        values = {}
+        for field in self.fields:
+            value = extracted_data.get(field)
+            if isinstance(value, (int, float)) and value > 0:
+                values[field] = float(value)
+        return values
+
+    def check(self, extracted_data):
+        """
+        Compare a slip with its peer groups.
+        :return: List of {"signal", "reason", "matches"} dicts, like DuplicateIndex
+        """
+        values = self._values(extracted_data)
+        signals = []
+        if not values:
+            return signals
+        names = {"org": extracted_data.get("employer"), "designation": extracted_data.get("designation")}
+        with self._lock:
+            for kind, key in self.group_keys(extracted_data):
+                group = self._groups.get((kind, key))
+                if group is None:
+                    continue
+                for field, value in values.items():
+                    n = group.n.get(field, 0)
+                    std = group.std(field) if n else 0.0
+                    if n < self.min_count or std == 0:
+                        continue
+                    z = (math.log(value) - group.mean[field]) / std
+                    if abs(z) < self.z_threshold:
+                        continue
+                    sketch = group.sketches[field]
+                    median = sketch.quantile(0.5, self.log_gamma)
+                    percentile = sketch.percentile(value, self.log_gamma)
+                    direction = "above" if z > 0 else "below"
+                    signals.append({
+                        "signal": f"peer_{kind}_outlier",
+                        "reason": (f"{field.replace('_', ' ').capitalize()} {value:,.0f} is {abs(z):.1f} SD {direction} "
+                                   f"{names[kind]} peers (n={n}, median {median:,.0f}, percentile {percentile:.0%})"),
+                        "matches": [key],
+                        "z_score": round(z, 2)
+                    })
+        return signals
+
+    def update(self, extracted_data):
+        """Add a slip to its peer groups (O(1))."""
+        values = self._values(extracted_data)
+        if not values:
+            return
+        with self._lock:
+            for group_key in self.group_keys(extracted_data):
+                self._group(group_key).add(values, self.log_gamma, self.max_bins)
+                if self._conn is not None:
+                    if group_key not in self._pending:
+                        self._pending[group_key] = PeerGroup(self.fields)
+                    self._pending[group_key].add(values, self.log_gamma, self.max_bins)
+            self._updates += 1
+            save = self._conn is not None and self.save_every and self._updates % self.save_every == 0
+        if save:
+            self.save()
+
+    def check_and_update(self, extracted_data):
+        """check() against the groups as they were, then update() them with this slip."""
+        signals = self.check(extracted_data)
+        self.update(extracted_data)
+        return signals
+
+    def _group(self, group_key, group=None):
+        """In-memory group for `group_key` (created, or replaced by `group`), marked most recently used."""
+        if group is None:
+            group = self._groups.get(group_key)
+            if group is None:
+                group = PeerGroup(self.fields)
+        self._groups[group_key] = group
+        self._groups.move_to_end(group_key)
+        if len(self._groups) > self.max_groups:
+            self._groups.popitem(last=False)
+            self.evictions += 1
+        return group
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS peer_groups (
+                kind TEXT,
+                key TEXT,
+                data TEXT,
+                seq INTEGER,
+                PRIMARY KEY (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS peer_groups_seq ON peer_groups(seq);
+        """)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'fields'").fetchone()
+            if row is not None and tuple(json.loads(row[0])) != self.fields:
+                logger.warning(f"Peer statistics in {self.path} track other fields; starting empty")
+                self._conn.execute("DELETE FROM peer_groups")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('fields', ?)", (json.dumps(self.fields),))
+            # Most recently changed groups, up to the LRU size
+            rows = self._conn.execute(
+                "SELECT kind, key, data FROM peer_groups ORDER BY seq DESC LIMIT ?", (self.max_groups,)
+            ).fetchall()
+            self._synced_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM peer_groups").fetchone()[0]
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        for kind, key, data in reversed(rows):
+            self._groups[(kind, key)] = PeerGroup.from_dict(json.loads(data))
+        logger.info(f"Loaded peer statistics for {len(self._groups)} groups from {self.path}")
+
+    def save(self):
+        """
+        Merge the updates since the last save into the stored groups, then
+        read back every group changed since the last sync (ours and other
+        workers'). One write transaction, so concurrent savers serialize.
+        """
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM peer_groups").fetchone()[0]
+                for (kind, key), delta in self._pending.items():
+                    row = self._conn.execute(
+                        "SELECT data FROM peer_groups WHERE kind = ? AND key = ?", (kind, key)
+                    ).fetchone()
+                    group = PeerGroup.from_dict(json.loads(row[0])) if row else PeerGroup(self.fields)
+                    group.merge(delta, self.max_bins)
+                    seq += 1
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO peer_groups VALUES (?, ?, ?, ?)",
+                        (kind, key, json.dumps(group.to_dict()), seq)
+                    )
+                changed = self._conn.execute(
+                    "SELECT kind, key, data FROM peer_groups WHERE seq > ? ORDER BY seq", (self._synced_seq,)
+                ).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            for kind, key, data in changed:
+                self._group((kind, key), PeerGroup.from_dict(json.loads(data)))
+            self._pending = {}
+            # Every stored seq is at most `seq`, and all above the old mark were just read
+            self._synced_seq = seq
+
+    def stats(self):
+        return {"groups": len(self._groups), "max_groups": self.max_groups, "evictions": self.evictions,
+                "unsaved_groups": len(self._pending)}
+
+    def close(self):
+        """Save pending updates and close the database."""
+        if self._conn is None:
+            return
+        self.save()
+        with self._lock:
+            self._conn.close()
+            self._conn = None
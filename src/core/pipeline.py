@@ -0,0 +1,163 @@
+import logging
+
+from src.core.scoring import calculate_risk_score
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fields DataExtractor must fill before OCR of further pages is skipped
+DEFAULT_REQUIRED_FIELDS = ("names", "pan", "net_pay")
+
+
+class IncrementalExtraction:
+    """
+    Runs OCR and extraction together, page by page, and stops as soon as the
+    required fields are filled. Each new page is only checked with the cheap
+    regex/keyword stage (DataExtractor.extract_cheap); the full extraction
+    runs once, over the pages read, when reading stops. Remaining pages stay
+    unprocessed until `complete()` (or `next_page()`) is called.
+    """
+
+    def __init__(self, ocr_engine, extractor, file_path, required_fields=DEFAULT_REQUIRED_FIELDS):
+        """
+        :param ocr_engine: OCREngine used to read the pages
+        :param extractor: DataExtractor run over the text read so far
+        :param file_path: Document to process
+        :param required_fields: Keys of the extracted data that must be non-empty
+        """
+        self.extractor = extractor
+        self.file_path = file_path
+        self.required_fields = tuple(required_fields)
+        self.pages = []
+        self.data = None
+        self.exhausted = False
+        self._cheap_data = None
+        self._page_iter = ocr_engine.iter_pages(file_path)
+
+    @property
+    def text(self):
+        """Text of the pages processed so far, joined like OCREngine.extract_text."""
+        return "".join(page["text"] + "\n" for page in self.pages)
+
+    def run(self):
+        """
+        Process pages until the required fields are satisfied or the document ends.
+        :return: Extracted data for the pages read
+        """
+        while not self.exhausted and not self.is_satisfied():
+            self.next_page()
+        if not self.exhausted:
+            logger.info(f"Required fields found after {len(self.pages)} page(s); skipping the rest of {self.file_path}")
+        return self._extract()
+
+    def next_page(self):
+        """
+        OCR one more page and re-check the required fields over everything read so far.
+        :return: True if a page was processed, False if the document is exhausted
+        """
+        try:
+            page = next(self._page_iter)
+        except StopIteration:
+            self.exhausted = True
+            return False
+        self.pages.append(page)
+        self.data = None
+        self._cheap_data = self.extractor.extract_cheap(self.text)
+        return True
+
+    def complete(self):
+        """
+        Process all remaining pages (e.g. when a reviewer needs the full document).
+        :return: Extracted data for the whole document
+        """
+        while self.next_page():
+            pass
+        return self._extract()
+
+    def is_satisfied(self):
+        if self._cheap_data is None:
+            return False
+        for field in self.required_fields:
+            value = self._cheap_data.get(field)
+            if isinstance(value, list):
+                value = [v for v in value if isinstance(v, str) and v.strip()]
+            if not value:
+                return False
+        return True
+
+    def _extract(self):
+        """Full extraction over the pages read (once per stop)."""
+        if self.data is None:
+            self.data = self.extractor.extract_entities(self.text)
+        return self.data
+
+
+def assess_extraction(extracted_data, validator, fraud_detector, feature_log=None, fraud_signals=None):
+    """
+    Validation, fraud check and risk scoring of extracted data.
+    :param feature_log: Optional FeatureLog the fraud-model features are appended to
+    :param fraud_signals: Optional hits of other fraud checks (DuplicateIndex), as
+                          {"signal", "reason", "matches"} dicts; any hit flags the document
+    :return: {"validation_issues", "fraud_status", "fraud_reason", "fraud_signals",
+              "risk_score", "eligibility"}
+    """
+    if feature_log is not None:
+        _log_features(feature_log, fraud_detector, [extracted_data])
+    # Pass the full extracted data so the detector can find components like Basic, HRA, etc.
+    return _assess(extracted_data, validator, fraud_detector.check_anomaly(extracted_data), fraud_signals)
+
+
+def assess_extraction_batch(extracted_batch, validator, fraud_detector, feature_log=None, fraud_signals=None):
+    """
+    assess_extraction over many documents, with a single anomaly-model call.
+    :param fraud_signals: Optional list with the signals of each document
+    :return: One assessment dict per document, in order
+    """
+    if feature_log is not None:
+        _log_features(feature_log, fraud_detector, extracted_batch)
+    fraud_results = fraud_detector.check_anomaly_batch(extracted_batch)
+    signals = fraud_signals if fraud_signals is not None else [None] * len(extracted_batch)
+    return [
+        _assess(data, validator, fraud_result, doc_signals)
+        for data, fraud_result, doc_signals in zip(extracted_batch, fraud_results, signals)
+    ]
+
+
+def _log_features(feature_log, fraud_detector, extracted_batch):
+    """Record the model features of documents with at least one salary component found."""
+    try:
+        X, valid = fraud_detector.build_features(extracted_batch)
+        feature_log.append(X[valid & (X != 0).any(axis=1)])
+    except Exception as e:
+        logger.warning(f"Could not append to the feature log: {e}")
+
+
+def _assess(extracted_data, validator, fraud_result, fraud_signals=None):
+    validation_issues = validator.validate_data(extracted_data)
+
+    if isinstance(fraud_result, dict):
+        fraud_status = fraud_result["status"]
+        fraud_reason = fraud_result["reason"]
+    else:
+        # Fallback for legacy string response
+        fraud_status = fraud_result
+        fraud_reason = None
+
+    fraud_signals = list(fraud_signals or [])
+    if fraud_signals:
+        reasons = [signal["reason"] for signal in fraud_signals]
+        if fraud_reason:
+            reasons.insert(0, fraud_reason)
+        fraud_status = "Anomaly Detected"
+        fraud_reason = "; ".join(reasons)
+
+    risk_result = calculate_risk_score(validation_issues, fraud_status)
+    return {
+        "validation_issues": validation_issues,
+        "fraud_status": fraud_status,
+        "fraud_reason": fraud_reason,
+        "fraud_signals": fraud_signals,
+        "risk_score": risk_result["risk_score"],
+        "eligibility": risk_result["eligibility"]
+    }
@@ -0,0 +1,202 @@
+import logging
+import re
+
+import numpy as np
+from PIL import Image
+
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def otsu_threshold(gray):
+    """
+    Otsu's threshold for a uint8 grayscale array: the darker class is
+    `gray < threshold` (so a pure black-and-white page splits at 1, not 0).
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    cum_mean = np.cumsum(hist * np.arange(256))
+    mean_bg = cum_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cum_mean[-1] - cum_mean) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between)) + 1
+
+
+class ImagePreprocessor:
+    """
+    Cheap clean-up applied to page images before OCR: grayscale, margin
+    cropping, rotation/deskew correction, downscaling to a target text height
+    and optional binarization. Camera photos and scans are often far larger
+    than OCR needs, so most of the win comes from the downscale.
+    """
+
+    def __init__(self, target_text_height=32, min_scale=0.35, max_side=3000, grayscale=True, binarize=False,
+                 crop_margins=True, margin=16, deskew=True, max_skew=5.0, skew_step=0.5,
+                 detect_rotation=False):
+        """
+        :param target_text_height: Desired height in pixels of a text line after scaling
+        :param min_scale: Lower bound on the text-height downscale factor
+        :param max_side: Hard cap on the longest image side
+        :param grayscale: Convert to single-channel grayscale
+        :param binarize: Apply an Otsu threshold (black text on white)
+        :param crop_margins: Trim empty borders around the ink
+        :param margin: Padding in pixels kept around the cropped content
+        :param deskew: Correct small skew angles using a projection profile search
+        :param max_skew: Largest skew angle (degrees) searched by deskew
+        :param skew_step: Angle resolution (degrees) of the deskew search
+        :param detect_rotation: Use tesseract OSD to fix 90/180/270 degree rotations
+        """
+        self.target_text_height = target_text_height
+        self.min_scale = min_scale
+        self.max_side = max_side
+        self.grayscale = grayscale
+        self.binarize = binarize
+        self.crop_margins = crop_margins
+        self.margin = margin
+        self.deskew = deskew
+        self.max_skew = max_skew
+        self.skew_step = skew_step
+        self.detect_rotation = detect_rotation
+
+    def config(self):
+        """Settings that affect the output, e.g. for OCR cache keys."""
+        return dict(vars(self))
+
+    def process(self, image):
+        """
+        :param image: PIL image
+        :return: Preprocessed PIL image
+        """
+        original_pixels = image.width * image.height
+        original_size = image.size
+
+        image = image.convert("L") if self.grayscale else image.convert("RGB")
+        gray = np.asarray(image if image.mode == "L" else image.convert("L"))
+        threshold = otsu_threshold(gray)
+
+        if self.crop_margins:
+            image, gray = self._crop(image, gray, threshold)
+
+        if self.detect_rotation:
+            image = self._fix_rotation(image)
+            gray = np.asarray(image if image.mode == "L" else image.convert("L"))
+
+        if self.deskew:
+            angle = self._estimate_skew(gray, threshold)
+            if abs(angle) >= self.skew_step:
+                logger.info(f"Deskewing page by {angle:.1f} degrees")
+                fill = 255 if image.mode == "L" else (255, 255, 255)
+                image = image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=fill)
+                gray = np.asarray(image if image.mode == "L" else image.convert("L"))
+
+        scale = self._scale_factor(gray, threshold)
+        if scale < 1.0:
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            image = image.resize(size, resample=Image.LANCZOS)
+
+        if self.binarize:
+            gray = np.asarray(image if image.mode == "L" else image.convert("L"))
+            image = Image.fromarray(np.where(gray < otsu_threshold(gray), 0, 255).astype(np.uint8))
+
+        new_pixels = image.width * image.height
+        reduction = 100.0 * (1 - new_pixels / original_pixels) if original_pixels else 0.0
+        logger.info(f"Preprocessed image {original_size} -> {image.size} ({reduction:.0f}% fewer pixels)")
+        return image
+
+    def _crop(self, image, gray, threshold):
+        """
+        Crop to the bounding box of rows/columns that contain some ink.
+        """
+        ink = gray < threshold
+        # Ignore specks: a row/column needs a minimum amount of ink to count
+        rows = np.nonzero(ink.sum(axis=1) > max(1, ink.shape[1] * 0.002))[0]
+        cols = np.nonzero(ink.sum(axis=0) > max(1, ink.shape[0] * 0.002))[0]
+        if len(rows) == 0 or len(cols) == 0:
+            return image, gray
+        top = max(0, rows[0] - self.margin)
+        bottom = min(gray.shape[0], rows[-1] + 1 + self.margin)
+        left = max(0, cols[0] - self.margin)
+        right = min(gray.shape[1], cols[-1] + 1 + self.margin)
+        return image.crop((left, top, right, bottom)), gray[top:bottom, left:right]
+
+    def _fix_rotation(self, image):
+        if not TESSERACT_AVAILABLE:
+            return image
+        try:
+            osd = pytesseract.image_to_osd(image)
+        except Exception as e:
+            logger.warning(f"Rotation detection failed: {e}")
+            return image
+        match = re.search(r"Rotate:\s*(\d+)", osd)
+        angle = int(match.group(1)) if match else 0
+        if angle:
+            logger.info(f"Rotating page by {angle} degrees")
+            # OSD reports the clockwise rotation needed; PIL rotates counter-clockwise
+            image = image.rotate(-angle, expand=True)
+        return image
+
+    def _estimate_skew(self, gray, threshold):
+        """
+        Pick the angle whose horizontal projection profile is sharpest
+        (text lines aligned with rows), searched on a small thumbnail.
+        """
+        thumb = Image.fromarray(np.where(gray < threshold, 255, 0).astype(np.uint8))
+        thumb.thumbnail((600, 600))
+        best_angle, best_score = 0.0, None
+        for angle in np.arange(-self.max_skew, self.max_skew + 1e-9, self.skew_step):
+            rotated = np.asarray(thumb.rotate(float(angle), resample=Image.NEAREST, expand=True))
+            score = np.var(rotated.sum(axis=1, dtype=np.float64))
+            if best_score is None or score > best_score:
+                best_angle, best_score = float(angle), score
+        return best_angle
+
+    def _scale_factor(self, gray, threshold):
+        """
+        Scale needed to bring the median text line height to the target (never upscales).
+        """
+        scale = 1.0
+        longest = max(gray.shape)
+        if self.max_side and longest > self.max_side:
+            scale = self.max_side / longest
+
+        if self.target_text_height:
+            line_height = self._median_line_height(gray < threshold)
+            if line_height:
+                scale = min(scale, max(self.min_scale, self.target_text_height / line_height))
+        return min(scale, 1.0)
+
+    @staticmethod
+    def _median_line_height(ink):
+        """
+        Median height of runs of consecutive rows containing text, or None
+        when the page doesn't look like dark text on a light background.
+        """
+        if ink.mean() > 0.3:
+            # Photos/dark backgrounds: the threshold didn't isolate text
+            return None
+        row_ink = ink.sum(axis=1).astype(np.float64)
+        # Vertical table rules put a constant amount of ink in every row; remove that baseline
+        row_ink -= np.percentile(row_ink, 10)
+        peak = row_ink.max()
+        if peak <= 0:
+            return None
+        has_ink = row_ink > peak * 0.05
+        # Run boundaries: rising and falling edges of the row mask
+        edges = np.diff(np.concatenate(([0], has_ink.astype(np.int8), [0])))
+        starts = np.nonzero(edges == 1)[0]
+        ends = np.nonzero(edges == -1)[0]
+        heights = ends - starts
+        # Very short runs are rules/underlines, very tall ones are merged blocks
+        heights = heights[(heights >= 4) & (heights <= ink.shape[0] * 0.1)]
+        if len(heights) < 3:
+            return None
+        return float(np.median(heights))
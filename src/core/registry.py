@@ -0,0 +1,347 @@
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes():
+    """
+    Resident set size of this process, or None if it cannot be measured.
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        # Linux fallback: second field of statm is resident pages
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of heavy components (OCR readers, spaCy pipelines,
+    detectors). Each component is built by its factory on first use and then
+    shared by the API, the agent tools and the scripts.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        """
+        Register a zero-argument factory. Re-registering drops any loaded instance.
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            self._stats.pop(name, None)
+
+    def get(self, name):
+        """
+        Return the shared instance for `name`, loading it on first use.
+        """
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise KeyError(f"No component registered under '{name}'")
+
+            logger.info(f"Loading shared component '{name}'...")
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            instance = self._factories[name]()
+            load_seconds = time.perf_counter() - start
+            rss_after = _rss_bytes()
+
+            memory_bytes = None
+            if rss_before is not None and rss_after is not None:
+                memory_bytes = rss_after - rss_before
+            self._stats[name] = {"load_seconds": round(load_seconds, 3), "memory_bytes": memory_bytes}
+            logger.info(f"Loaded '{name}' in {load_seconds:.2f}s (RSS delta: {memory_bytes} bytes)")
+
+            self._instances[name] = instance
+            return instance
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def stats(self):
+        """
+        Load time and memory per component; components not yet used show loaded=False.
+        """
+        with self._lock:
+            return {
+                name: {"loaded": name in self._instances, **self._stats.get(name, {})}
+                for name in self._factories
+            }
+
+
+registry = ModelRegistry()
+
+
+# --- Default components ---
+
+# Extraction only reads doc.ents, so these components are never run
+NER_UNUSED_PIPES = ["tagger", "parser", "lemmatizer", "attribute_ruler"]
+
+
+def _disable_unused_pipes(nlp):
+    unused = [name for name in NER_UNUSED_PIPES if name in nlp.pipe_names]
+    if unused:
+        nlp.select_pipes(disable=unused)
+    return nlp
+
+
+# Models behind get_nlp() and get_ner_model()
+SPACY_MODEL = "en_core_web_sm"
+NER_MODEL_PATH = os.path.join("models", "ner_model")
+
+
+def _load_spacy_model():
+    try:
+        import spacy
+        return _disable_unused_pipes(spacy.load(SPACY_MODEL))
+    except (ImportError, OSError):
+        logger.warning("Spacy model not found. Using regex-only extraction.")
+        return None
+
+
+def _load_ner_model():
+    model_path = NER_MODEL_PATH
+    if not os.path.exists(model_path):
+        return None
+    try:
+        import spacy
+        model = _disable_unused_pipes(spacy.load(model_path))
+        logger.info("Loaded custom NER model.")
+        return model
+    except Exception as e:
+        logger.warning(f"Could not load custom NER model: {e}")
+        return None
+
+
+def _build_ocr_engine():
+    from src.core.duplicates import phash
+    from src.core.ocr import OCREngine
+    from src.core.ocr_cache import OCRCache
+    from src.core.preprocess import ImagePreprocessor
+    from src.core.tesseract_pool import TesseractPool
+
+    # Optional persistent OCR cache (duplicate submissions skip OCR entirely)
+    ocr_cache = None
+    if os.getenv("OCR_CACHE_DIR"):
+        ocr_cache = OCRCache(
+            cache_dir=os.getenv("OCR_CACHE_DIR"),
+            max_disk_bytes=int(os.getenv("OCR_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+            ttl=float(os.getenv("OCR_CACHE_TTL")) if os.getenv("OCR_CACHE_TTL") else None
+        )
+
+    preprocessor = None
+    if os.getenv("OCR_PREPROCESS", "0") == "1":
+        preprocessor = ImagePreprocessor(
+            target_text_height=int(os.getenv("OCR_TARGET_TEXT_HEIGHT", 32)),
+            binarize=os.getenv("OCR_BINARIZE", "0") == "1"
+        )
+
+    method = os.getenv("OCR_METHOD", "easyocr")
+    tesseract_pool = None
+    if method == "tesseract" and int(os.getenv("TESSERACT_POOL_SIZE", 0)) > 0:
+        tesseract_pool = TesseractPool(size=int(os.getenv("TESSERACT_POOL_SIZE")))
+
+    return OCREngine(
+        method=method,
+        cache=ocr_cache,
+        workers=int(os.getenv("OCR_WORKERS", 1)),
+        # Bound rasterization so a 16MB upload with hundreds of pages cannot exhaust memory
+        max_pages=int(os.getenv("PDF_MAX_PAGES", 50)),
+        max_document_pixels=int(os.getenv("PDF_MAX_PIXELS", 400_000_000)),
+        max_page_pixels=int(os.getenv("PDF_MAX_PAGE_PIXELS", 25_000_000)),
+        preprocessor=preprocessor,
+        tesseract_pool=tesseract_pool,
+        two_pass=os.getenv("OCR_TWO_PASS", "0") == "1",
+        min_confidence=float(os.getenv("OCR_MIN_CONFIDENCE", 0.6)),
+        # Page-image hashes for the duplicate index, taken from the pages OCR rasterizes anyway
+        page_hasher=phash if os.getenv("DUPLICATE_INDEX_PATH", os.path.join("data", "duplicates.sqlite")) else None
+    )
+
+
+def _build_extractor():
+    from src.core.extraction import DataExtractor
+    from src.core.extraction_cache import ExtractionCache
+
+    # Memo of extraction results, so agent retries and resubmissions skip extraction
+    memo_bytes = int(os.getenv("EXTRACTION_MEMO_BYTES", 16 * 1024 * 1024))
+
+    # Cascade: spaCy/custom NER only run for fields the regex/keyword extractors miss
+    return DataExtractor(
+        cascade=os.getenv("EXTRACTION_CASCADE", "0") == "1",
+        # Long OCR texts: the custom NER model only sees text around name/pay keywords (0 = whole text)
+        ner_window_chars=int(os.getenv("NER_WINDOW_CHARS", 200)) or None,
+        memo=ExtractionCache(max_bytes=memo_bytes) if memo_bytes > 0 else None
+    )
+
+
+def _build_corpus():
+    from src.core.corpus import OCRCorpus
+    # Full OCR text of processed documents, for re-extraction without OCR ("" disables)
+    path = os.getenv("OCR_CORPUS_PATH", os.path.join("data", "ocr_corpus.sqlite"))
+    return OCRCorpus(path) if path else None
+
+
+def _build_feature_log():
+    from src.core.feature_log import FeatureLog
+    # Fraud-model features of processed documents, for retraining ("" disables)
+    path = os.getenv("FEATURE_LOG_PATH", os.path.join("data", "feature_log.bin"))
+    return FeatureLog(path) if path else None
+
+
+def _build_duplicate_index():
+    from src.core.duplicates import DuplicateIndex
+    # PAN / page-image history for duplicate-submission checks ("" disables)
+    path = os.getenv("DUPLICATE_INDEX_PATH", os.path.join("data", "duplicates.sqlite"))
+    if not path:
+        return None
+    return DuplicateIndex(
+        path,
+        window_days=float(os.getenv("PAN_WINDOW_DAYS", 30)),
+        velocity_threshold=int(os.getenv("PAN_VELOCITY_THRESHOLD", 6)),
+        max_distance=int(os.getenv("IMAGE_HASH_MAX_DISTANCE", 10))
+    )
+
+
+def _build_peer_stats():
+    import atexit
+    from src.core.peer_stats import PeerStats
+    # Salary statistics per employer/designation for peer-relative checks ("" disables)
+    path = os.getenv("PEER_STATS_PATH", os.path.join("data", "peer_stats.sqlite"))
+    if not path:
+        return None
+    stats = PeerStats(
+        path,
+        max_groups=int(os.getenv("PEER_STATS_MAX_GROUPS", 50000)),
+        min_count=int(os.getenv("PEER_MIN_COUNT", 20)),
+        z_threshold=float(os.getenv("PEER_Z_THRESHOLD", 3.0))
+    )
+    atexit.register(stats.close)
+    return stats
+
+
+def _build_fraud_detector():
+    from src.core.model_store import ModelStore
+    from src.core.validation import FraudDetector
+    # Versioned models published by scripts/train_model.py ("" = models/anomaly_model.pkl only)
+    store_root = os.getenv("ANOMALY_MODEL_STORE", os.path.join("models", "anomaly"))
+    return FraudDetector(
+        store=ModelStore(store_root) if store_root else None,
+        reload_interval=float(os.getenv("ANOMALY_MODEL_RELOAD_SECONDS", 5))
+    )
+
+
+registry.register("spacy_en", _load_spacy_model)
+registry.register("ner_model", _load_ner_model)
+registry.register("ocr_engine", _build_ocr_engine)
+registry.register("extractor", _build_extractor)
+registry.register("fraud_detector", _build_fraud_detector)
+registry.register("corpus", _build_corpus)
+registry.register("feature_log", _build_feature_log)
+registry.register("duplicate_index", _build_duplicate_index)
+registry.register("peer_stats", _build_peer_stats)
+
+
+def get_nlp():
+    """Shared en_core_web_sm pipeline, or None if spaCy/the model is missing."""
+    return registry.get("spacy_en")
+
+
+def get_ner_model():
+    """Shared custom NER model from models/ner_model, or None if absent."""
+    return registry.get("ner_model")
+
+
+def model_versions():
+    """
+    Installed versions of spaCy, SPACY_MODEL and the custom NER model (its
+    meta.json name/version and modification time), read from package metadata
+    and the model directory without loading any model. None where missing.
+    """
+    from importlib import metadata
+
+    def package_version(name):
+        try:
+            return metadata.version(name)
+        except metadata.PackageNotFoundError:
+            return None
+
+    ner = None
+    meta_path = os.path.join(NER_MODEL_PATH, "meta.json")
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            ner = [meta.get("name"), meta.get("version"), os.path.getmtime(meta_path)]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {meta_path}: {e}")
+    return {"spacy": package_version("spacy"), SPACY_MODEL: package_version(SPACY_MODEL), "ner_model": ner}
+
+
+def get_ocr_engine():
+    return registry.get("ocr_engine")
+
+
+# Offline scripts OCR the same datasets run after run, so they share a persistent cache here
+SCRIPTS_OCR_CACHE_DIR = os.path.join("data", "ocr_cache")
+
+
+def use_scripts_ocr_cache():
+    """
+    Make the OCR engine use SCRIPTS_OCR_CACHE_DIR unless OCR_CACHE_DIR is set.
+    Call before the engine is first loaded.
+    """
+    os.environ.setdefault("OCR_CACHE_DIR", SCRIPTS_OCR_CACHE_DIR)
+
+
+def get_extractor():
+    return registry.get("extractor")
+
+
+def get_fraud_detector():
+    return registry.get("fraud_detector")
+
+
+def get_corpus():
+    """Shared OCRCorpus, or None if disabled."""
+    return registry.get("corpus")
+
+
+def get_feature_log():
+    """Shared FeatureLog, or None if disabled."""
+    return registry.get("feature_log")
+
+
+def get_duplicate_index():
+    """Shared DuplicateIndex, or None if disabled."""
+    return registry.get("duplicate_index")
+
+
+def get_peer_stats():
+    """Shared PeerStats, or None if disabled."""
+    return registry.get("peer_stats")
@@ -0,0 +1,209 @@
+import io
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+try:
+    import tesserocr
+    from tesserocr import RIL, iterate_level
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+_DATA_COLUMNS = ["text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num"]
+
+
+def _empty_data():
+    return {column: [] for column in _DATA_COLUMNS}
+
+
+def _parse_tsv(tsv):
+    """
+    Parse tesseract's TSV output into the column dict pytesseract.image_to_data returns.
+    """
+    data = _empty_data()
+    rows = tsv.splitlines()
+    if not rows:
+        return data
+    header = rows[0].split("\t")
+    for row in rows[1:]:
+        fields = row.split("\t")
+        if len(fields) < len(header):
+            fields += [""] * (len(header) - len(fields))
+        record = dict(zip(header, fields))
+        data["text"].append(record.get("text", ""))
+        for column in _DATA_COLUMNS[1:]:
+            value = record.get(column, "-1") or "-1"
+            data[column].append(float(value) if column == "conf" else int(value))
+    return data
+
+
+class _TesserocrWorker:
+    """
+    Long-lived tesseract instance via the C API: the model is loaded once and
+    images are handed over in memory.
+    """
+
+    def __init__(self, lang):
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def image_to_string(self, image):
+        self.api.SetImage(image)
+        return self.api.GetUTF8Text()
+
+    def image_to_data(self, image):
+        self.api.SetImage(image)
+        self.api.Recognize()
+        data = _empty_data()
+        block = par = line = 0
+        for word in iterate_level(self.api.GetIterator(), RIL.WORD):
+            if word.IsAtBeginningOf(RIL.BLOCK):
+                block += 1
+            if word.IsAtBeginningOf(RIL.PARA):
+                par += 1
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line += 1
+            box = word.BoundingBox(RIL.WORD)
+            if box is None:
+                continue
+            x0, y0, x1, y1 = box
+            data["text"].append(word.GetUTF8Text(RIL.WORD))
+            data["conf"].append(word.Confidence(RIL.WORD))
+            data["left"].append(x0)
+            data["top"].append(y0)
+            data["width"].append(x1 - x0)
+            data["height"].append(y1 - y0)
+            data["block_num"].append(block)
+            data["par_num"].append(par)
+            data["line_num"].append(line)
+        return data
+
+    def close(self):
+        self.api.End()
+
+
+class _StdinWorker:
+    """
+    Fallback when tesserocr is not installed: the image is piped through
+    stdin/stdout instead of temp files, but every call still starts a tesseract
+    process and reloads its model, so the pool only bounds concurrency.
+    """
+
+    def __init__(self, lang, tesseract_cmd):
+        self.cmd = [tesseract_cmd, "stdin", "stdout", "-l", lang]
+
+    def image_to_string(self, image):
+        return self._run(image, [])
+
+    def image_to_data(self, image):
+        return _parse_tsv(self._run(image, ["tsv"]))
+
+    def _run(self, image, extra_args):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        result = subprocess.run(self.cmd + extra_args, input=buffer.getvalue(), capture_output=True, check=True)
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def close(self):
+        pass
+
+
+class TesseractPool:
+    """
+    Fixed-size pool of tesseract workers shared by all OCR threads.
+    Callers block until a worker is free; wait/busy times are tracked so the
+    pool can be sized from its metrics.
+    """
+
+    def __init__(self, size=2, lang="eng", tesseract_cmd="tesseract"):
+        """
+        :param size: Number of workers (concurrent tesseract instances)
+        :param lang: Tesseract language code
+        :param tesseract_cmd: Binary used by the stdin fallback worker
+        """
+        if not TESSEROCR_AVAILABLE and shutil.which(tesseract_cmd) is None:
+            raise RuntimeError("Neither tesserocr nor the tesseract binary is available")
+
+        self.size = size
+        self.backend = "tesserocr" if TESSEROCR_AVAILABLE else "stdin"
+        self._workers = queue.Queue()
+        for _ in range(size):
+            if TESSEROCR_AVAILABLE:
+                self._workers.put(_TesserocrWorker(lang))
+            else:
+                self._workers.put(_StdinWorker(lang, tesseract_cmd))
+        logger.info(f"Started tesseract pool with {size} '{self.backend}' workers")
+        if not TESSEROCR_AVAILABLE:
+            logger.warning("tesserocr is not installed; each OCR call starts a tesseract process "
+                           "(pip install tesserocr for persistent workers)")
+
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._calls = 0
+        self._errors = 0
+        self._wait_seconds = 0.0
+        self._busy_seconds = 0.0
+
+    def image_to_string(self, image):
+        """
+        OCR a PIL image on the next free worker.
+        """
+        return self._call("image_to_string", image)
+
+    def image_to_data(self, image):
+        """
+        Word boxes/confidences for a PIL image, in pytesseract's image_to_data dict format.
+        """
+        return self._call("image_to_data", image)
+
+    def _call(self, method, image):
+        with self._lock:
+            self._waiting += 1
+        start = time.perf_counter()
+        worker = self._workers.get()
+        acquired = time.perf_counter()
+        with self._lock:
+            self._waiting -= 1
+            self._wait_seconds += acquired - start
+        try:
+            return getattr(worker, method)(image)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls += 1
+                self._busy_seconds += time.perf_counter() - acquired
+            self._workers.put(worker)
+
+    def stats(self):
+        with self._lock:
+            calls = self._calls
+            return {
+                "backend": self.backend,
+                "size": self.size,
+                "idle": self._workers.qsize(),
+                "queued": self._waiting,
+                "calls": calls,
+                "errors": self._errors,
+                "avg_wait_ms": round(1000 * self._wait_seconds / calls, 2) if calls else 0.0,
+                "avg_busy_ms": round(1000 * self._busy_seconds / calls, 2) if calls else 0.0,
+            }
+
+    def close(self):
+        """Release all idle workers."""
+        while True:
+            try:
+                worker = self._workers.get_nowait()
+            except queue.Empty:
+                break
+            worker.close()
@@ -3,6 +3,10 @@ from sklearn.ensemble import IsolationForest
 import numpy as np
 import joblib
 import os
+import threading
+import time
+
+from src.core.forest_compiler import CompiledIsolationForest
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -42,19 +46,107 @@ class Validator:
 
         return issues
 
+# Model features, in order
+FEATURE_NAMES = ["basic", "hra", "special", "deductions"]
+
+ANOMALY_REASONS = [
+    "High Income with Zero Tax/Deductions",
+    "Negative values detected in salary components",
+    "Extremely low Basic Salary"
+]
+DEFAULT_ANOMALY_REASON = "Statistical Outlier (Unusual combination of values)"
+
+def compiled_model_path(model_path):
+    """Where scripts/compile_anomaly_model.py stores the compiled form of a model."""
+    return os.path.splitext(model_path)[0] + ".compiled.joblib"
+
 class FraudDetector:
-    def __init__(self, model_path='models/anomaly_model.pkl'):
+    def __init__(self, model_path='models/anomaly_model.pkl', store=None, reload_interval=5.0):
+        """
+        :param model_path: Model file used when the store has no published version
+        :param store: Optional ModelStore; its CURRENT version is used and hot-reloaded
+        :param reload_interval: Seconds between checks of the store for a new CURRENT
+                                version (0 = only reload through reload())
+        """
         self.model_path = model_path
-        self.model = self._load_or_train_model()
+        self.store = store
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._seen_mtime = store.current_mtime() if store is not None else None
+        # (version, model) swapped as one reference: a request that already took
+        # the model keeps scoring with it while a newer version is loaded
+        self._active = self._load_active()
+
+    @property
+    def model(self):
+        return self._active[1]
+
+    @property
+    def model_version(self):
+        """Store version of the active model (None for the model_path fallback)."""
+        return self._active[0]
+
+    def _load_active(self):
+        if self.store is not None:
+            version, model = self.store.load()
+            if model is not None:
+                logger.info(f"Loaded anomaly model {version} from {self.store.root}")
+                return version, model
+        return None, self._load_or_train_model()
+
+    def _current_model(self):
+        """Active model for one call, after a throttled check of the store for a new version."""
+        if self.store is not None and self.reload_interval > 0:
+            now = time.monotonic()
+            if now - self._last_check >= self.reload_interval:
+                self._last_check = now
+                mtime = self.store.current_mtime()
+                if mtime != self._seen_mtime:
+                    self._seen_mtime = mtime
+                    try:
+                        self.reload()
+                    except Exception as e:
+                        logger.error(f"Anomaly model reload failed, keeping {self.model_version}: {e}")
+        return self._active[1]
+
+    def reload(self, version=None):
+        """
+        Load the store's CURRENT version (or activate `version` first) and swap it in.
+        :return: {"previous", "version", "reloaded"}
+        """
+        if self.store is None:
+            raise ValueError("FraudDetector has no model store to reload from")
+        with self._reload_lock:
+            if version is not None:
+                self.store.activate(version)
+            previous = self.model_version
+            target = self.store.current_version()
+            if target is None or target == previous:
+                return {"previous": previous, "version": previous, "reloaded": False}
+            self._active = self.store.load(target)
+            self._seen_mtime = self.store.current_mtime()
+            logger.info(f"Anomaly model hot-swapped: {previous} -> {target}")
+            return {"previous": previous, "version": target, "reloaded": True}
 
     def _load_or_train_model(self):
+        compiled_path = compiled_model_path(self.model_path)
+        if os.path.exists(compiled_path) and (
+                not os.path.exists(self.model_path)
+                or os.path.getmtime(compiled_path) >= os.path.getmtime(self.model_path)):
+            return CompiledIsolationForest.load(compiled_path)
         if os.path.exists(self.model_path):
-            return joblib.load(self.model_path)
+            model = joblib.load(self.model_path)
+            if isinstance(model, IsolationForest):
+                # Same scores as sklearn, without its per-call overhead
+                return CompiledIsolationForest.from_sklearn(model)
+            return model
         else:
             logger.warning(f"Model not found at {self.model_path}. Please run scripts/train_model.py")
             # Return a dummy object that always predicts Normal to avoid crash
             class DummyModel:
                 def predict(self, X): return [1] * len(X)
+                def decision_function(self, X): return [0.0] * len(X)
             return DummyModel()
 
     def check_anomaly(self, salary_input):
@@ -62,35 +154,95 @@ class FraudDetector:
         Check if the salary components look anomalous.
         Input can be a list [Basic, HRA, Special, Deductions] OR a dict of components.
         """
-        features = [0, 0, 0, 0] # Default [Basic, HRA, Special, Deductions]
-        
-        if isinstance(salary_input, dict):
-            # Map extracted components to model features
-            basic = salary_input.get("basic_salary", 0)
-            hra = salary_input.get("hra", 0)
-            deductions = salary_input.get("total_deductions", 0)
-            # Special allowance is often the rest
-            total = salary_input.get("total_earnings", 0)
-            special = max(0, total - (basic + hra))
-            
-            features = [basic, hra, special, deductions]
-        elif isinstance(salary_input, list) and len(salary_input) == 4:
-            features = salary_input
-        else:
+        # Same feature builder as check_anomaly_batch (missing or None components count as 0)
+        X, valid = self.build_features([salary_input])
+        if not valid[0]:
             return "Skipped (Insufficient Data)"
         
-        # Ensure input is 2D array
-        prediction = self.model.predict([features])
+        prediction = self._current_model().predict(X)
         
         # IsolationForest returns -1 for anomalies, 1 for normal
         is_anomaly = prediction[0] == -1
         
         if is_anomaly:
-            reason = self._explain_anomaly(features)
+            reason = self._explain_anomaly(X[0].tolist())
             return {"status": "Anomaly Detected", "reason": reason}
         else:
             return {"status": "Normal", "reason": None}
 
+    def check_anomaly_batch(self, salary_inputs):
+        """
+        Score many documents in one model call.
+        :param salary_inputs: List of extracted-data dicts / [Basic, HRA, Special, Deductions]
+                              lists, or an (n, 4) NumPy array of features
+        :return: One result per input, in order: {"status", "reason", "score"} where
+                 score is the model's decision_function (negative = anomalous), or
+                 "Skipped (Insufficient Data)" for inputs check_anomaly would skip
+        """
+        X, valid = self.build_features(salary_inputs)
+        results = ["Skipped (Insufficient Data)"] * len(valid)
+        if not valid.any():
+            return results
+
+        rows = X[valid]
+        model = self._current_model()
+        scores = np.asarray(model.decision_function(rows), dtype=np.float64)
+        if isinstance(model, (IsolationForest, CompiledIsolationForest)):
+            # Same rule as IsolationForest.predict, without scoring the trees twice
+            labels = np.where(scores < 0, -1, 1)
+        else:
+            labels = np.asarray(model.predict(rows))
+        reasons = self.explain_anomalies(rows)
+
+        for i, label, score, reason in zip(np.nonzero(valid)[0], labels, scores, reasons):
+            if label == -1:
+                results[i] = {"status": "Anomaly Detected", "reason": reason, "score": float(score)}
+            else:
+                results[i] = {"status": "Normal", "reason": None, "score": float(score)}
+        return results
+
+    @staticmethod
+    def build_features(salary_inputs):
+        """
+        Feature matrix [Basic, HRA, Special, Deductions] for a batch of inputs.
+        :return: (X as an (n, 4) float64 array, boolean mask of usable rows)
+        """
+        if isinstance(salary_inputs, np.ndarray):
+            X = np.asarray(salary_inputs, dtype=np.float64).reshape(-1, 4)
+            return X, np.ones(len(X), dtype=bool)
+
+        n = len(salary_inputs)
+        X = np.zeros((n, 4), dtype=np.float64)
+        valid = np.zeros(n, dtype=bool)
+        dict_rows = [i for i, item in enumerate(salary_inputs) if isinstance(item, dict)]
+        if dict_rows:
+            # Columns of the dict inputs, then Special = Total - (Basic + HRA) for all at once
+            columns = np.array([[salary_inputs[i].get(key, 0) or 0 for i in dict_rows]
+                                for key in ("basic_salary", "hra", "total_earnings", "total_deductions")],
+                               dtype=np.float64)
+            basic, hra, total, deductions = columns
+            X[dict_rows] = np.column_stack([basic, hra, np.maximum(0, total - (basic + hra)), deductions])
+            valid[dict_rows] = True
+        for i, item in enumerate(salary_inputs):
+            if isinstance(item, list) and len(item) == 4:
+                X[i] = item
+                valid[i] = True
+        return X, valid
+
+    @staticmethod
+    def explain_anomalies(X):
+        """
+        Vectorized _explain_anomaly over the rows of a feature matrix.
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 4)
+        basic, deductions = X[:, 0], X[:, 3]
+        conditions = [
+            (basic > 100000) & (deductions == 0),
+            (X < 0).any(axis=1),
+            (basic < 1000) & (basic > 0)
+        ]
+        return np.select(conditions, ANOMALY_REASONS, default=DEFAULT_ANOMALY_REASON).tolist()
+
     def _explain_anomaly(self, features):
         """
         Heuristic to explain why the model might have flagged this.
@@ -99,12 +251,12 @@ class FraudDetector:
         basic, hra, special, deductions = features
         
         if basic > 100000 and deductions == 0:
-            return "High Income with Zero Tax/Deductions"
+            return ANOMALY_REASONS[0]
         
         if any(x < 0 for x in features):
-            return "Negative values detected in salary components"
+            return ANOMALY_REASONS[1]
             
         if basic < 1000 and basic > 0: # Only flag if non-zero but low
-            return "Extremely low Basic Salary"
+            return ANOMALY_REASONS[2]
             
-        return "Statistical Outlier (Unusual combination of values)"
+        return DEFAULT_ANOMALY_REASON
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Add project root to sys.path (the repo is not installed as a package)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,87 @@
+import csv
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from src.core.corpus import OCRCorpus
+
+_spec = importlib.util.spec_from_file_location(
+    "reextract_corpus",
+    os.path.join(os.path.dirname(__file__), "..", "scripts", "reextract_corpus.py")
+)
+reextract_script = importlib.util.module_from_spec(_spec)
+# Worker processes look _process_chunk up by module name
+sys.modules["reextract_corpus"] = reextract_script
+_spec.loader.exec_module(reextract_script)
+
+
+def _slip(i):
+    return f"Name: John Doe\nPAN: ABCDE1234F\nNet Pay: {40000 + i}\n"
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = OCRCorpus(str(tmp_path / "corpus.sqlite"))
+    yield corpus
+    corpus.close()
+
+
+def test_documents_and_results_round_trip(corpus):
+    for i in range(1200):
+        corpus.add_document(f"d{i:04d}", f"slip{i}.jpg", _slip(i))
+    corpus.store_results((f"d{i:04d}", {"net_pay": i}) for i in range(0, 1200, 2))
+
+    assert corpus.count() == 1200
+    docs = list(corpus.iter_documents(batch_size=100))
+    assert [doc["doc_id"] for doc in docs] == [f"d{i:04d}" for i in range(1200)]
+    assert docs[7] == {"doc_id": "d0007", "filename": "slip7.jpg", "text": _slip(7), "layout": None}
+
+    # Lookups for a subset span several parameter batches and skip ids without a result
+    wanted = [f"d{i:04d}" for i in range(0, 1200, 1)] + ["missing"]
+    found = corpus.results(wanted)
+    assert len(found) == 600 and found["d1198"] == {"net_pay": 1198}
+    assert corpus.results(iter(["d0002", "d0003"])) == {"d0002": {"net_pay": 2}}
+    assert len(corpus.results()) == 600
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reextract_diffs_against_the_stored_results(corpus, tmp_path, capsys, workers):
+    for i in range(20):
+        corpus.add_document(f"d{i:02d}", f"slip{i}.jpg", _slip(i))
+    # An older run that read the net pay wrong on every other slip
+    corpus.store_results((f"d{i:02d}", {"extracted_data": {"net_pay": 1.0}, "fraud_signals": []})
+                         for i in range(0, 20, 2))
+
+    output = str(tmp_path / "diff.csv")
+    reextract_script.reextract(corpus.path, output, workers=workers, chunk_size=3, update=True)
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    net_pay = {row["doc_id"]: row for row in rows if row["field"] == "net_pay"}
+    assert set(net_pay) == {f"d{i:02d}" for i in range(20)}
+    assert net_pay["d04"]["old"] == "1.0" and net_pay["d04"]["new"] == "40004.0"
+    assert net_pay["d05"]["old"] == "null"
+
+    # The new results are now the baseline, so a second run finds no changes
+    assert corpus.results(["d04"])["d04"]["extracted_data"]["net_pay"] == 40004.0
+    reextract_script.reextract(corpus.path, output, workers=workers, chunk_size=7, update=False)
+    with open(output, newline="") as f:
+        assert list(csv.DictReader(f)) == []
+    assert "Changed documents: 0" in capsys.readouterr().out
+
+
+def test_chunks_in_flight_are_bounded(capsys):
+    read = []
+
+    def chunks():
+        for i in range(30):
+            read.append(i)
+            yield [{"doc_id": f"d{i}", "text": _slip(i), "layout": None}], i
+
+    processed = reextract_script._iter_processed(chunks(), workers=2)
+    _, first, results = next(processed)
+    # The corpus is not read ahead of the workers
+    assert len(read) <= 2 * 2
+    assert results[0][0] == f"d{first}"
+    assert sorted([first] + [context for _, context, _ in processed]) == list(range(30))
@@ -0,0 +1,150 @@
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.core.duplicates import (
+    DuplicateIndex, HASH_BITS, MAX_HASH_DISTANCE, content_digest, hamming, image_file_hashes, phash
+)
+
+
+def _flip(hex_hash, bits):
+    value = int(hex_hash, 16)
+    for bit in bits:
+        value ^= 1 << bit
+    return f"{value:0{HASH_BITS // 4}x}"
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DuplicateIndex(str(tmp_path / "duplicates.sqlite"), max_distance=10)
+    yield index
+    index.close()
+
+
+def test_mih_lookup_matches_brute_force(index):
+    rng = random.Random(24)
+    stored = {}
+    for i in range(200):
+        base = f"{rng.getrandbits(HASH_BITS):064x}"
+        stored[f"s{i}"] = base
+        index.check_and_record(f"s{i}", f"doc{i}", f"{i}.jpg", hashes=[base])
+        # Near copies of some stored hashes, at every distance up to the MIH limit
+        if i % 10 == 0:
+            for distance in range(MAX_HASH_DISTANCE + 1):
+                near = _flip(base, rng.sample(range(HASH_BITS), distance))
+                stored[f"s{i}-{distance}"] = near
+                index.check_and_record(f"s{i}-{distance}", f"doc{i}-{distance}", "x.jpg", hashes=[near])
+
+    for _ in range(100):
+        query = _flip(rng.choice(list(stored.values())), rng.sample(range(HASH_BITS), rng.randint(0, 12)))
+        expected = {sid: hamming(query, h) for sid, h in stored.items() if hamming(query, h) <= index.max_distance}
+        assert index.similar_images([query]) == expected
+
+
+def test_image_match_needs_matching_content(index):
+    base = f"{random.Random(1).getrandbits(HASH_BITS):064x}"
+    near = _flip(base, range(6))
+    assert index.check_and_record("a", "doc-a", "a.jpg", pan="ABCDE1234F", net_pay=40000, hashes=[base],
+                                  text="Name: John Doe\nNet Pay: 40,000") == []
+
+    # Same template, different slip: no signal
+    assert index.check_and_record("b", "doc-b", "b.jpg", pan="FGHIJ5678K", net_pay=52000, hashes=[near],
+                                  text="Name: Jane Roe\nNet Pay: 52,000") == []
+
+    # Same text after OCR noise in case/whitespace/punctuation
+    signals = index.check_and_record("c", "doc-c", "c.jpg", hashes=[near], text="name john doe  net pay 40000")
+    assert [s["signal"] for s in signals] == ["duplicate_image"]
+    assert signals[0]["matches"] == ["a"]
+
+    # Same PAN and net pay with a different OCR reading
+    signals = index.check_and_record("d", "doc-d", "d.jpg", pan="FGHIJ5678K", net_pay=52100, hashes=[near],
+                                     text="garbled")
+    assert "duplicate_image" in [s["signal"] for s in signals]
+    assert "b" in next(s for s in signals if s["signal"] == "duplicate_image")["matches"]
+
+
+def test_loan_file_of_monthly_slips_is_not_flagged(index):
+    # The last three monthly slips of one applicant, one with a bonus
+    for i, (period, pay) in enumerate([("2023-01", 40000), ("2023-02", 40000), ("2023-03", 65000)]):
+        assert index.check_and_record(f"slip{i}", f"doc{i}", f"slip{i}.pdf", pan="ABCDE1234F", net_pay=pay,
+                                      pay_period=period, now=i) == []
+    # Re-uploads of one month count as one slip
+    for i in range(5):
+        signals = index.check_and_record(f"again{i}", f"again{i}", "again.pdf", pan="ABCDE1234F", net_pay=40000,
+                                         pay_period="2023-01", now=10 + i)
+        assert "pan_velocity" not in {s["signal"] for s in signals}
+
+
+def test_file_and_pan_signals(index):
+    day = 86400
+    assert index.check_and_record("same", "same", "a.jpg", pan="ABCDE1234F", net_pay=40000,
+                                  pay_period="2023-01", now=0) == []
+    # A retry of the same upload doesn't flag itself; the same file a day later does
+    assert index.check_and_record("same", "same", "a.jpg", pan="ABCDE1234F", net_pay=40000,
+                                  pay_period="2023-01", now=60) == []
+    signals = {s["signal"]: s for s in index.check_and_record("same", "same", "renamed.jpg", pan="ABCDE1234F",
+                                                              net_pay=40000, pay_period="2023-01", now=day)}
+    assert signals["duplicate_file"]["matches"] == ["same"]
+    assert "a.jpg" in signals["duplicate_file"]["reason"]
+
+    # Same PAN and month, different net pay
+    signals = {s["signal"]: s for s in index.check_and_record("b", "b", "b.jpg", pan="ABCDE1234F", net_pay=60000,
+                                                              pay_period="2023-01", now=2 * day)}
+    assert signals["pan_salary_mismatch"]["matches"] == ["same"]
+
+    # Many different months of one PAN within the window
+    for month in range(2, 6):
+        signals = {s["signal"] for s in index.check_and_record(f"m{month}", f"m{month}", "m.jpg", pan="ABCDE1234F",
+                                                               net_pay=40000, pay_period=f"2023-{month:02d}",
+                                                               now=3 * day)}
+    assert "pan_velocity" not in signals
+    signals = {s["signal"] for s in index.check_and_record("m6", "m6", "m.jpg", pan="ABCDE1234F", net_pay=40000,
+                                                           pay_period="2023-06", now=3 * day)}
+    assert "pan_velocity" in signals
+    # Outside the 30-day window the PAN history is forgotten
+    assert index.check_and_record("d", "new", "d.jpg", pan="ABCDE1234F", net_pay=90000,
+                                  pay_period="2023-01", now=60 * day) == []
+
+
+def test_pay_period_is_read_from_the_slip():
+    from src.core.duplicates import find_pay_period
+    assert find_pay_period("Salary Slip NOV - 19\nName: A") == "2019-11"
+    assert find_pay_period("Pay period: January 2023") == "2023-01"
+    assert find_pay_period("Name: John Doe\nDate: 01/01/2023") is None
+
+
+def test_max_distance_is_bounded_by_chunking(tmp_path):
+    with pytest.raises(ValueError):
+        DuplicateIndex(str(tmp_path / "d.sqlite"), max_distance=MAX_HASH_DISTANCE + 1)
+
+
+def _slip_image(seed):
+    rng = random.Random(seed)
+    image = Image.new("RGB", (850, 1100), "white")
+    draw = ImageDraw.Draw(image)
+    for row in range(30):
+        y = 40 + row * 34
+        draw.rectangle([60, y, 60 + rng.randint(100, 700), y + 14], fill=(0, 0, 0))
+    return image
+
+
+def test_phash_is_robust_to_reencoding(tmp_path):
+    original = _slip_image(1)
+    buffer = io.BytesIO()
+    original.resize((566, 733)).save(buffer, format="JPEG", quality=50)
+    reencoded = Image.open(io.BytesIO(buffer.getvalue()))
+    assert hamming(phash(original), phash(reencoded)) <= 10
+    assert hamming(phash(original), phash(_slip_image(2))) > 10
+
+    path = tmp_path / "slip.png"
+    original.save(path)
+    assert image_file_hashes(str(path)) == [phash(original)]
+    assert image_file_hashes(str(tmp_path / "slip.pdf")) == []
+
+
+def test_content_digest_normalizes_ocr_noise():
+    assert content_digest("Net Pay: 40,000") == content_digest("net pay 40000")
+    assert content_digest("Net Pay: 40,000") != content_digest("Net Pay: 40,001")
+    assert content_digest("  ") is None
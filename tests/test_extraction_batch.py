@@ -0,0 +1,164 @@
+import re
+from collections import namedtuple
+
+import pytest
+
+from src.core.extraction import DataExtractor
+from src.core.extraction_cache import ExtractionCache
+
+Entity = namedtuple("Entity", ["text", "label_", "start_char", "end_char"])
+
+
+class FakeDoc:
+    def __init__(self, ents):
+        self.ents = ents
+
+
+class FakeModel:
+    """Rule-based stand-in for a spaCy pipeline: __call__, pipe, meta and pipe_names."""
+
+    def __init__(self, name, rules):
+        self.rules = [(re.compile(pattern), label) for pattern, label in rules]
+        self.meta = {"name": name, "version": "0.0.1"}
+        self.pipe_names = ["ner"]
+        self.texts_seen = 0
+        self.seen = []
+
+    def __call__(self, text):
+        self.texts_seen += 1
+        self.seen.append(text)
+        return FakeDoc([Entity(m.group(1), label, m.start(1), m.end(1))
+                        for pattern, label in self.rules for m in pattern.finditer(text)])
+
+    def pipe(self, texts, batch_size=64, n_process=1):
+        for text in texts:
+            yield self(text)
+
+
+@pytest.fixture
+def models(monkeypatch):
+    nlp = FakeModel("fake_sm", [(r"\bMr\.? ([A-Z][a-z]+ [A-Z][a-z]+)", "PERSON"),
+                                (r"\b((?:Globex|Initech) Corp)\b", "ORG")])
+    ner = FakeModel("fake_ner", [(r"Net Pay:? ?(?:Rs\.? ?)?([\d,]+)", "NET_PAY"),
+                                 (r"Gross:? ?([\d,]+)", "SALARY"),
+                                 (r"Employee ([A-Z][a-z]+ [A-Z][a-z]+)", "EMPLOYEE_NAME")])
+    monkeypatch.setattr(DataExtractor, "nlp", property(lambda self: nlp))
+    monkeypatch.setattr(DataExtractor, "ner_model", property(lambda self: ner))
+    return nlp, ner
+
+
+CORPUS = [
+    "Acme Technologies Pvt. Ltd.\nName: John Doe\nDesignation: Engineer\nPAN: ABCDE1234F\n"
+    "Basic Salary 20,000\nHRA 8,000\nTotal Earnings 50,000\nTotal Deductions 10,000\nNet Pay: 40,000\n",
+    # Single-line OCR stream
+    "SALARY SLIP NOV-19 Employee John Smith PAN FGHIJ5678K Gross 61,500 Deductions 1,500 Net Pay Rs. 60,000",
+    # Names and organizations only the spaCy stand-in finds
+    "Pay advice for Mr Arthur Dent of Globex Corp\nHDFC Bank Ltd\nNet Salary Rs. 1,234.00\n",
+    "Initech Corp\nTake Home 45,500\nphone 9876543210 aadhaar 1234 5678 9012\n",
+    "",
+    "no fields here at all 2023",
+    # Long text, so the custom NER model only sees windows around the keywords
+    "filler " * 300 + "Net Pay: 70,000 " + "filler " * 300 + "Employee Jane Roe",
+    "Name: Jane Roe\nTotal 75,000\n",
+]
+
+
+@pytest.mark.parametrize("cascade", [False, True])
+def test_batch_matches_single_extraction(models, capsys, cascade):
+    extractor = DataExtractor(cascade=cascade)
+    corpus = CORPUS * 2
+    single = [extractor.extract_entities(text) for text in corpus]
+    assert extractor.extract_entities_batch(corpus, batch_size=3) == single
+    assert list(extractor.iter_extract_entities(iter(corpus))) == single
+    # The rules above are exercised, not just the regex fallbacks
+    tiers = {tier for data in single for tier in data["extraction_tiers"].values()}
+    assert {"spacy", "ner"} <= tiers
+
+
+def test_memoized_batch_matches_single_extraction(models, capsys):
+    extractor = DataExtractor(memo=ExtractionCache())
+    batch = extractor.extract_entities_batch(CORPUS)
+    assert [DataExtractor().extract_entities(text) for text in CORPUS] == batch
+    assert [extractor.extract_entities(text) for text in CORPUS] == batch
+    assert extractor.memo.hits == len(CORPUS)
+
+
+def test_cascade_skips_models_when_regex_suffices(models, capsys):
+    nlp, ner = models
+    complete = CORPUS[0].replace("Acme Technologies Pvt. Ltd.", "Mr Tom Baker of Globex Corp")
+    data = DataExtractor(cascade=True).extract_entities(complete)
+    assert data["net_pay"] == 40000
+    assert (nlp.texts_seen, ner.texts_seen) == (1, 0)
+
+
+def test_cascade_runs_models_only_for_texts_that_need_them(models, capsys):
+    nlp, ner = models
+    texts = [CORPUS[0], CORPUS[2], CORPUS[0], CORPUS[3]]
+    batch = DataExtractor(cascade=True).extract_entities_batch(texts)
+
+    # Regex and keywords cover the first slip; the others lack a name or an organization
+    assert nlp.seen == [CORPUS[2], CORPUS[3]] and ner.seen == [CORPUS[2], CORPUS[3]]
+    assert batch[0] == batch[2] and batch[0]["extraction_tiers"]["names"] == "regex"
+    assert batch[1]["names"] == ["Arthur Dent"] and batch[1]["extraction_tiers"]["names"] == "spacy"
+    assert batch[3]["orgs"] == ["Initech Corp"]
+
+
+def test_cascade_does_not_load_unneeded_models(monkeypatch, capsys):
+    loaded = []
+    monkeypatch.setattr(DataExtractor, "nlp", property(lambda self: loaded.append("nlp")))
+    monkeypatch.setattr(DataExtractor, "ner_model", property(lambda self: loaded.append("ner")))
+    extractor = DataExtractor(cascade=True)
+    extractor.extract_entities_batch([CORPUS[0]] * 3)
+    assert loaded == []
+    extractor.extract_entities(CORPUS[3])
+    assert loaded == ["nlp", "ner"]
+
+
+def test_cascade_keeps_regex_fields_over_the_ner_model(models, capsys):
+    nlp, ner = models
+    # No name for the regex, so the NER model runs, but the keyword net pay stands
+    text = "Globex Corp\nNet Pay 40,000\nNet Pay: 39,000\nTotal Earnings 45,000\nEmployee Jane Roe\n"
+    data = DataExtractor(cascade=True).extract_entities(text)
+    assert ner.seen == [text]
+    assert data["names"] == ["Jane Roe"] and data["extraction_tiers"]["names"] == "ner"
+    assert data["net_pay"] == 40000 and data["extraction_tiers"]["net_pay"] == "keyword"
+    assert DataExtractor().extract_entities(text)["net_pay"] == 39000
+
+
+def test_ner_windows_cover_the_keywords_of_long_texts():
+    extractor = DataExtractor(ner_window_chars=100)
+    text = "filler " * 100 + "Net Pay: 70,000 and Total Earnings 80,000 " + "filler " * 100 + "Name: Jane Roe " + "x" * 50
+    windows = extractor._ner_windows(text, extractor.scanner.scan(text))
+
+    # Nearby keywords share one window; each window starts and ends at whitespace
+    assert len(windows) == 2
+    (first_begin, first_end), (second_begin, second_end) = windows
+    assert first_begin < text.index("Net Pay") and text.index("80,000") < first_end
+    assert second_begin < text.index("Name:") and second_end == len(text)
+    for begin, end in windows:
+        assert (begin == 0 or text[begin - 1] == " ") and (end == len(text) or text[end] == " ")
+    assert sum(end - begin for begin, end in windows) < len(text) / 2
+
+
+def test_short_or_keywordless_texts_are_read_whole():
+    extractor = DataExtractor(ner_window_chars=100)
+    for text in ["Net Pay: 40,000", "filler " * 200, "Net Pay " * 100]:
+        assert extractor._ner_windows(text, extractor.scanner.scan(text)) == [(0, len(text))]
+    unwindowed = DataExtractor(ner_window_chars=None)
+    text = "filler " * 300 + "Net Pay: 70,000"
+    assert unwindowed._ner_windows(text, unwindowed.scanner.scan(text)) == [(0, len(text))]
+
+
+def test_ner_entity_offsets_point_into_the_full_text(models):
+    _, ner = models
+    extractor = DataExtractor(ner_window_chars=100)
+    text = "Employee John Doe " + "filler " * 150 + "Net Pay: 70,000 " + "filler " * 150 + "Name: Employee Jane Roe"
+    texts = [text, CORPUS[0]]
+    entities = extractor._ner_entities(ner, texts, [extractor.scanner.scan(t) for t in texts])
+    assert [(ent.text, ent.label_) for ent in entities[0]] == [("70,000", "NET_PAY"), ("Jane Roe", "EMPLOYEE_NAME")]
+    for ent in entities[0]:
+        assert text[ent.start_char:ent.end_char] == ent.text
+    assert ("40,000", "NET_PAY") in [(ent.text, ent.label_) for ent in entities[1]]
+    # The model saw two windows of the long text (missing the name far from any keyword) and the short text whole
+    assert len(ner.seen) == 3 and ner.seen[-1] == CORPUS[0]
+    assert "John Doe" not in "".join(ner.seen[:2]) and sum(map(len, ner.seen[:2])) < len(text) / 2
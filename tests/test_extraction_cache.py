@@ -0,0 +1,58 @@
+from src.core.extraction import DataExtractor
+from src.core.extraction_cache import ExtractionCache
+
+SLIP = "Name: John Doe\nDesignation: Engineer\nPAN: ABCDE1234F\nNet Pay: Rs. 40,000\n"
+
+
+def test_memo_hits_return_independent_copies():
+    memo = ExtractionCache()
+    extractor = DataExtractor(memo=memo)
+    first = extractor.extract_entities(SLIP)
+    first["names"].append("tampered")
+    second = extractor.extract_entities(SLIP)
+    assert (memo.misses, memo.hits) == (1, 1)
+    assert "tampered" not in second["names"]
+
+
+def test_fingerprint_change_invalidates_memo():
+    memo = ExtractionCache()
+    extractor = DataExtractor(memo=memo)
+    assert extractor.extract_entities(SLIP)["designation"] == "Engineer"
+
+    old_fingerprint = extractor.fingerprint()
+    extractor.patterns["designation_regex"] = r"(?i)\bNet Pay\b[ \t]*:[ \t]*(Rs)"
+    assert extractor.fingerprint() != old_fingerprint
+
+    data = extractor.extract_entities(SLIP)
+    assert data["designation"] == "Rs"
+    assert memo.invalidations == 1
+    assert memo.misses == 2 and memo.hits == 0
+
+
+def test_results_computed_under_old_fingerprint_are_dropped():
+    memo = ExtractionCache()
+    stale_key = memo.make_key("old", SLIP)
+    memo.make_key("new", SLIP)
+    memo.set(stale_key, {"pan": "ABCDE1234F"})
+    assert memo.get(stale_key) is None
+    assert memo.get(memo.make_key("new", SLIP)) is None
+
+
+def test_byte_budget_evicts_least_recently_used():
+    memo = ExtractionCache(max_bytes=60)
+    keys = [memo.make_key("fp", f"text {i}") for i in range(3)]
+    for key in keys:
+        memo.set(key, {"value": "x" * 10})
+    assert memo.get(keys[0]) is None
+    assert memo.get(keys[2]) == {"value": "x" * 10}
+
+
+def test_fingerprint_does_not_load_models(monkeypatch):
+    def not_loaded(self):
+        raise AssertionError("fingerprint loaded a model")
+
+    monkeypatch.setattr(DataExtractor, "nlp", property(not_loaded))
+    monkeypatch.setattr(DataExtractor, "ner_model", property(not_loaded))
+    extractor = DataExtractor(cascade=True)
+    assert extractor.fingerprint() == extractor.fingerprint()
+    assert DataExtractor(cascade=False).fingerprint() != extractor.fingerprint()
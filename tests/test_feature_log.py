@@ -0,0 +1,139 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from src.core.feature_log import FeatureLog, MAGIC, RECORD_DTYPE
+from src.core.model_store import ModelStore
+
+_spec = importlib.util.spec_from_file_location(
+    "retrain_anomaly_model",
+    os.path.join(os.path.dirname(__file__), "..", "scripts", "retrain_anomaly_model.py")
+)
+retrain_script = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(retrain_script)
+
+
+def test_append_and_read_back(tmp_path):
+    log = FeatureLog(str(tmp_path / "features.bin"))
+    rows = np.arange(40, dtype=np.float32).reshape(10, 4)
+    log.append(rows[:3], timestamp=100.0)
+    log.append(rows[3:], timestamp=200.0)
+    log.append([])
+    assert log.count() == 10
+    np.testing.assert_array_equal(np.vstack(list(log.iter_chunks(chunk_rows=4))), rows)
+    np.testing.assert_array_equal(np.vstack(list(log.iter_chunks(since=150.0))), rows[3:])
+
+
+def test_partial_record_is_ignored_and_truncated(tmp_path):
+    path = str(tmp_path / "features.bin")
+    log = FeatureLog(path)
+    log.append(np.ones((5, 4)))
+    # A writer killed mid-record leaves a partial record at the end
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD_DTYPE.itemsize // 2))
+    assert sum(len(chunk) for chunk in log.iter_chunks()) == 5
+
+    log = FeatureLog(path)
+    assert os.path.getsize(path) == len(MAGIC) + 5 * RECORD_DTYPE.itemsize
+    log.append(np.full((2, 4), 7.0))
+    data = np.vstack(list(log.iter_chunks()))
+    assert len(data) == 7
+    np.testing.assert_array_equal(data[5:], 7.0)
+
+
+def test_not_a_feature_log(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOTALOG!" + b"\x00" * RECORD_DTYPE.itemsize)
+    with pytest.raises(ValueError):
+        list(FeatureLog(str(path)).iter_chunks())
+
+
+def test_reservoir_sample_is_uniform():
+    rng = np.random.default_rng(23)
+    n, size, trials = 1000, 100, 2000
+    stream = np.repeat(np.arange(n, dtype=np.float32)[:, None], 4, axis=1)
+    counts = np.zeros(n)
+    for _ in range(trials):
+        # Uneven chunk sizes, including chunks that straddle the reservoir filling up
+        cuts = np.sort(rng.choice(np.arange(1, n), size=7, replace=False))
+        sample, seen = retrain_script.reservoir_sample(np.split(stream, cuts), size, rng)
+        assert seen == n and len(sample) == size
+        assert len(np.unique(sample[:, 0])) == size
+        counts[sample[:, 0].astype(int)] += 1
+
+    inclusion = counts / trials
+    # Every row is kept with probability size / n; compare early, middle and late rows
+    assert abs(inclusion.mean() - size / n) < 1e-9
+    for block in np.split(inclusion, 10):
+        assert abs(block.mean() - size / n) < 0.01
+
+
+def test_reservoir_sample_smaller_stream():
+    rng = np.random.default_rng(0)
+    chunks = [np.ones((3, 4), dtype=np.float32), 2 * np.ones((2, 4), dtype=np.float32)]
+    sample, seen = retrain_script.reservoir_sample(chunks, 10, rng)
+    assert seen == 5
+    np.testing.assert_array_equal(sample[:, 0], [1, 1, 1, 2, 2])
+
+
+def test_readonly_log_does_not_truncate(tmp_path):
+    path = str(tmp_path / "features.bin")
+    FeatureLog(path).append(np.ones((3, 4)))
+    # A worker is half-way through writing a record
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD_DTYPE.itemsize // 2))
+    size = os.path.getsize(path)
+
+    reader = FeatureLog(path, readonly=True)
+    assert sum(len(chunk) for chunk in reader.iter_chunks(chunk_rows=2)) == 3
+    assert os.path.getsize(path) == size
+    with pytest.raises(ValueError):
+        reader.append(np.ones((1, 4)))
+    with pytest.raises(FileNotFoundError):
+        FeatureLog(str(tmp_path / "missing.bin"), readonly=True)
+
+
+def _publish_synthetic(store_root, rng):
+    model = IsolationForest(contamination=0.1, random_state=0).fit(rng.uniform(0, 1e5, (200, 4)))
+    ModelStore(store_root).publish(model, metadata={"source": "synthetic"})
+
+
+RETRAIN_ARGS = dict(sample_size=10000, holdout=0.2, contamination=0.1, min_agreement=0.9, max_shift=0.2,
+                    min_rows=500, max_age_days=0, dry_run=False)
+
+
+def test_retrain_replaces_the_synthetic_bootstrap_model(tmp_path):
+    rng = np.random.default_rng(1)
+    store_root = str(tmp_path / "store")
+    _publish_synthetic(store_root, rng)
+
+    log = FeatureLog(str(tmp_path / "a.bin"))
+    log.append(rng.lognormal(10, 0.3, (3000, 4)))
+    # Real features look nothing like the synthetic data, but the first real model is still published
+    assert retrain_script.retrain(log.path, store_root, seed=42, **RETRAIN_ARGS) == 0
+    assert ModelStore(store_root).metadata("v0002")["source"] == "feature_log"
+
+
+def test_retrain_gate_refuses_shifted_models(tmp_path):
+    rng = np.random.default_rng(1)
+    store_root = str(tmp_path / "store")
+    _publish_synthetic(store_root, rng)
+
+    log = FeatureLog(str(tmp_path / "a.bin"))
+    log.append(rng.lognormal(10, 0.3, (3000, 4)))
+    assert retrain_script.retrain(log.path, store_root, seed=42, **RETRAIN_ARGS) == 0
+    assert retrain_script.retrain(log.path, store_root, seed=7, **RETRAIN_ARGS) == 0
+    assert ModelStore(store_root).current_version() == "v0003"
+    assert ModelStore(store_root).metadata("v0003")["holdout_label_agreement"] >= 0.9
+
+    shifted = FeatureLog(str(tmp_path / "b.bin"))
+    shifted.append(rng.lognormal(11, 0.6, (3000, 4)))
+    assert retrain_script.retrain(shifted.path, store_root, seed=42, **RETRAIN_ARGS) == 1
+    assert ModelStore(store_root).versions() == ["v0001", "v0002", "v0003"]
+
+    # An operator-approved shift
+    assert retrain_script.retrain(shifted.path, store_root, seed=42, force=True, **RETRAIN_ARGS) == 0
+    assert ModelStore(store_root).metadata("v0004")["forced"] is True
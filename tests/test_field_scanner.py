@@ -0,0 +1,76 @@
+import importlib.util
+import os
+import random
+
+import pytest
+
+from src.core.extraction import DataExtractor, SALARY_KEYWORDS, NEXT_LINE_STOP_WORDS
+
+# The pre-FieldScanner extractors live on as the reference implementation in the benchmark
+_spec = importlib.util.spec_from_file_location(
+    "benchmark_extraction",
+    os.path.join(os.path.dirname(__file__), "..", "scripts", "benchmark_extraction.py")
+)
+legacy = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(legacy)
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return DataExtractor()
+
+
+def _random_text(rng):
+    """OCR-like noise built from salary keywords, stop words, numbers and separators."""
+    keywords = [kw for keywords in SALARY_KEYWORDS.values() for kw in keywords] + NEXT_LINE_STOP_WORDS
+    pieces = []
+    for _ in range(rng.randint(1, 40)):
+        choice = rng.random()
+        if choice < 0.35:
+            keyword = rng.choice(keywords)
+            pieces.append(rng.choice([keyword, keyword.upper(), keyword.lower()]))
+        elif choice < 0.6:
+            pieces.append(rng.choice(["12,500.00", "1,50,000", "Rs. 8,000", "0", "42", "3.5", "-", "99999"]))
+        elif choice < 0.8:
+            pieces.append(rng.choice([":", " : ", "\t", "  ", "/-", "Rs.", "|"]))
+        elif choice < 0.9:
+            pieces.append("\n")
+        else:
+            pieces.append(rng.choice(["ABCDE1234F", "HDFC0001234", "01/01/2023", "a@b.com", "9876543210", "Total"]))
+    return " ".join(pieces) if rng.random() < 0.5 else "".join(pieces)
+
+
+def test_scanner_matches_legacy_key_value(extractor):
+    rng = random.Random(12)
+    for _ in range(2000):
+        text = _random_text(rng)
+        scan = extractor.scanner.scan(text)
+        for field, keywords in SALARY_KEYWORDS.items():
+            assert scan.key_value(field) == legacy.legacy_key_value(text, keywords), (field, text)
+
+
+def test_scanner_matches_legacy_regex(extractor):
+    rng = random.Random(13)
+    for _ in range(500):
+        text = _random_text(rng)
+        scan = extractor.scanner.scan(text)
+        for key in extractor.scanner.first_keys:
+            assert scan.values[key] == legacy.legacy_regex(extractor.patterns[key], text), (key, text)
+        for key in extractor.scanner.all_keys:
+            assert scan.values[key] == legacy.legacy_all_regex(extractor.patterns[key], text), (key, text)
+
+
+def test_scanner_on_structured_slip(extractor):
+    text = (
+        "Salary Slip NOV - 19\n"
+        "Name : Rahul Sharma\n"
+        "Basic           16,000.00   Professional Tax 200.00\n"
+        "HRA\n6,000.00\n"
+        "Total Earning   25,500.00   Total Deduction 1,880.00\n"
+        "Net Pay : 23,620.00/-\n"
+    )
+    scan = extractor.scanner.scan(text)
+    for field, keywords in SALARY_KEYWORDS.items():
+        assert scan.key_value(field) == legacy.legacy_key_value(text, keywords)
+    assert scan.key_value("net_pay") == 23620.0
+    assert scan.key_value("hra") == 6000.0
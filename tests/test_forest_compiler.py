@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from src.core.forest_compiler import CompiledIsolationForest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(21)
+    X_train = rng.lognormal(10, 0.5, (2000, 4))
+    # Typical rows, outliers, zeros, negatives and exact duplicates of training rows
+    X_test = np.vstack([
+        rng.lognormal(10, 0.5, (500, 4)),
+        rng.lognormal(13, 1.0, (50, 4)),
+        np.zeros((5, 4)),
+        -rng.lognormal(8, 0.5, (5, 4)),
+        X_train[:20]
+    ])
+    return X_train, X_test
+
+
+@pytest.mark.parametrize("params", [
+    {"contamination": 0.1},
+    {"contamination": "auto"},
+    {"contamination": 0.05, "max_samples": 64, "max_features": 2},
+    {"contamination": 0.1, "n_estimators": 7, "bootstrap": True},
+])
+def test_compiled_forest_is_bit_identical(data, params):
+    X_train, X_test = data
+    model = IsolationForest(random_state=0, **params).fit(X_train)
+    compiled = CompiledIsolationForest.from_sklearn(model)
+
+    np.testing.assert_array_equal(compiled.score_samples(X_test), model.score_samples(X_test))
+    np.testing.assert_array_equal(compiled.decision_function(X_test), model.decision_function(X_test))
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+
+
+def test_compiled_forest_round_trip(data, tmp_path):
+    X_train, X_test = data
+    model = IsolationForest(contamination=0.1, random_state=0).fit(X_train)
+    path = str(tmp_path / "model.compiled.joblib")
+    CompiledIsolationForest.from_sklearn(model).save(path)
+
+    loaded = CompiledIsolationForest.load(path, mmap_mode="r")
+    np.testing.assert_array_equal(loaded.decision_function(X_test), model.decision_function(X_test))
+
+
+def test_single_row_and_lists(data):
+    X_train, X_test = data
+    model = IsolationForest(contamination=0.1, random_state=0).fit(X_train)
+    compiled = CompiledIsolationForest.from_sklearn(model)
+    row = X_test[0].tolist()
+    assert compiled.predict([row])[0] == model.predict([row])[0]
+    assert compiled.decision_function([row])[0] == model.decision_function([row])[0]
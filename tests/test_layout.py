@@ -0,0 +1,101 @@
+import json
+
+from src.core.layout import DocumentLayout, words_from_easyocr, words_from_tesseract_data
+
+
+def _word(text, x0, y0, line, page=1, conf=0.9, width=None, height=20):
+    width = width if width is not None else 12 * len(text)
+    return {"text": text, "box": [x0, y0, x0 + width, y0 + height], "conf": conf, "page": page, "line": line}
+
+
+def _slip():
+    """Earnings on the left with values to the right, deductions with values in the row below."""
+    return DocumentLayout.from_words([
+        _word("Basic", 100, 100, 0), _word("Salary", 170, 100, 0), _word("25,000.00", 400, 100, 0),
+        _word("Net", 100, 140, 1), _word("Pay", 150, 140, 1), _word("2024", 250, 140, 1),
+        _word("40,000.00", 400, 140, 1),
+        _word("Professional", 100, 200, 2), _word("Tax", 260, 200, 2),
+        _word("200", 110, 230, 3),
+    ])
+
+
+def test_values_right_of_or_below_the_keyword():
+    values = _slip().find_values({
+        "basic_salary": ["basic salary", "basic"],
+        "net_pay": ["net pay"],
+        "professional_tax": ["professional tax"],
+        "gross": ["gross earnings"],
+    })
+    # The year next to "Net Pay" is skipped in favour of the amount after it
+    assert values == {"basic_salary": 25000.0, "net_pay": 40000.0, "professional_tax": 200.0, "gross": None}
+
+
+def test_keywords_do_not_span_lines_or_pages():
+    layout = DocumentLayout.from_words([
+        _word("Net", 100, 100, 0), _word("Pay", 100, 140, 1), _word("500", 300, 140, 1),
+        _word("Tax", 100, 100, 2, page=2), _word("300", 300, 100, 0, page=1, width=30),
+    ])
+    assert layout.find_values({"net_pay": ["net pay"], "tax": ["tax"]}) == {"net_pay": None, "tax": None}
+
+
+def test_line_texts_and_confidence():
+    layout = _slip()
+    assert layout.line_texts() == ["Basic Salary 25,000.00", "Net Pay 2024 40,000.00", "Professional Tax", "200"]
+    assert abs(layout.mean_confidence() - 0.9) < 1e-6
+    assert DocumentLayout.from_words([_word("x", 0, 0, 0, conf=-1)]).mean_confidence() is None
+    assert DocumentLayout.empty().line_texts() == [] and len(DocumentLayout.from_words([])) == 0
+
+
+def test_dict_round_trip_and_pages():
+    layout = _slip()
+    restored = DocumentLayout.from_dict(json.loads(json.dumps(layout.to_dict())))
+    assert restored.texts == layout.texts
+    assert (restored.boxes == layout.boxes).all() and (restored.lines == layout.lines).all()
+    assert restored.find_values({"net_pay": ["net pay"]}) == {"net_pay": 40000.0}
+
+
+def test_concat_keeps_line_ids_unique():
+    first = DocumentLayout.from_words([_word("Net", 100, 100, 0), _word("Pay", 150, 100, 0)])
+    second = DocumentLayout.from_words([_word("Net", 100, 100, 0, page=2), _word("Pay", 150, 100, 0, page=2),
+                                        _word("900", 300, 100, 0, page=2)])
+    layout = DocumentLayout.concat([first, DocumentLayout.empty(), second])
+    assert layout.line_texts() == ["Net Pay", "Net Pay 900"]
+    assert layout.lines.tolist() == [0, 0, 1, 1, 1]
+    assert layout.page(2).texts == ["Net", "Pay", "900"]
+    assert layout.find_values({"net_pay": ["net pay"]}) == {"net_pay": 900.0}
+    assert len(DocumentLayout.concat([DocumentLayout.empty()])) == 0
+
+
+def test_tesseract_words():
+    data = {
+        "text": ["", "Net", "Pay", "40,000", "  ", "Tax"],
+        "conf": [-1, 95, 90.5, 88, 10, 70],
+        "left": [0, 100, 150, 300, 0, 100],
+        "top": [0, 100, 100, 100, 0, 140],
+        "width": [500, 40, 40, 80, 5, 40],
+        "height": [500, 20, 20, 20, 5, 20],
+        "block_num": [0, 1, 1, 1, 1, 2],
+        "par_num": [0, 1, 1, 1, 1, 1],
+        "line_num": [0, 1, 1, 1, 1, 1],
+    }
+    words = words_from_tesseract_data(data, page=3)
+    assert [w["text"] for w in words] == ["Net", "Pay", "40,000", "Tax"]
+    assert [w["line"] for w in words] == [0, 0, 0, 1]
+    assert words[1]["box"] == [150, 100, 190, 120] and words[1]["conf"] == 0.905
+    assert all(w["page"] == 3 for w in words)
+
+
+def test_easyocr_boxes_are_grouped_into_lines():
+    def box(x0, y0, x1, y1):
+        return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+    results = [
+        (box(400, 102, 480, 122), "40,000", 0.8),
+        (box(100, 100, 200, 120), "Net Pay", 0.9),
+        (box(100, 150, 200, 170), "Tax", 0.7),
+    ]
+    words = words_from_easyocr(results, page=1)
+    assert [(w["text"], w["line"]) for w in words] == [("Net Pay", 0), ("40,000", 0), ("Tax", 1)]
+    # A phrase box holding the whole keyword still pairs with the value on its row
+    assert DocumentLayout.from_words(words).find_values({"net_pay": ["net pay"]}) == {"net_pay": 40000.0}
+    assert words_from_easyocr([], page=1) == []
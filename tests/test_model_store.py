@@ -0,0 +1,92 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from src.core.forest_compiler import CompiledIsolationForest
+from src.core.model_store import ModelStore
+
+
+@pytest.fixture(scope="module")
+def model():
+    X = np.random.default_rng(22).lognormal(10, 0.5, (500, 4))
+    return IsolationForest(n_estimators=10, contamination=0.1, random_state=0).fit(X)
+
+
+def test_publish_activate_and_rollback(tmp_path, model):
+    store = ModelStore(str(tmp_path))
+    assert store.load() == (None, None)
+
+    assert store.publish(model, {"note": "first"}) == "v0001"
+    assert store.publish(model, activate=False) == "v0002"
+    assert store.current_version() == "v0001"
+    assert store.versions() == ["v0001", "v0002"]
+    assert store.metadata("v0001")["note"] == "first"
+    assert store.metadata("v0002")["model_type"] == "IsolationForest"
+
+    store.activate("v0002")
+    version, loaded = store.load()
+    assert version == "v0002"
+    assert isinstance(loaded, CompiledIsolationForest)
+    X = np.random.default_rng(0).lognormal(10, 0.5, (20, 4))
+    np.testing.assert_array_equal(loaded.decision_function(X), model.decision_function(X))
+
+    store.activate("v0001")
+    assert store.current_version() == "v0001"
+    with pytest.raises(ValueError):
+        store.activate("v0042")
+    assert store.current_version() == "v0001"
+
+
+def test_partial_publish_is_invisible(tmp_path, model):
+    store = ModelStore(str(tmp_path))
+    store.publish(model)
+    # A publisher that crashed before its rename leaves only a temporary directory
+    os.makedirs(tmp_path / ".tmp-crashed")
+    (tmp_path / ".tmp-crashed" / "model.pkl").write_bytes(b"partial")
+    os.makedirs(tmp_path / "v0002")  # renamed without metadata
+    assert store.versions() == ["v0001"]
+    assert store.load()[0] == "v0001"
+
+
+def test_concurrent_publishers_get_distinct_versions(tmp_path, model):
+    store = ModelStore(str(tmp_path))
+    versions = []
+    lock = threading.Lock()
+
+    def publish():
+        version = ModelStore(str(tmp_path)).publish(model, activate=False)
+        with lock:
+            versions.append(version)
+
+    threads = [threading.Thread(target=publish) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(versions) == [f"v{i:04d}" for i in range(1, 7)]
+    assert store.versions() == sorted(versions)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".")]
+
+
+def test_readers_never_see_a_partial_current(tmp_path, model):
+    store = ModelStore(str(tmp_path))
+    store.publish(model)
+    store.publish(model)
+    stop = threading.Event()
+    seen = set()
+
+    def read():
+        while not stop.is_set():
+            seen.add(store.current_version())
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for i in range(300):
+        store.activate(["v0001", "v0002"][i % 2])
+    stop.set()
+    reader.join()
+    assert seen <= {"v0001", "v0002"}
@@ -0,0 +1,262 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+import src.core.ocr as ocr
+from src.core.layout import DocumentLayout
+
+
+class FakePoppler:
+    """Stands in for pdfinfo/pdftoppm: pages of the given sizes in points, rendered at the requested DPI."""
+
+    def __init__(self, page_sizes):
+        self.page_sizes = page_sizes
+        self.calls = []
+
+    def pdfinfo(self, pdf_path):
+        width, height = self.page_sizes[0]
+        return {"Pages": len(self.page_sizes), "Page size": f"{width} x {height} pts"}
+
+    def convert(self, pdf_path, dpi, first_page, last_page):
+        self.calls.append((dpi, first_page, last_page))
+        return [Image.new("L", (int(width * dpi / 72), int(height * dpi / 72)), 255)
+                for width, height in self.page_sizes[first_page - 1:last_page]]
+
+
+def _poppler(monkeypatch, page_sizes):
+    poppler = FakePoppler(page_sizes)
+    monkeypatch.setattr(ocr, "pdfinfo_from_path", poppler.pdfinfo, raising=False)
+    monkeypatch.setattr(ocr, "convert_from_path", poppler.convert, raising=False)
+    return poppler
+
+
+def test_oversized_pages_are_rendered_at_a_lower_dpi(monkeypatch):
+    poppler = _poppler(monkeypatch, [(612, 792)] * 3)
+    pages = list(ocr.iter_pdf_pages("slip.pdf", dpi=300, max_page_pixels=4_000_000, window=2))
+    assert [number for number, _ in pages] == [1, 2, 3]
+    assert all(image.width * image.height <= 4_000_000 for _, image in pages)
+    # Rendered at the capped DPI directly, not decoded at 300 DPI and shrunk
+    assert poppler.calls == [(206, 1, 2), (206, 3, 3)]
+    assert ocr._capped_dpi("612 x 792 pts (letter)", 150, 4_000_000) == 150
+    assert ocr._capped_dpi(None, 200, 1000) == 200
+
+
+def test_larger_later_pages_are_still_bounded(monkeypatch):
+    _poppler(monkeypatch, [(612, 792), (1224, 1584)])
+    pages = list(ocr.iter_pdf_pages("mixed.pdf", dpi=200, max_page_pixels=4_000_000))
+    assert all(image.width * image.height <= 4_000_000 for _, image in pages)
+
+
+def test_max_pages_and_document_pixel_budget(monkeypatch):
+    poppler = _poppler(monkeypatch, [(612, 792)] * 10)
+    assert [n for n, _ in ocr.iter_pdf_pages("long.pdf", dpi=72, max_pages=4)] == [1, 2, 3, 4]
+    # 612 x 792 at 72 DPI is 484,704 pixels a page
+    assert [n for n, _ in ocr.iter_pdf_pages("long.pdf", dpi=72, max_pixels=1_500_000)] == [1, 2, 3]
+    assert [n for n, _ in ocr.iter_pdf_pages("long.pdf", dpi=72, pages=[2, 3, 7], max_pages=5, window=4)] == [2, 3]
+    assert poppler.calls[-1] == (72, 2, 3)
+
+
+class FakeReader:
+    """easyocr.Reader stand-in that reads back the size of each image it is given."""
+
+    def __init__(self):
+        self.batches = []
+        self.single = 0
+
+    def readtext(self, image, detail=0):
+        self.single += 1
+        return [f"{image.shape[1]}x{image.shape[0]}"]
+
+    def readtext_batched(self, images, detail=0, batch_size=1):
+        self.batches.append(([image.shape[:2] for image in images], batch_size))
+        return [[f"{image.shape[1]}x{image.shape[0]}"] for image in images]
+
+
+def test_easyocr_batches_pad_similar_sizes(monkeypatch, tmp_path):
+    sizes = [(1700, 2200), (1720, 2210), (1700, 2200), (2550, 3300), (800, 600)]
+    paths = []
+    for i, (width, height) in enumerate(sizes):
+        path = tmp_path / f"scan{i}.png"
+        Image.new("RGB", (width, height), "white").save(path)
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.png"))
+
+    engine = ocr.OCREngine(method="easyocr")
+    engine.reader = FakeReader()
+    monkeypatch.setattr(ocr, "EASYOCR_AVAILABLE", True)
+    results = engine.extract_text_batch(paths, batch_size=6)
+
+    assert [r["path"] for r in results] == paths
+    assert results[-1]["text"] == "" and results[-1]["error"]
+    # The three letter-size scans share one batch, padded (not stretched) to the largest width and height
+    assert engine.reader.batches == [([(2210, 1720)] * 3, 6)]
+    assert [r["text"] for r in results[:5]] == ["1720x2210"] * 3 + ["2550x3300", "800x600"]
+    assert engine.reader.single == 2
+
+
+def test_pad_keeps_the_image_at_its_scale():
+    image = Image.new("L", (10, 20), 0)
+    padded = ocr._pad(image, (12, 25))
+    assert padded.size == (12, 25)
+    assert padded.getpixel((9, 19)) == 0 and padded.getpixel((11, 24)) == 255
+    assert ocr._pad(image, (10, 20)) is image
+
+
+def _tesseract_engine(monkeypatch, **kwargs):
+    monkeypatch.setattr(ocr, "TESSERACT_AVAILABLE", True)
+    monkeypatch.setattr(ocr, "_tesseract_page", lambda image: f"page {image.width}x{image.height}")
+    return ocr.OCREngine(method="tesseract", use_text_layer=False, **kwargs)
+
+
+def test_iter_pages_keeps_one_pixel_budget_for_the_document(monkeypatch):
+    poppler = _poppler(monkeypatch, [(612, 792)] * 6)
+    engine = _tesseract_engine(monkeypatch, dpi=72, max_document_pixels=1_500_000)
+    pages = list(engine.iter_pages("long.pdf"))
+    # 484,704 pixels a page: three fit, the fourth is refused and the rest aren't rasterized
+    assert [page["page"] for page in pages] == [1, 2, 3]
+    assert [first for _, first, _ in poppler.calls] == [1, 2, 3, 4]
+
+
+def test_iter_pages_stops_on_poppler_errors(monkeypatch):
+    poppler = _poppler(monkeypatch, [(612, 792)] * 4)
+    engine = _tesseract_engine(monkeypatch, dpi=72)
+    convert = poppler.convert
+
+    def failing_convert(pdf_path, dpi, first_page, last_page):
+        if first_page == 3:
+            raise RuntimeError("pdftoppm crashed")
+        return convert(pdf_path, dpi, first_page, last_page)
+
+    monkeypatch.setattr(ocr, "convert_from_path", failing_convert)
+    assert [page["page"] for page in engine.iter_pages("broken.pdf")] == [1, 2]
+
+    def failing_pdfinfo(pdf_path):
+        raise RuntimeError("not a PDF")
+
+    monkeypatch.setattr(ocr, "pdfinfo_from_path", failing_pdfinfo)
+    assert list(engine.iter_pages("broken.pdf")) == []
+
+
+def test_parallel_pages_come_back_in_page_order(monkeypatch):
+    _poppler(monkeypatch, [(72 * (i + 1), 72) for i in range(7)])
+    engine = _tesseract_engine(monkeypatch, dpi=72, workers=3)
+
+    def slow_first_pages(image):
+        page = image.width // 72
+        # Earlier pages finish last
+        time.sleep(0.01 * (8 - page))
+        return f"page {page}"
+
+    monkeypatch.setattr(ocr, "_tesseract_page", slow_first_pages)
+    pages = engine.extract_pages("multi.pdf")
+    assert [page["page"] for page in pages] == list(range(1, 8))
+    assert [page["text"] for page in pages] == [f"page {i}" for i in range(1, 8)]
+    engine.close()
+
+
+DIGITAL_PAGE = "Acme Technologies Pvt. Ltd.\nName: John Doe   PAN: ABCDE1234F\nNet Pay: 40,000.00\n"
+
+
+def test_text_layer_pages_skip_ocr(monkeypatch):
+    poppler = _poppler(monkeypatch, [(612, 792)] * 3)
+    monkeypatch.setattr(ocr, "extract_pdf_text_layer", lambda pdf_path, max_pages=None: [DIGITAL_PAGE, "", "#@! ~~ |"])
+    engine = _tesseract_engine(monkeypatch, dpi=72)
+    engine.use_text_layer = True
+
+    pages = engine.extract_pages("mixed.pdf")
+    assert [(page["page"], page["source"]) for page in pages] == [(1, "text_layer"), (2, "ocr"), (3, "ocr")]
+    assert pages[0]["text"] == DIGITAL_PAGE
+    # Only the scanned pages are rasterized
+    assert [first for _, first, _ in poppler.calls] == [2, 3]
+    assert [page["source"] for page in engine.iter_pages("mixed.pdf")] == ["text_layer", "ocr", "ocr"]
+
+
+def test_pdftotext_output_is_split_into_pages(monkeypatch):
+    monkeypatch.setattr(ocr.shutil, "which", lambda name: f"/usr/bin/{name}")
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        return SimpleNamespace(stdout="first page\fsecond page\f".encode("utf-8"))
+
+    monkeypatch.setattr(ocr.subprocess, "run", run)
+    assert ocr.extract_pdf_text_layer("digital.pdf", max_pages=2) == ["first page", "second page"]
+    assert commands[0][-2:] == ["digital.pdf", "-"] and "-l" in commands[0]
+
+    monkeypatch.setattr(ocr.shutil, "which", lambda name: None)
+    assert ocr.extract_pdf_text_layer("digital.pdf") is None
+
+
+def test_usable_text_layer_heuristic():
+    assert ocr.has_usable_text_layer(DIGITAL_PAGE)
+    assert not ocr.has_usable_text_layer("  \n ")
+    assert not ocr.has_usable_text_layer("~!@#$%^&*()_+|}{:?><" * 5)
+
+
+DRAFT_TEXT = {1: "Name: John Doe PAN: ABCDE1234F", 2: "Basic 25000", 3: "Net Pay: 40000"}
+
+
+def _two_pass_engine(monkeypatch, confidences, texts=DRAFT_TEXT):
+    """
+    Tesseract engine whose pages read as `texts`; draft pages (rendered at 36 DPI,
+    half the height of a full page) have the given confidence, full pages 0.95.
+    """
+    engine = _tesseract_engine(monkeypatch, dpi=72, two_pass=True, draft_dpi=36, min_confidence=0.6)
+    calls = []
+
+    def layout_page(image, page):
+        draft = image.height < 792
+        calls.append((page, "draft" if draft else "full"))
+        conf = confidences[page] if draft else 0.95
+        words = [{"text": texts[page], "box": [0, 0, 10, 10], "conf": conf, "page": page, "line": 0}]
+        return texts[page], DocumentLayout.from_words(words)
+
+    engine._layout_page = layout_page
+    return engine, calls
+
+
+def test_two_pass_retries_only_low_confidence_pages(monkeypatch):
+    poppler = _poppler(monkeypatch, [(612, 792)] * 3)
+    engine, calls = _two_pass_engine(monkeypatch, {1: 0.9, 2: 0.3, 3: 0.8})
+    pages = engine.extract_pages("slip.pdf")
+
+    assert [(page["page"], page["pass"]) for page in pages] == [(1, "draft"), (2, "retry"), (3, "draft")]
+    assert calls == [(1, "draft"), (2, "draft"), (3, "draft"), (2, "full")]
+    assert [(dpi, first) for dpi, first, _ in poppler.calls] == [(36, 1), (36, 2), (36, 3), (72, 2)]
+    assert all("confidence" not in page for page in pages)
+    assert engine.stats()["two_pass"] == {"draft_pages": 3, "slow_path_pages": 1}
+
+
+def test_two_pass_retries_every_page_when_a_field_is_missing(monkeypatch):
+    _poppler(monkeypatch, [(612, 792)] * 3)
+    texts = {**DRAFT_TEXT, 3: "Deductions 200"}
+    engine, calls = _two_pass_engine(monkeypatch, {1: 0.9, 2: 0.9, 3: 0.9}, texts)
+    pages = engine.extract_pages("slip.pdf")
+    assert [page["pass"] for page in pages] == ["retry"] * 3
+    assert engine.pass_stats == {"draft_pages": 3, "slow_path_pages": 3}
+
+    # Fields found across the pages of the draft are enough
+    engine, calls = _two_pass_engine(monkeypatch, {1: 0.9, 2: 0.9, 3: 0.9})
+    assert [page["pass"] for page in engine.extract_pages("slip.pdf")] == ["draft"] * 3
+    assert engine.pass_stats["slow_path_pages"] == 0
+
+
+def test_two_pass_images_fall_back_to_full_resolution(monkeypatch, tmp_path):
+    path = tmp_path / "slip.png"
+    Image.new("RGB", (612, 792), "white").save(path)
+    texts = {1: DRAFT_TEXT[1] + " " + DRAFT_TEXT[3]}
+
+    engine, calls = _two_pass_engine(monkeypatch, {1: 0.9}, texts)
+    page = engine.extract_pages(str(path))[0]
+    assert page["pass"] == "draft" and calls == [(1, "draft")]
+
+    engine, calls = _two_pass_engine(monkeypatch, {1: 0.4}, texts)
+    result = engine.extract_layout(str(path))
+    assert result["pages"][0]["pass"] == "retry" and calls == [(1, "draft"), (1, "full")]
+    assert result["layout"].mean_confidence() == pytest.approx(0.95)
+    assert engine.pass_stats == {"draft_pages": 1, "slow_path_pages": 1}
+
+    engine, calls = _two_pass_engine(monkeypatch, {1: 0.9}, {1: DRAFT_TEXT[1]})
+    assert engine.extract_pages(str(path))[0]["pass"] == "retry"
@@ -0,0 +1,95 @@
+import json
+import shutil
+from types import SimpleNamespace
+
+from PIL import Image
+
+import src.core.ocr as ocr
+from src.core.ocr_cache import OCRCache
+
+
+def _write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_keys_follow_contents_and_settings(tmp_path):
+    cache = OCRCache()
+    a = _write(tmp_path / "a.jpg", b"slip")
+    renamed = _write(tmp_path / "renamed.jpg", b"slip")
+    other = _write(tmp_path / "other.jpg", b"another slip")
+    assert cache.make_key(a, method="tesseract", dpi=200) == cache.make_key(renamed, dpi=200, method="tesseract")
+    assert cache.make_key(a, method="tesseract", dpi=200) != cache.make_key(a, method="tesseract", dpi=300)
+    assert cache.make_key(a, method="tesseract") != cache.make_key(other, method="tesseract")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    value = {"text": "x" * 20}
+    size = len(json.dumps(value))
+    cache = OCRCache(max_memory_bytes=3 * size)
+    for key in "abc":
+        cache.set(key, value)
+    assert cache.get("a") == value  # a is now the most recently used
+    cache.set("d", value)
+    assert cache.get("b") is None
+    assert all(cache.get(key) == value for key in "acd")
+    # A value larger than the whole budget is not kept
+    cache.set("huge", {"text": "x" * 4 * size})
+    assert cache.get("huge") is None
+    assert cache.stats()["memory_bytes"] <= 3 * size
+
+
+def test_disk_tier_survives_restarts_and_is_bounded(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    value = {"text": "y" * 100}
+    cache = OCRCache(cache_dir=cache_dir, max_disk_bytes=10_000)
+    cache.set("k1", value)
+
+    restarted = OCRCache(cache_dir=cache_dir, max_disk_bytes=10_000)
+    assert restarted.get("k1") == value
+    assert restarted.stats()["disk_entries"] == 1
+
+    small = OCRCache(cache_dir=cache_dir, max_disk_bytes=300)
+    for key in ("k2", "k3", "k4"):
+        small.set(key, value)
+    assert small.stats()["disk_bytes"] <= 300
+    assert OCRCache(cache_dir=cache_dir, max_memory_bytes=0).get("k1") is None
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.core.ocr_cache.time.time", lambda: clock[0])
+    cache = OCRCache(cache_dir=str(tmp_path), ttl=60)
+    cache.set("k", {"text": "z"})
+    clock[0] += 59
+    assert cache.get("k") == {"text": "z"}
+    clock[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_engine_skips_ocr_for_cached_files(tmp_path, monkeypatch):
+    calls = []
+
+    def tesseract_page(image):
+        calls.append(image.size)
+        return "Name: John Doe" if len(calls) > 1 else ""
+
+    monkeypatch.setattr(ocr, "TESSERACT_AVAILABLE", True)
+    monkeypatch.setattr(ocr, "pytesseract", SimpleNamespace(__version__="test", image_to_string=tesseract_page),
+                        raising=False)
+    engine = ocr.OCREngine(method="tesseract", cache=OCRCache())
+    path = tmp_path / "slip.png"
+    Image.new("RGB", (40, 30), "white").save(path)
+
+    # Empty output isn't cached, so the next call OCRs again
+    assert engine.extract_text(str(path)) == ""
+    assert engine.extract_text(str(path)) == "Name: John Doe"
+    shutil.copy(path, tmp_path / "resubmitted.png")
+    assert engine.extract_text(str(tmp_path / "resubmitted.png")) == "Name: John Doe"
+    assert len(calls) == 2
+
+    # Different OCR settings don't share entries
+    engine.dpi = 100
+    engine.extract_text(str(path))
+    assert len(calls) == 3
@@ -0,0 +1,97 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.core.peer_stats import LogHistogram, PeerGroup, PeerStats, normalize_group
+
+
+def _slip(salary, employer="Acme Technologies Pvt. Ltd.", designation="Engineer"):
+    return {"employer": employer, "designation": designation, "salary": salary}
+
+
+@pytest.fixture(scope="module")
+def salaries():
+    return np.random.default_rng(25).lognormal(11, 0.3, 2000)
+
+
+def test_welford_matches_batch_statistics(salaries):
+    stats = PeerStats()
+    for salary in salaries:
+        stats.update(_slip(float(salary)))
+    group = stats._groups[("org", "acme technologies")]
+    logs = np.log(salaries)
+    assert group.n["salary"] == len(salaries)
+    assert group.mean["salary"] == pytest.approx(logs.mean(), rel=1e-12)
+    assert group.std("salary") == pytest.approx(logs.std(ddof=1), rel=1e-9)
+
+
+def test_merged_groups_equal_one_stream(salaries):
+    log_gamma = math.log(1.05 / 0.95)
+    whole, left, right = PeerGroup(), PeerGroup(), PeerGroup()
+    for i, salary in enumerate(salaries):
+        whole.add({"salary": salary}, log_gamma, 48)
+        (left if i < 700 else right).add({"salary": salary}, log_gamma, 48)
+    left.merge(right, 48)
+    assert left.n["salary"] == whole.n["salary"]
+    assert left.mean["salary"] == pytest.approx(whole.mean["salary"], rel=1e-12)
+    assert left.std("salary") == pytest.approx(whole.std("salary"), rel=1e-9)
+    assert left.sketches["salary"].bins == whole.sketches["salary"].bins
+
+
+def test_sketch_quantiles_are_within_accuracy(salaries):
+    accuracy = 0.05
+    log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+    sketch = LogHistogram()
+    for salary in salaries:
+        sketch.add(salary, log_gamma, 2048)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = np.quantile(salaries, q, method="lower")
+        assert abs(sketch.quantile(q, log_gamma) - exact) <= accuracy * exact * 1.01
+
+
+def test_outliers_are_flagged_against_peers(salaries):
+    stats = PeerStats(min_count=20, z_threshold=3.0)
+    for salary in salaries[:200]:
+        stats.update(_slip(float(salary)))
+    assert stats.check(_slip(float(np.median(salaries)))) == []
+    signals = stats.check(_slip(float(np.median(salaries)) * 20))
+    assert {s["signal"] for s in signals} == {"peer_org_outlier", "peer_designation_outlier"}
+    assert all(s["z_score"] > 3 for s in signals)
+
+
+def test_employer_group_needs_a_clear_employer():
+    assert PeerStats.group_keys({"orgs": ["HDFC Bank"], "designation": "Sr. Engineer"}) == [
+        ("designation", "sr engineer")]
+    assert PeerStats.group_keys({"employer": "ACME Private Limited"}) == [("org", "acme")]
+    assert normalize_group("Acme Pvt. Ltd.") == normalize_group("ACME Private Limited")
+
+
+def test_lru_bounds_the_number_of_groups():
+    stats = PeerStats(max_groups=10)
+    for i in range(25):
+        stats.update(_slip(50000.0, employer=f"Company {i} Ltd", designation=None))
+    assert len(stats._groups) == 10
+    assert stats.evictions == 15
+    assert ("org", "company 24") in stats._groups
+
+
+def test_workers_merge_instead_of_overwriting(tmp_path, salaries):
+    path = str(tmp_path / "peer_stats.sqlite")
+    first, second = PeerStats(path, save_every=0), PeerStats(path, save_every=0)
+    for i, salary in enumerate(salaries):
+        (first if i % 2 else second).update(_slip(float(salary)))
+    first.save()
+    second.save()
+    first.save()
+
+    logs = np.log(salaries)
+    for stats in (first, second, PeerStats(path)):
+        group = stats._groups[("org", "acme technologies")]
+        assert group.n["salary"] == len(salaries)
+        assert group.mean["salary"] == pytest.approx(logs.mean(), rel=1e-12)
+        assert group.std("salary") == pytest.approx(logs.std(ddof=1), rel=1e-9)
+        assert group.sketches["salary"].count == len(salaries)
+    assert first.stats()["unsaved_groups"] == 0
+    first.close()
+    second.close()
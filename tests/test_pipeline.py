@@ -0,0 +1,74 @@
+import pytest
+
+from src.core.extraction import DataExtractor
+from src.core.pipeline import IncrementalExtraction
+
+PAGES = ["Acme Technologies Pvt. Ltd.\nName: John Doe\n", "PAN: ABCDE1234F\nNet Pay: 40,000\n",
+         "Terms and conditions\n", "Annexure\n"]
+
+
+class FakeEngine:
+    """OCREngine stand-in whose iter_pages records how many pages were read."""
+
+    def __init__(self, pages):
+        self.texts = pages
+        self.read = 0
+
+    def iter_pages(self, file_path):
+        for number, text in enumerate(self.texts, start=1):
+            self.read += 1
+            yield {"page": number, "source": "ocr", "text": text}
+
+
+class CountingExtractor(DataExtractor):
+    def __init__(self):
+        super().__init__()
+        self.full_runs = 0
+
+    def extract_entities(self, text, layout=None):
+        self.full_runs += 1
+        return super().extract_entities(text, layout)
+
+
+@pytest.fixture
+def extractor(capsys):
+    return CountingExtractor()
+
+
+def test_stops_once_the_required_fields_are_found(extractor):
+    engine = FakeEngine(PAGES)
+    incremental = IncrementalExtraction(engine, extractor, "slip.pdf")
+    data = incremental.run()
+
+    assert engine.read == 2 and not incremental.exhausted
+    assert data["names"] == ["John Doe"] and data["pan"] == "ABCDE1234F" and data["net_pay"] == 40000.0
+    assert incremental.text == PAGES[0] + "\n" + PAGES[1] + "\n"
+    # The full extraction runs once, over the pages read, and its result is reused
+    assert incremental.run() is data and extractor.full_runs == 1
+
+
+def test_complete_reads_the_rest_of_the_document(extractor):
+    engine = FakeEngine(PAGES)
+    incremental = IncrementalExtraction(engine, extractor, "slip.pdf")
+    incremental.run()
+    data = incremental.complete()
+    assert engine.read == 4 and incremental.exhausted
+    assert [page["page"] for page in incremental.pages] == [1, 2, 3, 4]
+    assert data == extractor.extract_entities("".join(text + "\n" for text in PAGES))
+    assert extractor.full_runs == 3
+
+
+def test_documents_missing_a_field_are_read_to_the_end(extractor):
+    pages = [PAGES[0], "Net Pay: 40,000\n", PAGES[2]]
+    engine = FakeEngine(pages)
+    incremental = IncrementalExtraction(engine, extractor, "slip.pdf")
+    data = incremental.run()
+    assert engine.read == 3 and incremental.exhausted and data["pan"] is None
+
+    # Fewer required fields stop earlier
+    engine = FakeEngine(pages)
+    IncrementalExtraction(engine, extractor, "slip.pdf", required_fields=("names",)).run()
+    assert engine.read == 1
+
+    empty = IncrementalExtraction(FakeEngine([]), extractor, "empty.pdf")
+    assert empty.run()["names"] == [] and empty.pages == []
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from src.core.preprocess import ImagePreprocessor, otsu_threshold
+
+
+def _page(line_height=40, size=(1600, 2000), lines=12):
+    """White page with `lines` rows of dark "words" starting at (300, 300)."""
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    for row in range(lines):
+        y = 300 + row * 3 * line_height
+        for x in range(300, 1300, 40):
+            draw.rectangle([x, y, x + 25, y + line_height - 1], fill=0)
+    return image
+
+
+def test_otsu_splits_dark_from_light():
+    gray = np.array([[10, 12, 14, 200, 210, 220]], dtype=np.uint8)
+    threshold = otsu_threshold(gray)
+    assert 14 < threshold <= 200
+    # A pure black-and-white page still has ink below the threshold
+    assert (np.array([[0, 255]], dtype=np.uint8) < otsu_threshold(np.array([[0, 255]], dtype=np.uint8))).sum() == 1
+
+
+def test_margins_are_cropped_around_the_ink():
+    image = ImagePreprocessor(deskew=False, target_text_height=None).process(_page())
+    # Ink spans x 300..1285 and y 300..1659, plus the 16px margin on each side
+    assert image.size == (1285 - 300 + 1 + 32, 1659 - 300 + 1 + 32)
+
+
+def test_large_text_is_scaled_to_the_target_height():
+    preprocessor = ImagePreprocessor(deskew=False, crop_margins=False, target_text_height=32)
+    image = preprocessor.process(_page(line_height=64))
+    assert image.size == (800, 1000)
+    # Text already at the target size is left alone, and nothing is ever upscaled
+    assert preprocessor.process(_page(line_height=24)).size == (1600, 2000)
+    assert ImagePreprocessor(deskew=False, crop_margins=False, min_scale=0.75).process(_page(line_height=64)).size == (1200, 1500)
+
+
+def test_skew_is_estimated_and_corrected():
+    preprocessor = ImagePreprocessor(crop_margins=False, target_text_height=None)
+    skewed = _page().rotate(3, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    gray = np.asarray(skewed)
+    assert preprocessor._estimate_skew(gray, otsu_threshold(gray)) == pytest.approx(-3.0)
+    straight = np.asarray(_page())
+    assert preprocessor._estimate_skew(straight, otsu_threshold(straight)) == 0.0
+
+
+def test_binarize_and_config():
+    preprocessor = ImagePreprocessor(deskew=False, binarize=True, target_text_height=None)
+    image = preprocessor.process(_page().convert("RGB"))
+    assert image.mode == "L" and set(np.unique(np.asarray(image))) == {0, 255}
+    assert preprocessor.config()["binarize"] is True
+    assert ImagePreprocessor().config() != preprocessor.config()
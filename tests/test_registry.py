@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from src.core import registry as registry_module
+from src.core.registry import ModelRegistry
+
+
+def test_components_load_once_across_threads():
+    registry = ModelRegistry()
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry.register("model", build)
+    assert registry.stats() == {"model": {"loaded": False}}
+
+    instances = []
+    threads = [threading.Thread(target=lambda: instances.append(registry.get("model"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(instance is instances[0] for instance in instances)
+    stats = registry.stats()["model"]
+    assert stats["loaded"] and stats["load_seconds"] >= 0.05
+
+
+def test_reregistering_drops_the_loaded_instance():
+    registry = ModelRegistry()
+    registry.register("model", lambda: "old")
+    assert registry.get("model") == "old"
+    registry.register("model", lambda: "new")
+    assert not registry.is_loaded("model")
+    assert registry.get("model") == "new"
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_missing_models_are_cached_as_none():
+    registry = ModelRegistry()
+    calls = []
+    registry.register("spacy", lambda: calls.append(1))
+    assert registry.get("spacy") is None and registry.get("spacy") is None
+    assert len(calls) == 1
+
+
+def test_scripts_ocr_cache_default(monkeypatch):
+    monkeypatch.delenv("OCR_CACHE_DIR", raising=False)
+    registry_module.use_scripts_ocr_cache()
+    assert registry_module.os.environ["OCR_CACHE_DIR"] == registry_module.SCRIPTS_OCR_CACHE_DIR
+
+    monkeypatch.setenv("OCR_CACHE_DIR", "/elsewhere")
+    registry_module.use_scripts_ocr_cache()
+    assert registry_module.os.environ["OCR_CACHE_DIR"] == "/elsewhere"
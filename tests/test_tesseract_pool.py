@@ -0,0 +1,118 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+import src.core.ocr as ocr
+import src.core.tesseract_pool as tesseract_pool
+from src.core.tesseract_pool import TesseractPool
+
+TSV = (
+    "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+    "1\t1\t0\t0\t0\t0\t0\t0\t400\t300\t-1\t\n"
+    "5\t1\t1\t1\t1\t1\t10\t20\t60\t15\t96.5\tName:\n"
+    "5\t1\t1\t1\t1\t2\t80\t20\t40\t15\t91\tJohn\n"
+)
+
+
+@pytest.fixture
+def stdin_backend(monkeypatch):
+    """The tesseract binary without tesserocr: records every command it is run with."""
+    monkeypatch.setattr(tesseract_pool, "TESSEROCR_AVAILABLE", False)
+    monkeypatch.setattr(tesseract_pool.shutil, "which", lambda cmd: f"/usr/bin/{cmd}")
+    commands = []
+
+    def run(cmd, input=None, **kwargs):
+        commands.append(cmd)
+        assert input.startswith(b"\x89PNG")
+        stdout = TSV if cmd[-1] == "tsv" else "Name: John"
+        return SimpleNamespace(stdout=stdout.encode("utf-8"))
+
+    monkeypatch.setattr(tesseract_pool.subprocess, "run", run)
+    return commands
+
+
+def test_stdin_workers_pipe_images_through_tesseract(stdin_backend):
+    pool = TesseractPool(size=2, lang="hin")
+    image = Image.new("L", (40, 30), 255)
+    assert pool.backend == "stdin"
+    assert pool.image_to_string(image) == "Name: John"
+    data = pool.image_to_data(image)
+    assert stdin_backend == [["tesseract", "stdin", "stdout", "-l", "hin"],
+                             ["tesseract", "stdin", "stdout", "-l", "hin", "tsv"]]
+    assert data["text"] == ["", "Name:", "John"]
+    assert data["conf"] == [-1.0, 96.5, 91.0]
+    assert data["left"][1:] == [10, 80] and data["line_num"][1:] == [1, 1]
+
+    stats = pool.stats()
+    assert stats["calls"] == 2 and stats["errors"] == 0 and stats["idle"] == 2
+    pool.close()
+    assert pool.stats()["idle"] == 0
+
+
+def test_missing_tesseract_is_an_error(monkeypatch):
+    monkeypatch.setattr(tesseract_pool, "TESSEROCR_AVAILABLE", False)
+    monkeypatch.setattr(tesseract_pool.shutil, "which", lambda cmd: None)
+    with pytest.raises(RuntimeError):
+        TesseractPool()
+
+
+def test_concurrency_is_bounded_by_the_pool_size(stdin_backend, monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def run(cmd, input=None, **kwargs):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+        return SimpleNamespace(stdout=b"text")
+
+    monkeypatch.setattr(tesseract_pool.subprocess, "run", run)
+    pool = TesseractPool(size=2)
+    image = Image.new("L", (10, 10), 255)
+    threads = [threading.Thread(target=pool.image_to_string, args=(image,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    stats = pool.stats()
+    assert stats["calls"] == 6 and stats["queued"] == 0 and stats["idle"] == 2
+    assert stats["avg_busy_ms"] >= 20 and stats["avg_wait_ms"] > 0
+
+
+def test_failed_calls_are_counted_and_release_the_worker(stdin_backend, monkeypatch):
+    def run(cmd, **kwargs):
+        raise tesseract_pool.subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(tesseract_pool.subprocess, "run", run)
+    pool = TesseractPool(size=1)
+    for _ in range(2):
+        with pytest.raises(tesseract_pool.subprocess.CalledProcessError):
+            pool.image_to_string(Image.new("L", (10, 10), 255))
+    stats = pool.stats()
+    assert stats["errors"] == 2 and stats["calls"] == 2 and stats["idle"] == 1
+
+
+def test_engine_ocrs_through_the_pool(stdin_backend, monkeypatch, tmp_path):
+    monkeypatch.setattr(ocr, "TESSERACT_AVAILABLE", True)
+    monkeypatch.setattr(ocr, "pytesseract", SimpleNamespace(__version__="test"), raising=False)
+    pool = TesseractPool(size=1)
+    engine = ocr.OCREngine(method="tesseract", tesseract_pool=pool)
+    path = tmp_path / "slip.png"
+    Image.new("RGB", (40, 30), "white").save(path)
+
+    assert engine.extract_text(str(path)) == "Name: John"
+    stats = engine.stats()
+    assert stats["tesseract_backend"] == "stdin"
+    assert stats["tesseract_pool"]["calls"] == 1
+    engine.close()
+    assert pool.stats()["idle"] == 0
+    assert ocr.OCREngine(method="tesseract").stats()["tesseract_backend"] == "pytesseract"
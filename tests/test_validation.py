@@ -0,0 +1,82 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from src.core.pipeline import assess_extraction, assess_extraction_batch
+from src.core.validation import ANOMALY_REASONS, FraudDetector, Validator
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(20)
+    basic = rng.lognormal(10, 0.3, 400)
+    X = np.column_stack([basic, 0.4 * basic, 0.3 * basic, 0.12 * basic])
+    return IsolationForest(n_estimators=25, contamination=0.05, random_state=0).fit(X)
+
+
+@pytest.fixture
+def detector(tmp_path, model):
+    path = str(tmp_path / "anomaly_model.pkl")
+    joblib.dump(model, path)
+    return FraudDetector(model_path=path)
+
+
+def _inputs():
+    rng = np.random.default_rng(21)
+    inputs = []
+    for basic in rng.lognormal(10, 0.6, 60):
+        inputs.append({"basic_salary": basic, "hra": 0.4 * basic, "total_earnings": 1.7 * basic,
+                       "total_deductions": 0.12 * basic, "net_pay": 1.58 * basic})
+    inputs += [
+        {"basic_salary": 500000, "hra": 0, "total_earnings": 500000, "total_deductions": 0},
+        {"basic_salary": 500, "hra": None, "total_earnings": 900},
+        {"basic_salary": 20000, "hra": 8000, "total_earnings": 50000, "total_deductions": -100},
+        {},
+        [20000, 8000, 6000, 2400],
+        [1, 2, 3],
+        "not a slip",
+    ]
+    return inputs
+
+
+def _without_score(result):
+    return {k: v for k, v in result.items() if k != "score"} if isinstance(result, dict) else result
+
+
+def test_batch_matches_a_loop_of_check_anomaly(detector):
+    inputs = _inputs()
+    batch = detector.check_anomaly_batch(inputs)
+    assert [_without_score(result) for result in batch] == [detector.check_anomaly(item) for item in inputs]
+
+    statuses = [result["status"] if isinstance(result, dict) else result for result in batch]
+    assert statuses[-2:] == ["Skipped (Insufficient Data)"] * 2
+    assert "Anomaly Detected" in statuses and "Normal" in statuses
+    assert batch[60]["reason"] == ANOMALY_REASONS[0] and batch[60]["score"] < 0
+
+
+def test_batch_scores_match_the_sklearn_model(detector, model):
+    inputs = _inputs()[:-2]
+    X, valid = FraudDetector.build_features(inputs)
+    assert valid.all()
+    scores = [result["score"] for result in detector.check_anomaly_batch(X)]
+    np.testing.assert_allclose(scores, model.decision_function(X))
+    labels = [-1 if result["status"] == "Anomaly Detected" else 1 for result in detector.check_anomaly_batch(inputs)]
+    assert labels == model.predict(X).tolist()
+
+
+def test_reasons_match_the_scalar_explanation(detector):
+    X = np.array([[200000, 0, 0, 0], [-1, 5, 5, 5], [500, 0, 0, 10], [30000, 12000, 9000, 3600]], dtype=np.float64)
+    assert FraudDetector.explain_anomalies(X) == [detector._explain_anomaly(row.tolist()) for row in X]
+
+
+def test_assessment_batch_matches_single_assessment(detector):
+    inputs = [item for item in _inputs() if isinstance(item, dict)]
+    signals = [None] * len(inputs)
+    signals[3] = [{"signal": "duplicate_file", "reason": "Same file as loan 17", "matches": ["d17"]}]
+    validator = Validator()
+    batch = assess_extraction_batch(inputs, validator, detector, fraud_signals=signals)
+    single = [assess_extraction(data, validator, detector, fraud_signals=doc_signals)
+              for data, doc_signals in zip(inputs, signals)]
+    assert batch == single
+    assert batch[3]["fraud_status"] == "Anomaly Detected" and "loan 17" in batch[3]["fraud_reason"]